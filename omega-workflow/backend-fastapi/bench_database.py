@@ -0,0 +1,569 @@
+#!/usr/bin/env python3
+"""
+Storage-layer benchmark for AsyncDatabase
+Seeds a temporary SQLite database with synthetic data and times the public
+AsyncDatabase methods at several concurrency levels.
+
+Usage:
+    python3 bench_database.py                                  # full default corpus
+    python3 bench_database.py --users 50 --documents 2000 --extractions 8000 --iterations 50
+    python3 bench_database.py --only search_fields,get_documents_with_workflows --json results.json
+"""
+
+import argparse
+import asyncio
+import hashlib
+import inspect
+import json
+import math
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from typing import Dict, Any, List, Callable, Awaitable
+
+from database_async import AsyncDatabase, encode_result_blob
+from import_fields import iter_json_array, find_fields_json
+from import_document_types import DOCUMENT_TYPES_JSON
+
+DOC_TYPES = ['Service Agt', 'Supply Agt', 'Non-Disclosure Agt', 'Employment Agt', 'IP Agt', 'Other']
+EXTRACTION_STATUSES = ['complete'] * 8 + ['pending', 'failed']
+SEED_BATCH_SIZE = 5000
+
+# Public methods deliberately not benchmarked, with the reason
+EXCLUDED_METHODS = {
+    'init_database': 'runs once at construction',
+    'close': 'tears down the pool',
+    'connection': 'exercised by every read case',
+    'get_connection': 'opens an unpooled connection the caller must close',
+    'submit_write': 'exercised by every write case',
+    'execute_write': 'exercised by every write case',
+    'clear_fields': 'would empty the field catalog other cases read',
+}
+
+
+class BenchContext:
+    """Seeded ids and per-case counters shared by the benchmark cases"""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.users: List[Dict[str, Any]] = []
+        self.documents: List[tuple] = []  # (doc_id, user_id)
+        self.workflows: List[tuple] = []  # (workflow_id, user_id)
+        self.extractions: List[tuple] = []  # (extraction_id, doc_id, workflow_id)
+        self.fields: List[Dict[str, Any]] = []
+        self.category_ids: List[int] = []
+        self.document_cursors: List[tuple] = []  # (user_id, cursor for page 2)
+        self.victim_documents: List[tuple] = []
+        self.victim_workflows: List[tuple] = []
+        self.sample_results: List[bytes] = []
+        self.sample_timings: List[str] = []
+        self.counters: Dict[str, int] = {}
+
+    def next_id(self, name: str) -> int:
+        self.counters[name] = self.counters.get(name, 0) + 1
+        return self.counters[name]
+
+    def pick(self, items: list):
+        return items[self.rng.randrange(len(items))]
+
+
+# Seeding
+def content_hash(doc_id: str) -> str:
+    """Stand-in SHA-256 for a seeded document's content"""
+    return hashlib.sha256(doc_id.encode()).hexdigest()
+
+
+def synthetic_results(fields: List[Dict[str, Any]], rng: random.Random, count: int = 5) -> Dict[str, Any]:
+    """Build a Zuva-shaped results payload for a handful of fields"""
+    results = {}
+    for field in rng.sample(fields, min(count, len(fields))):
+        results[field['field_id']] = [{
+            'text': ' '.join(rng.choice(['term', 'party', 'agreement', 'notice', 'assign']) for _ in range(40)),
+            'page': rng.randint(1, 30),
+            'spans': [{'bboxes': [{'page': 1, 'bounds': [{'left': 10, 'top': 20, 'right': 300, 'bottom': 40}]}]}],
+        }]
+    return results
+
+
+async def seed_database(db: AsyncDatabase, ctx: BenchContext, args) -> Dict[str, float]:
+    """Populate the database; returns seconds spent per table"""
+    timings = {}
+
+    async def insert_batches(sql: str, rows, label: str):
+        started = time.perf_counter()
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= SEED_BATCH_SIZE:
+                await db.execute_write(lambda conn, b=batch: conn.executemany(sql, b))
+                batch = []
+        if batch:
+            await db.execute_write(lambda conn, b=batch: conn.executemany(sql, b))
+        timings[label] = time.perf_counter() - started
+
+    # Field catalog: the real fields.json when available, synthetic otherwise
+    started = time.perf_counter()
+    fields_path = find_fields_json()
+    if fields_path:
+        await db.bulk_upsert_fields(iter_json_array(fields_path))
+    else:
+        await db.bulk_upsert_fields(
+            {'field_id': str(uuid.UUID(int=i)), 'name': f'Synthetic Field {i}',
+             'description': 'Synthetic field for benchmarking', 'tags': ['Benchmark']}
+            for i in range(1, 1355)
+        )
+    ctx.fields = await db.get_fields()
+    await db.replace_document_types(DOCUMENT_TYPES_JSON)
+    ctx.category_ids = [category['id'] for category in await db.get_document_categories()]
+    timings['fields'] = time.perf_counter() - started
+
+    # Users (ids are 1..N in a fresh database)
+    await insert_batches(
+        "INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)",
+        ((f'bench_user_{i}', f'bench_user_{i}@example.com', 'bench-hash') for i in range(1, args.users + 1)),
+        'users'
+    )
+    ctx.users = [
+        {'id': i, 'username': f'bench_user_{i}', 'email': f'bench_user_{i}@example.com'}
+        for i in range(1, args.users + 1)
+    ]
+
+    # Workflows: enough per user to give every document its share of extractions
+    per_document = max(1, math.ceil(args.extractions / max(1, args.documents)))
+    workflows_per_user = max(5, per_document)
+    workflow_fields = json.dumps([
+        {'fieldId': field['field_id'], 'name': field['name']} for field in ctx.fields[:10]
+    ])
+    await insert_batches(
+        "INSERT INTO workflows (user_id, name, description, fields, document_types, status) VALUES (?, ?, ?, ?, ?, 'active')",
+        ((user_id, f'Workflow {n}', 'Benchmark workflow', workflow_fields, '[]')
+         for user_id in range(1, args.users + 1) for n in range(workflows_per_user)),
+        'workflows'
+    )
+    ctx.workflows = [
+        ((user_id - 1) * workflows_per_user + n + 1, user_id)
+        for user_id in range(1, args.users + 1) for n in range(workflows_per_user)
+    ]
+
+    # Documents round-robin across users
+    ctx.documents = [(f'doc-{i:08d}', (i % args.users) + 1) for i in range(args.documents)]
+    await insert_batches(
+        "INSERT INTO documents (id, user_id, name, filename, size, doc_type, file_path, upload_date) VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now', ?))",
+        ((doc_id, user_id, f'Agreement {i}', f'agreement_{i}.pdf', ctx.rng.randint(10_000, 5_000_000),
+          ctx.pick(DOC_TYPES), f'/tmp/bench/{doc_id}.pdf', f'-{i} seconds')
+         for i, (doc_id, user_id) in enumerate(ctx.documents)),
+        'documents'
+    )
+
+    # Extractions and matching workflow assignments
+    ctx.sample_results = [encode_result_blob(synthetic_results(ctx.fields, ctx.rng)) for _ in range(16)]
+    pairs = []
+    for doc_id, user_id in ctx.documents:
+        first_workflow = (user_id - 1) * workflows_per_user + 1
+        for n in range(per_document):
+            if len(pairs) >= args.extractions:
+                break
+            pairs.append((doc_id, first_workflow + n))
+        if len(pairs) >= args.extractions:
+            break
+
+    await insert_batches(
+        "INSERT INTO document_workflows (document_id, workflow_id) VALUES (?, ?)",
+        iter(pairs),
+        'document_workflows'
+    )
+
+    def extraction_rows():
+        for doc_id, workflow_id in pairs:
+            status = ctx.pick(EXTRACTION_STATUSES)
+            results = ctx.pick(ctx.sample_results) if status == 'complete' else None
+            timings = ctx.pick(ctx.sample_timings) if status != 'pending' else None
+            yield (doc_id, workflow_id, f'file-{doc_id}', status, results, timings,
+                   ctx.rng.randint(10_000, 20_000_000), f'-{ctx.rng.randint(1, 3600)} seconds' if timings else None)
+
+    ctx.sample_timings = [
+        json.dumps({stage: round(ctx.rng.lognormvariate(0, 1), 3)
+                    for stage in ('hash', 'upload', 'request', 'wait', 'fetch', 'parse', 'save', 'total')})
+        for _ in range(50)
+    ]
+    await insert_batches(
+        "INSERT INTO extractions (document_id, workflow_id, zuva_file_id, status, results, stage_timings, file_size, completed_at) VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now', ?))",
+        extraction_rows(),
+        'extractions'
+    )
+    ctx.extractions = [(i + 1, doc_id, workflow_id) for i, (doc_id, workflow_id) in enumerate(pairs)]
+
+    # One bulk batch tracking a slice of the extractions
+    await insert_batches(
+        "INSERT INTO extraction_batches (id, user_id, total) VALUES ('bench-batch', 1, ?)",
+        iter([(min(len(pairs), 2000),)]),
+        'extraction_batches'
+    )
+    await insert_batches(
+        "INSERT INTO extraction_batch_items (batch_id, document_id, workflow_id) VALUES ('bench-batch', ?, ?)",
+        iter(pairs[:2000]),
+        'extraction_batch_items'
+    )
+
+    # Content-addressed caches: one Zuva upload per document, cached results for a slice of fields
+    field_ids = [field['field_id'] for field in ctx.fields]
+    await insert_batches(
+        "INSERT INTO zuva_files (content_hash, region, zuva_file_id, size, expires_at) VALUES (?, 'us', ?, 1234, datetime('now', '+1 day'))",
+        ((content_hash(doc_id), f'file-{doc_id}') for doc_id, _ in ctx.documents),
+        'zuva_files'
+    )
+    cached_blob = encode_result_blob([{'text': 'cached', 'page': 1}])
+    await insert_batches(
+        "INSERT INTO field_results (content_hash, field_id, results) VALUES (?, ?, ?)",
+        ((content_hash(doc_id), field_id, cached_blob)
+         for doc_id, _ in ctx.documents[:5000] for field_id in field_ids[:20]),
+        'field_results'
+    )
+    await db.replace_zuva_field_definitions('us', [
+        {'field_id': field['field_id'], 'name': field['name'], 'answer_options': {'a': 'Yes', 'b': 'No'}}
+        for field in ctx.fields
+    ])
+
+    # Rows for destructive cases, so they never touch the shared corpus
+    victims = args.iterations * len(args.concurrency) + 1  # plus the warm-up call
+    ctx.victim_documents = [(f'victim-{i:08d}', (i % args.users) + 1) for i in range(victims)]
+    await insert_batches(
+        "INSERT INTO documents (id, user_id, name, filename, size, doc_type, file_path) VALUES (?, ?, 'Victim', 'victim.pdf', 1, 'Other', '/tmp/bench/victim.pdf')",
+        iter(ctx.victim_documents),
+        'victim_documents'
+    )
+    first_victim_workflow = len(ctx.workflows) + 1
+    await insert_batches(
+        "INSERT INTO workflows (user_id, name) VALUES (?, 'Victim')",
+        (((i % args.users) + 1,) for i in range(victims)),
+        'victim_workflows'
+    )
+    ctx.victim_workflows = [(first_victim_workflow + i, (i % args.users) + 1) for i in range(victims)]
+
+    # Second-page cursors for keyset pagination cases
+    for user in ctx.rng.sample(ctx.users, min(50, len(ctx.users))):
+        _, _, cursor = await db.get_documents_with_workflows(user['id'], limit=20)
+        if cursor:
+            ctx.document_cursors.append((user['id'], cursor))
+
+    async def analyze(conn):
+        await conn.execute("ANALYZE")
+    await db.execute_write(analyze)
+
+    return timings
+
+
+# Benchmark cases: each performs exactly one AsyncDatabase call
+Case = Callable[[AsyncDatabase, BenchContext], Awaitable[Any]]
+
+
+def build_cases() -> Dict[str, Case]:
+    """Map case name (method name, optionally with a [variant]) to its single-call coroutine"""
+
+    def field_word(ctx):
+        return ctx.pick(ctx.pick(ctx.fields)['name'].split())
+
+    def deep_cursor(db, ctx):
+        user_id, cursor = ctx.pick(ctx.document_cursors)
+        return db.get_documents_with_workflows(user_id, limit=20, cursor=cursor)
+
+    def new_document(db, ctx):
+        n = ctx.next_id('document')
+        return db.create_document(ctx.pick(ctx.users)['id'], f'bench-new-{n}', f'New {n}', f'new_{n}.pdf',
+                                  1234, 'Other', f'/tmp/bench/new_{n}.pdf')
+
+    def new_documents(db, ctx):
+        # One 20-file upload request
+        n = ctx.next_id('documents')
+        return db.create_documents(ctx.pick(ctx.users)['id'], [
+            {'id': f'bench-upload-{n}-{i}', 'name': f'Upload {n}-{i}', 'filename': f'upload_{n}_{i}.pdf',
+             'size': 1234, 'doc_type': 'PDF', 'file_path': f'/tmp/bench/upload_{n}_{i}.pdf',
+             'content_hash': content_hash(f'bench-upload-{n}-{i}')}
+            for i in range(20)
+        ])
+
+    def delete_document(db, ctx):
+        doc_id, user_id = ctx.victim_documents[ctx.next_id('delete_document') - 1]
+        return db.delete_document(doc_id, user_id)
+
+    def delete_workflow(db, ctx):
+        workflow_id, user_id = ctx.victim_workflows[ctx.next_id('delete_workflow') - 1]
+        return db.delete_workflow(workflow_id, user_id)
+
+    def assign_workflows(db, ctx):
+        doc_id, user_id = ctx.pick(ctx.documents)
+        workflow_ids = [wf_id for wf_id, owner in ctx.workflows if owner == user_id][:2]
+        return db.assign_workflows_to_document(doc_id, workflow_ids)
+
+    def workflow_timings(db, ctx):
+        workflow_id, user_id = ctx.pick(ctx.workflows)
+        return db.get_extraction_timings(user_id, workflow_id=workflow_id)
+
+    return {
+        # Users
+        'create_user': lambda db, ctx: db.create_user(
+            f'bench_new_{ctx.next_id("user")}', f'bench_new_{ctx.counters["user"]}@example.com', 'bench-hash'),
+        'get_user_by_id': lambda db, ctx: db.get_user_by_id(ctx.pick(ctx.users)['id']),
+        'get_user_by_username': lambda db, ctx: db.get_user_by_username(ctx.pick(ctx.users)['username']),
+        'get_user_by_email': lambda db, ctx: db.get_user_by_email(ctx.pick(ctx.users)['email']),
+        'update_user_password_hash': lambda db, ctx: db.update_user_password_hash(
+            ctx.pick(ctx.users)['id'], 'bench-hash'),
+
+        # Documents
+        'create_document': new_document,
+        'create_documents': new_documents,
+        'get_document': lambda db, ctx: db.get_document(*ctx.pick(ctx.documents)),
+        'get_documents_by_ids': lambda db, ctx: db.get_documents_by_ids(
+            [doc_id for doc_id, _ in ctx.rng.sample(ctx.documents, min(500, len(ctx.documents)))], 1),
+        'get_documents_with_workflows': lambda db, ctx: db.get_documents_with_workflows(ctx.pick(ctx.users)['id'], limit=20),
+        'get_documents_with_workflows[cursor]': deep_cursor,
+        'get_documents_with_workflows[search]': lambda db, ctx: db.get_documents_with_workflows(
+            ctx.pick(ctx.users)['id'], search='Agreement 1', sort='name', order='asc', limit=20),
+        'get_document_count': lambda db, ctx: db.get_document_count(ctx.pick(ctx.users)['id']),
+        'update_document': lambda db, ctx: db.update_document(*ctx.pick(ctx.documents), name=f'Renamed {ctx.next_id("rename")}'),
+        'delete_document': delete_document,
+        'save_document_terms': lambda db, ctx: db.save_document_terms(
+            ctx.pick(ctx.documents)[0], [{'term': 'Term', 'value': 'Value', 'page': 1}] * 5),
+        'get_document_terms': lambda db, ctx: db.get_document_terms(ctx.pick(ctx.documents)[0]),
+
+        # Workflows
+        'create_workflow': lambda db, ctx: db.create_workflow(ctx.pick(ctx.users)['id'], f'New {ctx.next_id("workflow")}'),
+        'get_workflow': lambda db, ctx: db.get_workflow(*ctx.pick(ctx.workflows)),
+        'get_workflows': lambda db, ctx: db.get_workflows(ctx.pick(ctx.users)['id']),
+        'update_workflow': lambda db, ctx: db.update_workflow(*ctx.pick(ctx.workflows), description='Updated'),
+        'delete_workflow': delete_workflow,
+        'assign_workflows_to_document': assign_workflows,
+        'get_document_workflows': lambda db, ctx: db.get_document_workflows(ctx.pick(ctx.documents)[0]),
+        'remove_workflows_from_document': lambda db, ctx: db.remove_workflows_from_document(
+            ctx.pick(ctx.documents)[0], [ctx.pick(ctx.workflows)[0]]),
+        'cleanup_orphaned_assignments': lambda db, ctx: db.cleanup_orphaned_assignments(),
+
+        # Fields
+        'create_field': lambda db, ctx: db.create_field(dict(ctx.pick(ctx.fields), created=None)),
+        'bulk_upsert_fields[dry_run]': lambda db, ctx: db.bulk_upsert_fields(ctx.fields, dry_run=True),
+        'search_fields': lambda db, ctx: db.search_fields(search=field_word(ctx), limit=50),
+        'get_fields': lambda db, ctx: db.get_fields(limit=50),
+        'get_fields[all]': lambda db, ctx: db.get_fields(),
+        'get_field_count': lambda db, ctx: db.get_field_count(search=field_word(ctx)),
+        'get_catalog_version': lambda db, ctx: db.get_catalog_version('fields'),
+
+        # Extractions
+        'create_extraction': lambda db, ctx: db.create_extraction(ctx.pick(ctx.documents)[0], 10 ** 9 + ctx.next_id('extraction')),
+        'get_extraction': lambda db, ctx: db.get_extraction(ctx.pick(ctx.extractions)[0]),
+        'get_extraction_by_document_workflow': lambda db, ctx: db.get_extraction_by_document_workflow(*ctx.pick(ctx.extractions)[1:]),
+        'get_extraction_state': lambda db, ctx: db.get_extraction_state(*ctx.pick(ctx.extractions)[1:]),
+        'get_document_extraction_states': lambda db, ctx: db.get_document_extraction_states(ctx.pick(ctx.extractions)[1]),
+        'get_extraction_metadata': lambda db, ctx: db.get_extraction_metadata(ctx.pick(ctx.extractions)[0]),
+        'update_extraction_status': lambda db, ctx: db.update_extraction_status(ctx.pick(ctx.extractions)[0], 'processing'),
+        'save_extraction_results': lambda db, ctx: db.save_extraction_results(
+            ctx.pick(ctx.extractions)[0], synthetic_results(ctx.fields, ctx.rng)),
+        'update_extraction_file_id': lambda db, ctx: db.update_extraction_file_id(ctx.pick(ctx.extractions)[0], 'file-updated'),
+        'get_document_extractions': lambda db, ctx: db.get_document_extractions(ctx.pick(ctx.documents)[0]),
+        'get_extractions_with_workflows': lambda db, ctx: db.get_extractions_with_workflows(ctx.pick(ctx.documents)[0]),
+
+        # Document types
+        'get_document_types_hierarchical': lambda db, ctx: db.get_document_types_hierarchical(),
+        'get_document_categories': lambda db, ctx: db.get_document_categories(),
+        'get_document_types_by_category': lambda db, ctx: db.get_document_types_by_category(ctx.pick(ctx.category_ids)),
+        'replace_document_types[unchanged]': lambda db, ctx: db.replace_document_types(DOCUMENT_TYPES_JSON),
+
+        # Extraction job queue
+        'enqueue_extraction': lambda db, ctx: db.enqueue_extraction(
+            ctx.pick(ctx.documents)[0], 2 * 10 ** 9 + ctx.next_id('enqueue'), '/tmp/bench/queued.pdf',
+            [field['field_id'] for field in ctx.fields[:10]]),
+        'claim_extraction_jobs': lambda db, ctx: db.claim_extraction_jobs('bench-worker', limit=1),
+        'renew_extraction_lease': lambda db, ctx: db.renew_extraction_lease(ctx.pick(ctx.extractions)[0], 'bench-worker'),
+        'set_extraction_stage': lambda db, ctx: db.set_extraction_stage(ctx.pick(ctx.extractions)[0], 'wait'),
+        'retry_extraction_job': lambda db, ctx: db.retry_extraction_job(
+            ctx.pick(ctx.extractions)[0], 'bench-worker', 10, 'Benchmark retry'),
+        'release_extraction_job': lambda db, ctx: db.release_extraction_job(ctx.pick(ctx.extractions)[0], 'bench-worker'),
+        'request_extraction_cancel': lambda db, ctx: db.request_extraction_cancel(ctx.pick(ctx.extractions)[0]),
+        'finish_cancelled_extraction': lambda db, ctx: db.finish_cancelled_extraction(ctx.pick(ctx.extractions)[0]),
+        'recover_extraction_jobs': lambda db, ctx: db.recover_extraction_jobs(),
+        'record_extraction_timings': lambda db, ctx: db.record_extraction_timings(
+            ctx.pick(ctx.extractions)[0], {'wait': 1.5, 'total': 2.0}, 1234, 10),
+        'get_extraction_timings': lambda db, ctx: db.get_extraction_timings(
+            ctx.pick(ctx.workflows)[1], since_hours=24, limit=1000),
+        'get_extraction_timings[workflow]': workflow_timings,
+
+        # Extraction batches
+        'create_extraction_batch': lambda db, ctx: db.create_extraction_batch(
+            f'batch-{ctx.next_id("batch")}', 1, [
+                {'document_id': doc_id, 'workflow_id': workflow_id, 'document_path': '/tmp/bench/batch.pdf',
+                 'field_ids': [field['field_id'] for field in ctx.fields[:10]], 'group_id': doc_id}
+                for _, doc_id, workflow_id in ctx.rng.sample(ctx.extractions, min(100, len(ctx.extractions)))
+            ]),
+        'get_extraction_batch': lambda db, ctx: db.get_extraction_batch('bench-batch', 1),
+        'get_extraction_batch_items': lambda db, ctx: db.get_extraction_batch_items('bench-batch', limit=100),
+        'get_extraction_batch_items[status]': lambda db, ctx: db.get_extraction_batch_items(
+            'bench-batch', status='failed', limit=100),
+        'get_extraction_batch_results': lambda db, ctx: db.get_extraction_batch_results('bench-batch', limit=20),
+
+        # Zuva upload, result and definition caches
+        'get_zuva_file': lambda db, ctx: db.get_zuva_file(content_hash(ctx.pick(ctx.documents)[0]), 'us'),
+        'save_zuva_file': lambda db, ctx: db.save_zuva_file(
+            content_hash(f'new-{ctx.next_id("zuva_file")}'), 'us', 'file-new', 1234, '2099-01-01 00:00:00'),
+        'invalidate_zuva_file': lambda db, ctx: db.invalidate_zuva_file(f'file-missing-{ctx.next_id("invalidate")}'),
+        'get_field_results': lambda db, ctx: db.get_field_results(
+            content_hash(ctx.pick(ctx.documents[:5000])[0]), [field['field_id'] for field in ctx.fields[:40]]),
+        'save_field_results': lambda db, ctx: db.save_field_results(
+            content_hash(f'new-{ctx.next_id("field_results")}'),
+            {field['field_id']: [{'text': 'fresh', 'page': 1}] for field in ctx.fields[:10]}),
+        'get_zuva_field_definitions': lambda db, ctx: db.get_zuva_field_definitions('us'),
+        'replace_zuva_field_definitions': lambda db, ctx: db.replace_zuva_field_definitions('us', [
+            {'field_id': field['field_id'], 'name': field['name']} for field in ctx.fields]),
+    }
+
+
+def uncovered_methods(cases: Dict[str, Case]) -> List[str]:
+    """Public AsyncDatabase methods with neither a case nor an exclusion reason"""
+    covered = {name.split('[')[0] for name in cases} | set(EXCLUDED_METHODS)
+    public = [
+        name for name, member in inspect.getmembers(AsyncDatabase, inspect.isfunction)
+        if not name.startswith('_')
+    ]
+    return sorted(set(public) - covered)
+
+
+# Measurement
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def run_case(db: AsyncDatabase, ctx: BenchContext, case: Case, iterations: int,
+                   concurrency: int) -> Dict[str, Any]:
+    """Run one case `iterations` times spread over `concurrency` workers"""
+    latencies: List[float] = []
+    remaining = iter(range(iterations))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            await case(db, ctx)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'concurrency': concurrency,
+        'iterations': iterations,
+        'seconds': round(elapsed, 6),
+        'ops_per_sec': round(iterations / elapsed, 2) if elapsed > 0 else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'max_ms': round(latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+
+async def run_benchmarks(args) -> Dict[str, Any]:
+    """Seed a fresh database, run the selected cases and return the report"""
+    workdir = tempfile.mkdtemp(prefix='omega-bench-')
+    db_path = os.path.join(workdir, 'bench.db')
+    db = AsyncDatabase(db_path, pool_size=args.pool_size)
+    ctx = BenchContext(args.seed)
+
+    try:
+        print(f"🌱 Seeding {db_path}: {args.users} users, {args.documents} documents, {args.extractions} extractions")
+        started = time.perf_counter()
+        seed_timings = await seed_database(db, ctx, args)
+        print(f"   Seeded in {time.perf_counter() - started:.1f}s")
+
+        cases = build_cases()
+        missing = uncovered_methods(cases)
+        if missing:
+            print(f"⚠️  Public methods without a benchmark case: {', '.join(missing)}")
+
+        selected = cases
+        if args.only:
+            wanted = set(args.only)
+            selected = {name: case for name, case in cases.items() if name in wanted or name.split('[')[0] in wanted}
+
+        results = []
+        print(f"\n{'case':<44}{'conc':>6}{'ops/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for name, case in selected.items():
+            # One untimed call warms caches and the connection pool
+            await case(db, ctx)
+            for concurrency in args.concurrency:
+                result = await run_case(db, ctx, case, args.iterations, concurrency)
+                result['case'] = name
+                results.append(result)
+                print(f"{name:<44}{concurrency:>6}{result['ops_per_sec'] or 0:>12.1f}"
+                      f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}")
+
+        return {
+            'generated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'sqlite_version': sqlite3.sqlite_version,
+            'python_version': sys.version.split()[0],
+            'config': {
+                'users': args.users,
+                'documents': args.documents,
+                'extractions': args.extractions,
+                'fields': len(ctx.fields),
+                'iterations': args.iterations,
+                'concurrency': args.concurrency,
+                'pool_size': db.pool_size,
+                'seed': args.seed,
+            },
+            'seed_seconds': {table: round(seconds, 3) for table, seconds in seed_timings.items()},
+            'uncovered_methods': missing,
+            'results': results,
+        }
+
+    finally:
+        await db.close()
+        if args.keep:
+            print(f"📁 Kept benchmark database at {db_path}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark AsyncDatabase against a synthetic corpus")
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--documents', type=int, default=100_000)
+    parser.add_argument('--extractions', type=int, default=500_000)
+    parser.add_argument('--iterations', type=int, default=200, help="Calls per case per concurrency level")
+    parser.add_argument('--concurrency', default='1,8,32', help="Comma-separated concurrency levels")
+    parser.add_argument('--pool-size', type=int, default=None, help="Connection pool size (default: DB_POOL_SIZE)")
+    parser.add_argument('--only', default=None, help="Comma-separated case or method names to run")
+    parser.add_argument('--seed', type=int, default=1234, help="Random seed for data and access patterns")
+    parser.add_argument('--json', dest='json_path', default=None, help="Write the report as JSON to this path ('-' for stdout)")
+    parser.add_argument('--keep', action='store_true', help="Keep the seeded database file")
+    args = parser.parse_args(argv)
+
+    args.concurrency = [int(level) for level in args.concurrency.split(',') if level.strip()]
+    args.only = [name.strip() for name in args.only.split(',')] if args.only else None
+    if args.users < 1 or args.documents < 1:
+        parser.error("--users and --documents must be at least 1")
+    return args
+
+
+async def main():
+    """Main entry point"""
+    args = parse_args()
+    report = await run_benchmarks(args)
+
+    if args.json_path == '-':
+        print(json.dumps(report, indent=2))
+    elif args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Wrote {len(report['results'])} results to {args.json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Shared Test Setup
+Runs `async def` tests on a per-test event loop (no pytest-asyncio needed) and
+gives each test its own temporary database plus helpers to fill it, and the
+API wired to that database
+"""
+
+import asyncio
+import importlib
+import inspect
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+import httpx
+import pytest
+
+from database_async import AsyncDatabase
+from extraction_service import ExtractionService
+
+
+@pytest.fixture
+def loop():
+    """Event loop shared by a test's async fixtures and the test itself"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    """Run a coroutine test to completion on the test's loop"""
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+
+    loop = pyfuncitem.funcargs.get('loop') or pyfuncitem._request.getfixturevalue('loop')
+    kwargs = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    loop.run_until_complete(pyfuncitem.obj(**kwargs))
+    return True
+
+
+@pytest.fixture
+def db(loop, tmp_path) -> AsyncDatabase:
+    """Empty database in the test's temporary directory"""
+    async def open_db():
+        # The writer task starts with the database, so it is created on the test's loop
+        return AsyncDatabase(str(tmp_path / 'test.db'))
+
+    database = loop.run_until_complete(open_db())
+    yield database
+    loop.run_until_complete(database.close())
+
+
+class Seed:
+    """Creates users, workflows and documents (with files on disk) in a test database"""
+
+    def __init__(self, db: AsyncDatabase, tmp_path):
+        self.db = db
+        self.tmp_path = tmp_path
+
+    async def user(self, username: str = 'alice') -> Dict[str, Any]:
+        return await self.db.create_user(username, f'{username}@example.com', 'hash')
+
+    async def workflow(self, user_id: int, field_ids: Optional[List[str]] = None,
+                       name: str = 'Workflow') -> Dict[str, Any]:
+        fields = [{'fieldId': field_id} for field_id in field_ids or []]
+        return await self.db.create_workflow(user_id, name, fields=json.dumps(fields))
+
+    async def document(self, user_id: int, document_id: str, content: bytes = b'%PDF-1.4 test',
+                       content_hash: Optional[str] = None) -> Dict[str, Any]:
+        path = self.tmp_path / f'{document_id}.pdf'
+        path.write_bytes(content)
+        return await self.db.create_document(user_id, document_id, document_id, path.name,
+                                             len(content), 'PDF', str(path), content_hash)
+
+
+@pytest.fixture
+def seed(db, tmp_path) -> Seed:
+    return Seed(db, tmp_path)
+
+
+class StubZuvaClient:
+    """Extracts every requested field as 'fresh <field_id>' and records what was uploaded and requested"""
+
+    region = 'us'
+
+    def __init__(self):
+        self.uploaded = []
+        self.requested = []
+
+    async def upload_file(self, file_path, progress=None):
+        self.uploaded.append(str(file_path))
+        return f'file-{len(self.uploaded)}', {}
+
+    async def request_extraction(self, file_ids, field_ids):
+        self.requested.append(list(field_ids))
+        return f'req-{len(self.requested)}', {}
+
+    async def wait_for_extraction(self, request_id):
+        return {'request_id': request_id, 'status': 'complete'}
+
+    async def get_extraction_results(self, request_id):
+        return {'field_ids': self.requested[int(request_id.split('-')[1]) - 1]}
+
+    def parse_extraction_results(self, raw_results):
+        return {field_id: [{'text': f'fresh {field_id}'}] for field_id in raw_results['field_ids']}, {}
+
+
+@pytest.fixture
+def service(db) -> ExtractionService:
+    """Extraction service (workers not started) talking to a StubZuvaClient"""
+    service = ExtractionService(db, zuva_token='test')
+    service.zuva_client = StubZuvaClient()
+    return service
+
+
+async def import_main(tmp_path):
+    """Import main once, without it ever opening the production database"""
+    if 'main' in sys.modules:
+        return sys.modules['main']
+
+    defaults = AsyncDatabase.__init__.__defaults__
+    AsyncDatabase.__init__.__defaults__ = (str(tmp_path / 'import.db'),) + defaults[1:]
+    try:
+        main = importlib.import_module('main')
+    finally:
+        AsyncDatabase.__init__.__defaults__ = defaults
+    await main.db.close()
+    return main
+
+
+class Api:
+    """In-process client for main.app; startup handlers (and so the workers) are not run"""
+
+    def __init__(self, main, client: httpx.AsyncClient):
+        self.main = main
+        self.client = client
+
+    def auth(self, user: Dict[str, Any]) -> Dict[str, str]:
+        return {'Authorization': f"Bearer {self.main.create_access_token({'sub': user['id']})}"}
+
+    def __getattr__(self, name):
+        # get/post/put/delete/request go straight to the client
+        return getattr(self.client, name)
+
+
+@pytest.fixture
+def api(loop, db, service, tmp_path, monkeypatch) -> Api:
+    """main's app using the test database, the stub-client extraction service and a temp upload dir"""
+    main = loop.run_until_complete(import_main(tmp_path))
+    monkeypatch.setattr(main, 'db', db)
+    monkeypatch.setattr(main, 'field_catalog', main.FieldCatalog(db))
+    monkeypatch.setattr(main, 'principal_cache', main.PrincipalCache(db))
+    monkeypatch.setattr(main, 'response_cache', main.ResponseCache(db))
+    monkeypatch.setattr(main, 'search_cache', main.ResponseCache(db, max_entries=main.CATALOG_SEARCH_CACHE_MAX_ENTRIES))
+    monkeypatch.setattr(main, 'extraction_service', service)
+    monkeypatch.setattr(main, 'UPLOAD_DIR', tmp_path / 'uploads')
+    (tmp_path / 'uploads').mkdir()
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url='http://test')
+    yield Api(main, client)
+    loop.run_until_complete(client.aclose())
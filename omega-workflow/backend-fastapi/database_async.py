@@ -9,192 +9,724 @@ import asyncio
 import os
 import json
 import hashlib
+import re
+import base64
+import binascii
+import zlib
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Awaitable, Tuple, Iterable
 from pathlib import Path
 
+# Connection pool defaults (overridable via environment)
+DEFAULT_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DEFAULT_CACHE_SIZE_KIB = int(os.getenv("DB_CACHE_SIZE_KIB", "16384"))  # 16MB page cache per connection
+DEFAULT_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(128 * 1024 * 1024)))  # 128MB memory-mapped I/O
+DEFAULT_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")  # NORMAL is durable enough under WAL
+
+# Writer queue defaults: mutations arriving within one window share a single commit
+DEFAULT_WRITE_BATCH_WINDOW_MS = float(os.getenv("DB_WRITE_BATCH_MS", "5"))
+DEFAULT_WRITE_BATCH_MAX = int(os.getenv("DB_WRITE_BATCH_MAX", "256"))
+
+# Sortable columns for the documents listing, keyed by the API's field names
+DOCUMENT_SORT_COLUMNS = {
+    'name': 'name',
+    'type': 'doc_type',
+    'size': 'size',
+    'uploadedAt': 'upload_date',
+    'updatedAt': 'updated_at',
+}
+
+# Upsert rather than INSERT OR REPLACE: REPLACE deletes the old row
+# without firing the delete trigger, leaving stale FTS entries
+FIELD_UPSERT_SQL = """
+    INSERT INTO fields (
+        field_id, name, description, type, region, custom,
+        created_at, last_updated, tags, languages,
+        document_types, jurisdictions, content_hash
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(field_id) DO UPDATE SET
+        name = excluded.name,
+        description = excluded.description,
+        type = excluded.type,
+        region = excluded.region,
+        custom = excluded.custom,
+        created_at = excluded.created_at,
+        last_updated = excluded.last_updated,
+        tags = excluded.tags,
+        languages = excluded.languages,
+        document_types = excluded.document_types,
+        jurisdictions = excluded.jurisdictions,
+        content_hash = excluded.content_hash,
+        imported_at = CURRENT_TIMESTAMP
+"""
+
+# Extraction result blobs: magic + format version + zlib-compressed JSON.
+# Rows written before this format hold plain JSON text and are still readable.
+RESULT_BLOB_MAGIC = b'OMZ'
+RESULT_BLOB_VERSION = 1
+RESULT_BLOB_COMPRESSION_LEVEL = 6
+
+
+def encode_result_blob(value: Any) -> Optional[bytes]:
+    """Serialize extraction results/metadata into the compressed storage format"""
+    if value is None:
+        return None
+    raw = json.dumps(value, separators=(',', ':')).encode('utf-8')
+    return RESULT_BLOB_MAGIC + bytes([RESULT_BLOB_VERSION]) + zlib.compress(raw, RESULT_BLOB_COMPRESSION_LEVEL)
+
+
+class ResultBlobError(ValueError):
+    """A stored results/metadata value that cannot be decoded"""
+    pass
+
+
+def decode_result_blob(value: Any) -> Any:
+    """Decode a stored results/metadata value (None if empty); raises ResultBlobError if unreadable"""
+    if not value:
+        return None
+    try:
+        if isinstance(value, bytes) and value.startswith(RESULT_BLOB_MAGIC):
+            version = value[len(RESULT_BLOB_MAGIC)]
+            if version != RESULT_BLOB_VERSION:
+                raise ValueError(f"Unsupported result blob version {version}")
+            return json.loads(zlib.decompress(value[len(RESULT_BLOB_MAGIC) + 1:]))
+        # Legacy rows: plain JSON text
+        return json.loads(value)
+    except (ValueError, TypeError, zlib.error) as e:
+        raise ResultBlobError(str(e)) from e
+
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    """Encode keyset position as an opaque URL-safe continuation token"""
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    """Decode a continuation token; raises ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+    if not isinstance(payload, dict) or not isinstance(payload.get('after'), list):
+        raise ValueError("Invalid pagination cursor")
+    return payload
+
+# A write operation receives the writer connection and returns a result for its caller
+WriteOp = Callable[[aiosqlite.Connection], Awaitable[Any]]
+
 class AsyncDatabase:
-    def __init__(self, db_path: str = "/app/database/omega.db"):
+    def __init__(self, db_path: str = "/app/database/omega.db", pool_size: Optional[int] = None,
+                 cache_size_kib: Optional[int] = None, mmap_size: Optional[int] = None,
+                 synchronous: Optional[str] = None, write_batch_window_ms: Optional[float] = None,
+                 write_batch_max: Optional[int] = None):
         self.db_path = db_path
         self.db_dir = Path(db_path).parent
-        
+
+        # Connection pool settings
+        self.pool_size = max(1, pool_size or DEFAULT_POOL_SIZE)
+        self.cache_size_kib = cache_size_kib if cache_size_kib is not None else DEFAULT_CACHE_SIZE_KIB
+        self.mmap_size = mmap_size if mmap_size is not None else DEFAULT_MMAP_SIZE
+        self.synchronous = (synchronous or DEFAULT_SYNCHRONOUS).upper()
+
+        # Long-lived connections, opened lazily up to pool_size and reused across calls
+        self._pool: asyncio.Queue = asyncio.Queue()
+        self._pool_connections: List[aiosqlite.Connection] = []
+        self._pool_lock = asyncio.Lock()
+        self._closed = False
+
+        # Single writer: every mutation is queued to one task that owns the only write connection
+        self.write_batch_window = (
+            write_batch_window_ms if write_batch_window_ms is not None else DEFAULT_WRITE_BATCH_WINDOW_MS
+        ) / 1000.0
+        self.write_batch_max = max(1, write_batch_max or DEFAULT_WRITE_BATCH_MAX)
+        self._write_queue: asyncio.Queue = asyncio.Queue()
+        self._writer_task: Optional[asyncio.Task] = None
+
         # Ensure database directory exists
         self.db_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Initialize database on startup
-        asyncio.create_task(self.init_database())
-    
-    async def init_database(self):
-        """Initialize database tables"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Enable foreign keys
-            await db.execute("PRAGMA foreign_keys = ON")
-            
-            # Users table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Documents table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS documents (
-                    id TEXT PRIMARY KEY,
-                    user_id INTEGER NOT NULL,
-                    name TEXT NOT NULL,
-                    filename TEXT NOT NULL,
-                    size INTEGER NOT NULL,
-                    doc_type TEXT NOT NULL,
-                    file_path TEXT NOT NULL,
-                    upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
-                )
-            """)
-            
-            # Document terms table (for future term extraction)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS document_terms (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    document_id TEXT NOT NULL,
-                    term_name TEXT NOT NULL,
-                    term_value TEXT,
-                    category TEXT,
-                    confidence REAL,
-                    extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (document_id) REFERENCES documents (id) ON DELETE CASCADE
-                )
-            """)
-            
-            # Workflows table (for future workflow management)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS workflows (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    name TEXT NOT NULL,
-                    description TEXT,
-                    fields TEXT,  -- JSON string
-                    document_types TEXT,  -- JSON string
-                    status TEXT DEFAULT 'draft',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
-                )
-            """)
 
-            # Document workflows association table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS document_workflows (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    document_id TEXT NOT NULL,
-                    workflow_id INTEGER NOT NULL,
-                    assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (document_id) REFERENCES documents (id) ON DELETE CASCADE,
-                    UNIQUE(document_id, workflow_id)
-                )
-            """)
+        # Initialize database on startup; the schema op is queued here, ahead of any other write
+        self._schema_future = self.submit_write(self._create_schema)
+        self._init_task = asyncio.create_task(self.init_database())
 
-            # Fields table for storing field discovery information
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS fields (
-                    field_id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    description TEXT,
-                    type TEXT,
-                    region TEXT,
-                    custom INTEGER DEFAULT 0,
-                    created_at TIMESTAMP,
-                    last_updated TIMESTAMP,
-                    tags TEXT,
-                    languages TEXT,
-                    document_types TEXT,
-                    jurisdictions TEXT,
-                    imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+    # Connection pool
+    async def _open_connection(self, isolation_level: Optional[str] = "") -> aiosqlite.Connection:
+        """Open a connection and apply the per-connection PRAGMA setup"""
+        conn = await aiosqlite.connect(self.db_path, isolation_level=isolation_level)
+        conn.row_factory = aiosqlite.Row
+        await conn.execute("PRAGMA foreign_keys = ON")
+        await conn.execute("PRAGMA journal_mode = WAL")
+        await conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        await conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kib)}")
+        await conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        return conn
 
-            # Extractions table for storing Zuva API extraction results
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS extractions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    document_id TEXT NOT NULL,
-                    workflow_id INTEGER NOT NULL,
-                    zuva_file_id TEXT,
-                    zuva_request_id TEXT,
-                    status TEXT DEFAULT 'pending',
-                    results TEXT,
-                    answer_metadata TEXT,
-                    error_message TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    started_at TIMESTAMP,
-                    completed_at TIMESTAMP,
-                    FOREIGN KEY (document_id) REFERENCES documents (id) ON DELETE CASCADE,
-                    UNIQUE(document_id, workflow_id)
-                )
-            """)
+    async def _acquire(self) -> aiosqlite.Connection:
+        """Take an idle pooled connection, opening a new one while under pool_size"""
+        if self._closed:
+            raise RuntimeError("Database has been closed")
 
-            # Document type categories table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS document_categories (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE NOT NULL,
-                    display_order INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
+        # Reads issued right after construction wait for the schema to exist
+        if not self._init_task.done():
+            await asyncio.wait({self._init_task})
+
+        try:
+            return self._pool.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+
+        async with self._pool_lock:
+            if len(self._pool_connections) < self.pool_size:
+                conn = await self._open_connection()
+                self._pool_connections.append(conn)
+                return conn
+
+        # Pool is at capacity - wait for a connection to be released
+        return await self._pool.get()
+
+    async def _release(self, conn: aiosqlite.Connection):
+        """Return a connection to the pool in a clean state"""
+        if self._closed:
+            await conn.close()
+            return
+
+        try:
+            # Never hand out a connection with a half-finished transaction
+            if conn.in_transaction:
+                await conn.rollback()
+            conn.row_factory = aiosqlite.Row
+        except Exception as e:
+            print(f"⚠️  Discarding broken pooled connection: {e}")
+            if conn in self._pool_connections:
+                self._pool_connections.remove(conn)
+            try:
+                await conn.close()
+            except Exception:
+                pass
+            return
+
+        self._pool.put_nowait(conn)
+
+    @asynccontextmanager
+    async def connection(self):
+        """Borrow a pooled connection for the duration of the block"""
+        conn = await self._acquire()
+        try:
+            yield conn
+        finally:
+            await self._release(conn)
+
+    # Single-writer queue with group commit
+    def submit_write(self, op: WriteOp) -> asyncio.Future:
+        """
+        Queue a mutation for the writer task
+
+        The op runs on the writer connection inside its own savepoint; the returned
+        future resolves with the op's result once the group commit containing it lands.
+        Ops must not call commit() or queue further writes themselves.
+        """
+        if self._closed:
+            raise RuntimeError("Database has been closed")
+
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._writer_loop())
+
+        future = asyncio.get_running_loop().create_future()
+        self._write_queue.put_nowait((op, future))
+        return future
+
+    async def execute_write(self, op: WriteOp) -> Any:
+        """Queue a mutation and wait until it is committed"""
+        # Shield so a cancelled caller never leaves the op half-applied or dropped
+        return await asyncio.shield(self.submit_write(op))
+
+    async def _writer_loop(self):
+        """Drain the write queue, grouping everything that arrives within a window into one commit"""
+        loop = asyncio.get_running_loop()
+        conn = None
+        stopping = False
+        item = None
+        batch: List[Any] = []
+
+        try:
+            # Autocommit mode: transactions are managed explicitly below
+            conn = await self._open_connection(isolation_level=None)
+
+            while not stopping:
+                item = await self._write_queue.get()
+                if item is None:
+                    break
+
+                batch = []
+                await conn.execute("BEGIN IMMEDIATE")
+                deadline = loop.time() + self.write_batch_window
+
+                while True:
+                    op, future = item
+                    await conn.execute("SAVEPOINT write_op")
+                    try:
+                        result = await op(conn)
+                        await conn.execute("RELEASE write_op")
+                        batch.append((future, result, None))
+                    except Exception as e:
+                        await conn.execute("ROLLBACK TO write_op")
+                        await conn.execute("RELEASE write_op")
+                        batch.append((future, None, e))
+
+                    if len(batch) >= self.write_batch_max:
+                        break
+                    remaining = deadline - loop.time()
+                    try:
+                        if remaining > 0:
+                            item = await asyncio.wait_for(self._write_queue.get(), remaining)
+                        else:
+                            item = self._write_queue.get_nowait()
+                    except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+
+                try:
+                    await conn.execute("COMMIT")
+                except Exception as e:
+                    print(f"❌ Group commit of {len(batch)} write(s) failed: {e}")
+                    if conn.in_transaction:
+                        await conn.execute("ROLLBACK")
+                    batch = [(future, None, error or e) for future, _, error in batch]
+
+                for future, result, error in batch:
+                    if future.done():
+                        continue
+                    if error is not None:
+                        future.set_exception(error)
+                    else:
+                        future.set_result(result)
+                batch = []
+
+        except Exception as e:
+            print(f"❌ Database writer stopped unexpectedly: {e}")
+            # Fail the in-flight batch and anything still queued so callers don't hang
+            pending = [future for future, _, _ in batch]
+            if item is not None:
+                pending.append(item[1])
+            while not self._write_queue.empty():
+                item = self._write_queue.get_nowait()
+                if item is not None:
+                    pending.append(item[1])
+            for future in pending:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            if conn is not None:
+                await conn.close()
+
+    async def init_database(self):
+        """Initialize database tables"""
+        # Runs through the writer so later queued writes always see the schema
+        await asyncio.shield(self._schema_future)
+        print("✅ Database initialized successfully")
+
+    async def _create_schema(self, db: aiosqlite.Connection):
+        """Create tables and indexes (writer op)"""
+        # Users table
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                email TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Documents table
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id TEXT PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                doc_type TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                content_hash TEXT,
+                FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+            )
+        """)
+        # SHA-256 of the stored file, computed while the upload is written
+        await self._ensure_column(db, 'documents', 'content_hash', 'TEXT')
+        
+        # Document terms table (for future term extraction)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS document_terms (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                document_id TEXT NOT NULL,
+                term_name TEXT NOT NULL,
+                term_value TEXT,
+                category TEXT,
+                confidence REAL,
+                extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (document_id) REFERENCES documents (id) ON DELETE CASCADE
+            )
+        """)
+        
+        # Workflows table (for future workflow management)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS workflows (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                description TEXT,
+                fields TEXT,  -- JSON string
+                document_types TEXT,  -- JSON string
+                status TEXT DEFAULT 'draft',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+            )
+        """)
+
+        # Document workflows association table
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS document_workflows (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                document_id TEXT NOT NULL,
+                workflow_id INTEGER NOT NULL,
+                assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (document_id) REFERENCES documents (id) ON DELETE CASCADE,
+                UNIQUE(document_id, workflow_id)
+            )
+        """)
+
+        # Fields table for storing field discovery information
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS fields (
+                field_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                description TEXT,
+                type TEXT,
+                region TEXT,
+                custom INTEGER DEFAULT 0,
+                created_at TIMESTAMP,
+                last_updated TIMESTAMP,
+                tags TEXT,
+                languages TEXT,
+                document_types TEXT,
+                jurisdictions TEXT,
+                content_hash TEXT,
+                imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        await self._ensure_column(db, 'fields', 'content_hash', 'TEXT')
+
+        # Extractions table for storing Zuva API extraction results
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS extractions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                document_id TEXT NOT NULL,
+                workflow_id INTEGER NOT NULL,
+                zuva_file_id TEXT,
+                zuva_request_id TEXT,
+                status TEXT DEFAULT 'pending',
+                results TEXT,
+                answer_metadata TEXT,
+                error_message TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP,
+                completed_at TIMESTAMP,
+                document_path TEXT,
+                field_ids TEXT,
+                stage TEXT,
+                attempts INTEGER DEFAULT 0,
+                next_attempt_at TIMESTAMP,
+                lease_owner TEXT,
+                lease_expires_at TIMESTAMP,
+                cancel_requested INTEGER DEFAULT 0,
+                group_id TEXT,
+                stage_timings TEXT,
+                file_size INTEGER,
+                field_count INTEGER,
+                priority INTEGER DEFAULT 0,
+                FOREIGN KEY (document_id) REFERENCES documents (id) ON DELETE CASCADE,
+                UNIQUE(document_id, workflow_id)
+            )
+        """)
+
+        # Job queue columns: the extractions table doubles as the durable work queue
+        await self._ensure_column(db, 'extractions', 'document_path', 'TEXT')
+        await self._ensure_column(db, 'extractions', 'field_ids', 'TEXT')
+        await self._ensure_column(db, 'extractions', 'stage', 'TEXT')
+        await self._ensure_column(db, 'extractions', 'attempts', 'INTEGER DEFAULT 0')
+        await self._ensure_column(db, 'extractions', 'next_attempt_at', 'TIMESTAMP')
+        await self._ensure_column(db, 'extractions', 'lease_owner', 'TEXT')
+        await self._ensure_column(db, 'extractions', 'lease_expires_at', 'TIMESTAMP')
+        await self._ensure_column(db, 'extractions', 'cancel_requested', 'INTEGER DEFAULT 0')
+        await self._ensure_column(db, 'extractions', 'group_id', 'TEXT')
+
+        # Per-stage durations (JSON, seconds) and payload sizes for extraction metrics
+        await self._ensure_column(db, 'extractions', 'stage_timings', 'TEXT')
+        await self._ensure_column(db, 'extractions', 'file_size', 'INTEGER')
+        await self._ensure_column(db, 'extractions', 'field_count', 'INTEGER')
+
+        # Lower-priority (higher number) jobs, e.g. bulk batches, are claimed after interactive ones
+        await self._ensure_column(db, 'extractions', 'priority', 'INTEGER DEFAULT 0')
+
+        # Jobs asked to re-extract every field instead of reusing cached field results
+        await self._ensure_column(db, 'extractions', 'refresh_results', 'INTEGER DEFAULT 0')
+
+        # Zuva uploads keyed by file content, reused across extractions until they expire upstream
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS zuva_files (
+                content_hash TEXT NOT NULL,
+                region TEXT NOT NULL,
+                zuva_file_id TEXT NOT NULL,
+                size INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                expires_at TIMESTAMP NOT NULL,
+                PRIMARY KEY (content_hash, region)
+            )
+        """)
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_zuva_files_file_id ON zuva_files(zuva_file_id)")
+
+        # Per-field extraction results keyed by document content, shared across workflows
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS field_results (
+                content_hash TEXT NOT NULL,
+                field_id TEXT NOT NULL,
+                results BLOB,
+                answer_metadata BLOB,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (content_hash, field_id)
+            )
+        """)
+        # The field definition's last_updated when the result was extracted; a redefined field is re-extracted
+        await self._ensure_column(db, 'field_results', 'field_version', 'TEXT')
+
+        # Zuva's field definitions (answer options etc.), persisted across restarts
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS zuva_field_definitions (
+                region TEXT NOT NULL,
+                field_id TEXT NOT NULL,
+                definition TEXT NOT NULL,
+                fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (region, field_id)
+            )
+        """)
+
+        # Bulk extraction batches: a set of document-workflow pairs tracked as one unit
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS extraction_batches (
+                id TEXT PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                total INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+            )
+        """)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS extraction_batch_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                batch_id TEXT NOT NULL,
+                document_id TEXT NOT NULL,
+                workflow_id INTEGER NOT NULL,
+                error TEXT,
+                FOREIGN KEY (batch_id) REFERENCES extraction_batches (id) ON DELETE CASCADE,
+                UNIQUE(batch_id, document_id, workflow_id)
+            )
+        """)
+
+        # Document type categories table
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS document_categories (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE NOT NULL,
+                display_order INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # Individual document types table
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS document_types (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                category_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                display_order INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (category_id) REFERENCES document_categories (id) ON DELETE CASCADE,
+                UNIQUE(category_id, name)
+            )
+        """)
+
+        # Create indexes for better performance
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_documents_user_id ON documents(user_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_documents_upload_date ON documents(upload_date)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_document_terms_document_id ON document_terms(document_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_workflows_user_id ON workflows(user_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_document_workflows_document_id ON document_workflows(document_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_document_workflows_workflow_id ON document_workflows(workflow_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_fields_name ON fields(name)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_fields_region ON fields(region)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_extractions_document_id ON extractions(document_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_extractions_workflow_id ON extractions(workflow_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_extractions_status ON extractions(status)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_document_types_category ON document_types(category_id)")
+
+        # Keyset pagination indexes: (sort key, tiebreaker) per listing
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_documents_user_upload ON documents(user_id, upload_date, id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_fields_name_id ON fields(name, field_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_extractions_document_created ON extractions(document_id, created_at, id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_extractions_queue ON extractions(status, next_attempt_at)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_extractions_group ON extractions(group_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_extractions_completed ON extractions(completed_at)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_extraction_batches_user ON extraction_batches(user_id, created_at)")
+
+        await self._create_catalog_versions(db)
+        await self._create_fields_fts(db)
+        await self._create_fields_triggers(db)
+
+    async def _ensure_column(self, db: aiosqlite.Connection, table: str, column: str, definition: str):
+        """Add a column to an existing table if an older database lacks it"""
+        cursor = await db.execute(f"PRAGMA table_info({table})")
+        columns = {row[1] for row in await cursor.fetchall()}
+        if column not in columns:
+            await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    async def _create_catalog_versions(self, db: aiosqlite.Connection):
+        """Create the per-table change counters used by in-memory caches"""
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS catalog_versions (
+                name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        await db.execute("INSERT OR IGNORE INTO catalog_versions (name) VALUES ('fields')")
+        await db.execute("INSERT OR IGNORE INTO catalog_versions (name) VALUES ('users')")
+        await db.execute("INSERT OR IGNORE INTO catalog_versions (name) VALUES ('document_types')")
+
+        # Either table of the document type hierarchy changing moves the 'document_types' version
+        for table in ('document_categories', 'document_types'):
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                await db.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()} AFTER {event} ON {table} BEGIN
+                        UPDATE catalog_versions
+                        SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+                        WHERE name = 'document_types';
+                    END
+                """)
+
+        # Cached principals go stale when a user's identity changes or the user disappears; new
+        # users and password rehashes don't matter (and must not flush every cached principal)
+        await db.execute("DROP TRIGGER IF EXISTS users_version_update")
+        for name, event in (('users_version_identity', 'UPDATE OF id, username, email'),
+                            ('users_version_delete', 'DELETE')):
+            await db.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON users BEGIN
+                    UPDATE catalog_versions
+                    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+                    WHERE name = 'users';
+                END
             """)
 
-            # Individual document types table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS document_types (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    category_id INTEGER NOT NULL,
-                    name TEXT NOT NULL,
-                    display_order INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (category_id) REFERENCES document_categories (id) ON DELETE CASCADE,
-                    UNIQUE(category_id, name)
-                )
+    async def _create_fields_fts(self, db: aiosqlite.Connection):
+        """Create the FTS5 index over fields"""
+        cursor = await db.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'fields_fts'"
+        )
+        row = await cursor.fetchone()
+        existed = row is not None
+
+        # Older databases used an external-content index joined on fields' implicit rowid,
+        # which VACUUM may renumber (fields has a TEXT primary key), or a word tokenizer
+        # that can't match inside words; replace either
+        if existed and ('field_id' not in row[0] or 'trigram' not in row[0]):
+            await self._drop_fields_triggers(db)
+            await db.execute("DROP TABLE fields_fts")
+            existed = False
+
+        # The index keeps its own copy of the text and joins back on field_id. Trigrams keep
+        # the substring matching of the old LIKE search ('lease' finds 'Sublease')
+        await db.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS fields_fts USING fts5(
+                field_id UNINDEXED, name, description, tags,
+                tokenize='trigram'
+            )
+        """)
+
+        # Index rows imported before the FTS table existed
+        if not existed:
+            await self._rebuild_fields_fts(db)
+
+    async def _rebuild_fields_fts(self, db: aiosqlite.Connection):
+        """Re-index every field from scratch"""
+        await db.execute("DELETE FROM fields_fts")
+        await db.execute("""
+            INSERT INTO fields_fts(field_id, name, description, tags)
+            SELECT field_id, name, description, tags FROM fields
+        """)
+
+    async def _create_fields_triggers(self, db: aiosqlite.Connection):
+        """Create the triggers that keep fields_fts and the fields catalog version in sync"""
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS fields_fts_ai AFTER INSERT ON fields BEGIN
+                INSERT INTO fields_fts(field_id, name, description, tags)
+                VALUES (new.field_id, new.name, new.description, new.tags);
+            END
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS fields_fts_ad AFTER DELETE ON fields BEGIN
+                DELETE FROM fields_fts WHERE field_id = old.field_id;
+            END
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS fields_fts_au AFTER UPDATE OF field_id, name, description, tags ON fields BEGIN
+                DELETE FROM fields_fts WHERE field_id = old.field_id;
+                INSERT INTO fields_fts(field_id, name, description, tags)
+                VALUES (new.field_id, new.name, new.description, new.tags);
+            END
+        """)
+
+        # Bump the version on any change, whichever process makes it
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            await db.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS fields_version_{event.lower()} AFTER {event} ON fields BEGIN
+                    UPDATE catalog_versions
+                    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+                    WHERE name = 'fields';
+                END
             """)
 
-            # Create indexes for better performance
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_documents_user_id ON documents(user_id)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_documents_upload_date ON documents(upload_date)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_document_terms_document_id ON document_terms(document_id)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_workflows_user_id ON workflows(user_id)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_document_workflows_document_id ON document_workflows(document_id)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_document_workflows_workflow_id ON document_workflows(workflow_id)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_fields_name ON fields(name)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_fields_region ON fields(region)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_extractions_document_id ON extractions(document_id)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_extractions_workflow_id ON extractions(workflow_id)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_extractions_status ON extractions(status)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_document_types_category ON document_types(category_id)")
-
-            await db.commit()
-            print("✅ Database initialized successfully")
+    async def _drop_fields_triggers(self, db: aiosqlite.Connection):
+        """Drop the per-row fields triggers (bulk imports rebuild their effects once instead)"""
+        for trigger in ('fields_fts_ai', 'fields_fts_ad', 'fields_fts_au',
+                        'fields_version_insert', 'fields_version_update', 'fields_version_delete'):
+            await db.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
     
     # User management methods
     async def create_user(self, username: str, email: str, password_hash: str) -> Optional[Dict[str, Any]]:
         """Create a new user"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async def op(db):
                 cursor = await db.execute("""
                     INSERT INTO users (username, email, password_hash)
                     VALUES (?, ?, ?)
                 """, (username, email, password_hash))
-                
-                await db.commit()
-                user_id = cursor.lastrowid
-                
-                # Return the created user
-                return await self.get_user_by_id(user_id)
-                
+                return cursor.lastrowid
+
+            user_id = await self.execute_write(op)
+
+            # Return the created user
+            return await self.get_user_by_id(user_id)
+
         except Exception as e:
             print(f"❌ Error creating user: {e}")
             return None
@@ -202,8 +734,7 @@ class AsyncDatabase:
     async def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get user by ID"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.connection() as db:
                 cursor = await db.execute("""
                     SELECT id, username, email, password_hash, created_at, updated_at
                     FROM users WHERE id = ?
@@ -221,8 +752,7 @@ class AsyncDatabase:
     async def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user by username"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.connection() as db:
                 cursor = await db.execute("""
                     SELECT id, username, email, password_hash, created_at, updated_at
                     FROM users WHERE username = ?
@@ -240,8 +770,7 @@ class AsyncDatabase:
     async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get user by email"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.connection() as db:
                 cursor = await db.execute("""
                     SELECT id, username, email, password_hash, created_at, updated_at
                     FROM users WHERE email = ?
@@ -255,32 +784,93 @@ class AsyncDatabase:
         except Exception as e:
             print(f"❌ Error getting user by email: {e}")
             return None
-    
+
+    async def update_user_password_hash(self, user_id: int, password_hash: str,
+                                        current_hash: Optional[str] = None) -> bool:
+        """
+        Replace a user's password hash
+
+        With current_hash the update only applies while the stored hash is
+        still that value, so a rehash on login cannot overwrite a password
+        change made in the meantime.
+        """
+        try:
+            async def op(db):
+                if current_hash is None:
+                    cursor = await db.execute("""
+                        UPDATE users SET password_hash = ?, updated_at = CURRENT_TIMESTAMP
+                        WHERE id = ?
+                    """, (password_hash, user_id))
+                else:
+                    cursor = await db.execute("""
+                        UPDATE users SET password_hash = ?, updated_at = CURRENT_TIMESTAMP
+                        WHERE id = ? AND password_hash = ?
+                    """, (password_hash, user_id, current_hash))
+                return cursor.rowcount > 0
+
+            return await self.execute_write(op)
+
+        except Exception as e:
+            print(f"❌ Error updating password hash: {e}")
+            return False
+
     # Document management methods
     async def create_document(self, user_id: int, doc_id: str, name: str, filename: str, 
-                            size: int, doc_type: str, file_path: str) -> Optional[Dict[str, Any]]:
+                            size: int, doc_type: str, file_path: str,
+                            content_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Create a new document record"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async def op(db):
                 await db.execute("""
-                    INSERT INTO documents (id, user_id, name, filename, size, doc_type, file_path)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (doc_id, user_id, name, filename, size, doc_type, file_path))
-                
-                await db.commit()
-                
-                # Return the created document
-                return await self.get_document(doc_id, user_id)
-                
+                    INSERT INTO documents (id, user_id, name, filename, size, doc_type, file_path, content_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (doc_id, user_id, name, filename, size, doc_type, file_path, content_hash))
+
+            await self.execute_write(op)
+
+            # Return the created document
+            return await self.get_document(doc_id, user_id)
+
         except Exception as e:
             print(f"❌ Error creating document: {e}")
             return None
     
+    async def create_documents(self, user_id: int, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create several document records in one transaction
+
+        Each document dict has id, name, filename, size, doc_type, file_path
+        and optionally content_hash. Either all rows are inserted or none;
+        returns the created documents in input order ([] on error).
+        """
+        if not documents:
+            return []
+        try:
+            rows = [
+                (doc['id'], user_id, doc['name'], doc['filename'], doc['size'],
+                 doc['doc_type'], doc['file_path'], doc.get('content_hash'))
+                for doc in documents
+            ]
+
+            async def op(db):
+                await db.executemany("""
+                    INSERT INTO documents (id, user_id, name, filename, size, doc_type, file_path, content_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+
+            await self.execute_write(op)
+
+            created = await self.get_documents_by_ids([doc['id'] for doc in documents], user_id)
+            return [created[doc['id']] for doc in documents if doc['id'] in created]
+
+        except Exception as e:
+            print(f"❌ Error creating documents: {e}")
+            return []
+
     async def get_document(self, doc_id: str, user_id: int) -> Optional[Dict[str, Any]]:
         """Get document by ID and user ID"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.connection() as db:
                 cursor = await db.execute("""
                     SELECT id, user_id, name, filename, size, doc_type, file_path, upload_date, updated_at
                     FROM documents WHERE id = ? AND user_id = ?
@@ -295,37 +885,181 @@ class AsyncDatabase:
             print(f"❌ Error getting document: {e}")
             return None
     
-    async def get_documents(self, user_id: int, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
-        """Get all documents for a user"""
+    async def get_documents_by_ids(self, doc_ids: List[str], user_id: int) -> Dict[str, Dict[str, Any]]:
+        """Get a user's documents by ID, keyed by ID; IDs that don't exist or belong to others are absent"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
-                cursor = await db.execute("""
-                    SELECT id, user_id, name, filename, size, doc_type, file_path, upload_date, updated_at
-                    FROM documents 
-                    WHERE user_id = ?
-                    ORDER BY upload_date DESC
+            documents = {}
+            async with self.connection() as db:
+                unique_ids = list(dict.fromkeys(doc_ids))
+                for start in range(0, len(unique_ids), 500):
+                    chunk = unique_ids[start:start + 500]
+                    placeholders = ','.join('?' * len(chunk))
+                    cursor = await db.execute(f"""
+                        SELECT id, user_id, name, filename, size, doc_type, file_path, upload_date, updated_at
+                        FROM documents WHERE user_id = ? AND id IN ({placeholders})
+                    """, (user_id, *chunk))
+                    for row in await cursor.fetchall():
+                        documents[row['id']] = dict(row)
+            return documents
+
+        except Exception as e:
+            print(f"❌ Error getting documents by ID: {e}")
+            return {}
+
+    @staticmethod
+    def _build_document_filter(user_id: int, search: Optional[str], doc_type: Optional[str],
+                               workflow_id: Optional[int]) -> Tuple[str, List[Any]]:
+        """Build the WHERE clause shared by the documents listing and its count"""
+        where = 'd.user_id = ?'
+        params: List[Any] = [user_id]
+
+        if search:
+            where += ' AND (d.name LIKE ? OR d.filename LIKE ?)'
+            search_term = f'%{search}%'
+            params.extend([search_term, search_term])
+
+        if doc_type:
+            where += ' AND d.doc_type = ?'
+            params.append(doc_type)
+
+        if workflow_id is not None:
+            where += ' AND EXISTS (SELECT 1 FROM document_workflows f WHERE f.document_id = d.id AND f.workflow_id = ?)'
+            params.append(workflow_id)
+
+        return where, params
+
+    async def get_documents_with_workflows(
+        self,
+        user_id: int,
+        search: Optional[str] = None,
+        doc_type: Optional[str] = None,
+        workflow_id: Optional[int] = None,
+        sort: str = 'uploadedAt',
+        order: str = 'desc',
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[int], Optional[str]]:
+        """
+        Get one page of a user's documents with their assigned workflows
+
+        Pages are keyed on (sort column, id): pass the returned cursor to fetch the
+        next page at the same cost as the first. Workflow IDs and names are
+        aggregated per document in the same query. Returns (documents, total,
+        next_cursor); total is only computed for the first page (None otherwise).
+        """
+        if sort not in DOCUMENT_SORT_COLUMNS:
+            raise ValueError(f"Unsupported sort field: {sort}")
+        direction = 'ASC' if order.lower() == 'asc' else 'DESC'
+        sort_column = DOCUMENT_SORT_COLUMNS[sort]
+
+        after = None
+        if cursor:
+            payload = decode_cursor(cursor)
+            if payload.get('sort') != sort or payload.get('order') != direction or len(payload['after']) != 2:
+                raise ValueError("Cursor does not match the requested sort order")
+            after = payload['after']
+
+        try:
+            where, params = self._build_document_filter(user_id, search, doc_type, workflow_id)
+
+            if after is not None:
+                comparison = '>' if direction == 'ASC' else '<'
+                where += f' AND (d.{sort_column}, d.id) {comparison} (?, ?)'
+                params.extend(after)
+                offset = 0
+
+            # Counting every match defeats keyset paging, so only the first page does it
+            total_expr = 'COUNT(*) OVER ()' if after is None else 'NULL'
+
+            # Page the documents first, then aggregate workflows for just that page
+            query = f"""
+                WITH page AS (
+                    SELECT d.id, d.user_id, d.name, d.filename, d.size, d.doc_type,
+                           d.file_path, d.upload_date, d.updated_at,
+                           {total_expr} AS total_count
+                    FROM documents d
+                    WHERE {where}
+                    ORDER BY d.{sort_column} {direction}, d.id {direction}
                     LIMIT ? OFFSET ?
-                """, (user_id, limit, offset))
-                
+                )
+                SELECT page.*,
+                       json_group_array(w.id) FILTER (WHERE w.id IS NOT NULL) AS workflow_ids,
+                       json_group_array(w.name) FILTER (WHERE w.id IS NOT NULL) AS workflow_names
+                FROM page
+                LEFT JOIN document_workflows dw ON dw.document_id = page.id
+                LEFT JOIN workflows w ON w.id = dw.workflow_id
+                GROUP BY page.id
+                ORDER BY page.{sort_column} {direction}, page.id {direction}
+            """
+            params.extend([limit, offset])
+
+            async with self.connection() as db:
+                cursor = await db.execute(query, params)
                 rows = await cursor.fetchall()
-                return [dict(row) for row in rows]
-                
+
+            documents = []
+            total = None if after is not None else 0
+            for row in rows:
+                document = dict(row)
+                row_total = document.pop('total_count')
+                if after is None:
+                    total = row_total
+                # FILTER leaves NULL rather than [] when nothing is assigned
+                document['workflow_ids'] = json.loads(document['workflow_ids'] or '[]')
+                document['workflow_names'] = json.loads(document['workflow_names'] or '[]')
+                documents.append(document)
+
+            if not rows and offset:
+                total = await self.get_document_count(user_id, search, doc_type, workflow_id)
+
+            next_cursor = None
+            if len(documents) == limit:
+                last = documents[-1]
+                next_cursor = encode_cursor({
+                    'sort': sort,
+                    'order': direction,
+                    'after': [last[sort_column], last['id']]
+                })
+
+            return documents, total, next_cursor
+
         except Exception as e:
-            print(f"❌ Error getting documents: {e}")
-            return []
-    
+            print(f"❌ Error getting documents with workflows: {e}")
+            return [], 0, None
+
+    async def get_document_count(
+        self,
+        user_id: int,
+        search: Optional[str] = None,
+        doc_type: Optional[str] = None,
+        workflow_id: Optional[int] = None
+    ) -> int:
+        """Count a user's documents matching the listing filters"""
+        try:
+            where, params = self._build_document_filter(user_id, search, doc_type, workflow_id)
+            query = f'SELECT COUNT(*) FROM documents d WHERE {where}'
+
+            async with self.connection() as db:
+                cursor = await db.execute(query, params)
+                result = await cursor.fetchone()
+                return result[0] if result else 0
+
+        except Exception as e:
+            print(f"❌ Error counting documents: {e}")
+            return 0
+
     async def delete_document(self, doc_id: str, user_id: int) -> bool:
         """Delete a document"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async def op(db):
                 cursor = await db.execute("""
                     DELETE FROM documents WHERE id = ? AND user_id = ?
                 """, (doc_id, user_id))
-
-                await db.commit()
                 return cursor.rowcount > 0
 
+            return await self.execute_write(op)
+
         except Exception as e:
             print(f"❌ Error deleting document: {e}")
             return False
@@ -333,22 +1067,21 @@ class AsyncDatabase:
     async def update_document(self, doc_id: str, user_id: int, name: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Update document metadata (rename)"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                # Build dynamic update query
-                updates = []
-                params = []
-
-                if name is not None:
-                    if not name or not name.strip():
-                        print(f"❌ Document name cannot be empty")
-                        return None
-                    updates.append("name = ?")
-                    params.append(name.strip())
-
-                if not updates:
-                    # No updates requested, return existing document
-                    return await self.get_document(doc_id, user_id)
-
+            # Build dynamic update query
+            updates = []
+            params = []
+
+            if name is not None:
+                if not name or not name.strip():
+                    print(f"❌ Document name cannot be empty")
+                    return None
+                updates.append("name = ?")
+                params.append(name.strip())
+
+            if not updates:
+                # No updates requested, return existing document
+                updated = True
+            else:
                 # Always update the updated_at timestamp
                 updates.append("updated_at = CURRENT_TIMESTAMP")
                 params.extend([doc_id, user_id])
@@ -359,12 +1092,15 @@ class AsyncDatabase:
                     WHERE id = ? AND user_id = ?
                 """
 
-                cursor = await db.execute(query, params)
-                await db.commit()
+                async def op(db):
+                    cursor = await db.execute(query, params)
+                    return cursor.rowcount > 0
 
-                if cursor.rowcount > 0:
-                    return await self.get_document(doc_id, user_id)
-                return None
+                updated = await self.execute_write(op)
+
+            if updated:
+                return await self.get_document(doc_id, user_id)
+            return None
 
         except Exception as e:
             print(f"❌ Error updating document: {e}")
@@ -374,26 +1110,25 @@ class AsyncDatabase:
     async def save_document_terms(self, document_id: str, terms: List[Dict[str, Any]]) -> bool:
         """Save extracted terms for a document"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async def op(db):
                 # Delete existing terms first
                 await db.execute("DELETE FROM document_terms WHERE document_id = ?", (document_id,))
-                
+
                 # Insert new terms
-                for term in terms:
-                    await db.execute("""
-                        INSERT INTO document_terms (document_id, term_name, term_value, category, confidence)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (
-                        document_id,
-                        term.get('name', ''),
-                        term.get('value', ''),
-                        term.get('category', ''),
-                        term.get('confidence', 0.0)
-                    ))
-                
-                await db.commit()
-                return True
-                
+                await db.executemany("""
+                    INSERT INTO document_terms (document_id, term_name, term_value, category, confidence)
+                    VALUES (?, ?, ?, ?, ?)
+                """, [(
+                    document_id,
+                    term.get('name', ''),
+                    term.get('value', ''),
+                    term.get('category', ''),
+                    term.get('confidence', 0.0)
+                ) for term in terms])
+
+            await self.execute_write(op)
+            return True
+
         except Exception as e:
             print(f"❌ Error saving document terms: {e}")
             return False
@@ -401,8 +1136,7 @@ class AsyncDatabase:
     async def get_document_terms(self, document_id: str) -> List[Dict[str, Any]]:
         """Get extracted terms for a document"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.connection() as db:
                 cursor = await db.execute("""
                     SELECT term_name, term_value, category, confidence, extracted_at
                     FROM document_terms 
@@ -422,18 +1156,18 @@ class AsyncDatabase:
                             fields: str = "[]", document_types: str = "[]", status: str = "draft") -> Optional[Dict[str, Any]]:
         """Create a new workflow"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async def op(db):
                 cursor = await db.execute("""
                     INSERT INTO workflows (user_id, name, description, fields, document_types, status)
                     VALUES (?, ?, ?, ?, ?, ?)
                 """, (user_id, name, description, fields, document_types, status))
-                
-                await db.commit()
-                workflow_id = cursor.lastrowid
-                
-                # Return the created workflow
-                return await self.get_workflow(workflow_id, user_id)
-                
+                return cursor.lastrowid
+
+            workflow_id = await self.execute_write(op)
+
+            # Return the created workflow
+            return await self.get_workflow(workflow_id, user_id)
+
         except Exception as e:
             print(f"❌ Error creating workflow: {e}")
             return None
@@ -441,8 +1175,7 @@ class AsyncDatabase:
     async def get_workflow(self, workflow_id: int, user_id: int) -> Optional[Dict[str, Any]]:
         """Get workflow by ID and user ID"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.connection() as db:
                 cursor = await db.execute("""
                     SELECT id, user_id, name, description, fields, document_types, status, created_at, updated_at
                     FROM workflows WHERE id = ? AND user_id = ?
@@ -460,8 +1193,7 @@ class AsyncDatabase:
     async def get_workflows(self, user_id: int) -> List[Dict[str, Any]]:
         """Get all workflows for a user"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.connection() as db:
                 cursor = await db.execute("""
                     SELECT id, user_id, name, description, fields, document_types, status, created_at, updated_at
                     FROM workflows
@@ -481,7 +1213,7 @@ class AsyncDatabase:
                             document_types: Optional[str] = None, status: Optional[str] = None) -> bool:
         """Update an existing workflow"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async def op(db):
                 # Build dynamic update query
                 updates = []
                 params = []
@@ -521,10 +1253,11 @@ class AsyncDatabase:
                 """
 
                 cursor = await db.execute(query, params)
-                await db.commit()
 
                 return cursor.rowcount > 0
 
+            return await self.execute_write(op)
+
         except Exception as e:
             print(f"❌ Error updating workflow: {e}")
             return False
@@ -532,10 +1265,7 @@ class AsyncDatabase:
     async def delete_workflow(self, workflow_id: int, user_id: int) -> bool:
         """Delete a workflow (only if it belongs to the user)"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                # Enable foreign keys to ensure CASCADE deletes work
-                await db.execute("PRAGMA foreign_keys = ON")
-
+            async def op(db):
                 # First, verify the workflow belongs to this user
                 cursor = await db.execute("""
                     SELECT id FROM workflows
@@ -550,11 +1280,12 @@ class AsyncDatabase:
 
                 # Delete the workflow (CASCADE will handle document_workflows)
                 await db.execute("DELETE FROM workflows WHERE id = ?", (workflow_id,))
-                await db.commit()
 
                 print(f"✅ Deleted workflow {workflow_id} for user {user_id} (CASCADE removed assignments)")
                 return True
 
+            return await self.execute_write(op)
+
         except Exception as e:
             print(f"❌ Error deleting workflow: {e}")
             return False
@@ -563,7 +1294,7 @@ class AsyncDatabase:
     async def assign_workflows_to_document(self, document_id: str, workflow_ids: List[int]) -> bool:
         """Assign workflows to a document"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async def op(db):
                 # First, remove existing assignments
                 await db.execute("DELETE FROM document_workflows WHERE document_id = ?", (document_id,))
                 print(f"✅ Cleared existing workflow assignments for document {document_id}")
@@ -580,10 +1311,11 @@ class AsyncDatabase:
                         print(f"❌ Constraint violation assigning workflow {workflow_id}: {ie}")
                         raise
 
-                await db.commit()
                 print(f"✅ Successfully assigned {len(workflow_ids)} workflows to document {document_id}")
                 return True
 
+            return await self.execute_write(op)
+
         except aiosqlite.IntegrityError as e:
             print(f"❌ Database integrity error assigning workflows: {e}")
             print(f"   Document ID: {document_id}, Workflow IDs: {workflow_ids}")
@@ -603,10 +1335,7 @@ class AsyncDatabase:
         Returns the number of orphaned assignments removed.
         """
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                # Enable foreign keys for this connection
-                await db.execute("PRAGMA foreign_keys = ON")
-
+            async def op(db):
                 # Clean up cross-user orphaned assignments
                 cursor = await db.execute("""
                     DELETE FROM document_workflows
@@ -630,8 +1359,6 @@ class AsyncDatabase:
                 """)
                 deleted_workflow_count = cursor.rowcount
 
-                await db.commit()
-
                 total_deleted = cross_user_count + deleted_workflow_count
 
                 if total_deleted > 0:
@@ -641,6 +1368,8 @@ class AsyncDatabase:
 
                 return total_deleted
 
+            return await self.execute_write(op)
+
         except Exception as e:
             print(f"❌ Error cleaning up orphaned assignments: {e}")
             import traceback
@@ -650,7 +1379,7 @@ class AsyncDatabase:
     async def get_document_workflows(self, document_id: str) -> List[int]:
         """Get workflow IDs assigned to a document"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.connection() as db:
                 cursor = await db.execute("""
                     SELECT workflow_id
                     FROM document_workflows
@@ -668,130 +1397,321 @@ class AsyncDatabase:
     async def remove_workflows_from_document(self, document_id: str, workflow_ids: List[int]) -> bool:
         """Remove specific workflow assignments from a document"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async def op(db):
                 placeholders = ','.join('?' * len(workflow_ids))
                 await db.execute(f"""
                     DELETE FROM document_workflows
                     WHERE document_id = ? AND workflow_id IN ({placeholders})
                 """, (document_id, *workflow_ids))
 
-                await db.commit()
                 return True
 
+            return await self.execute_write(op)
+
         except Exception as e:
             print(f"❌ Error removing workflows from document: {e}")
             return False
 
     # Field management methods
+    @staticmethod
+    def _field_row(field_data: Dict[str, Any]) -> tuple:
+        """Convert a fields.json record to FIELD_UPSERT_SQL parameters, ending with its content hash"""
+        row = (
+            field_data.get('field_id'),
+            field_data.get('name'),
+            field_data.get('description'),
+            field_data.get('type'),
+            field_data.get('region'),
+            1 if field_data.get('custom', False) else 0,
+            field_data.get('created'),
+            field_data.get('last_updated'),
+            json.dumps(field_data.get('tags', [])),
+            json.dumps(field_data.get('languages', [])),
+            json.dumps(field_data.get('document_types', [])),
+            json.dumps(field_data.get('jurisdictions', []))
+        )
+        content_hash = hashlib.sha256(json.dumps(row).encode('utf-8')).hexdigest()
+        return row + (content_hash,)
+
     async def create_field(self, field_data: Dict[str, Any]) -> bool:
         """Create a new field record"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute("""
-                    INSERT OR REPLACE INTO fields (
-                        field_id, name, description, type, region, custom,
-                        created_at, last_updated, tags, languages,
-                        document_types, jurisdictions
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    field_data.get('field_id'),
-                    field_data.get('name'),
-                    field_data.get('description'),
-                    field_data.get('type'),
-                    field_data.get('region'),
-                    1 if field_data.get('custom', False) else 0,
-                    field_data.get('created'),
-                    field_data.get('last_updated'),
-                    json.dumps(field_data.get('tags', [])),
-                    json.dumps(field_data.get('languages', [])),
-                    json.dumps(field_data.get('document_types', [])),
-                    json.dumps(field_data.get('jurisdictions', []))
-                ))
-
-                await db.commit()
+            async def op(db):
+                await db.execute(FIELD_UPSERT_SQL, self._field_row(field_data))
                 return True
 
+            return await self.execute_write(op)
+
         except Exception as e:
             print(f"❌ Error creating field: {e}")
             return False
 
-    async def get_fields(self, search: Optional[str] = None, tags: Optional[str] = None,
-                        region: Optional[str] = None, limit: Optional[int] = None,
-                        offset: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Get fields with optional search and filtering"""
-        try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
-                query = 'SELECT * FROM fields WHERE 1=1'
-                params = []
+    async def _get_field_hashes(self) -> Dict[str, Optional[str]]:
+        """Map every stored field_id to its content hash"""
+        async with self.connection() as db:
+            cursor = await db.execute('SELECT field_id, content_hash FROM fields')
+            return {row['field_id']: row['content_hash'] for row in await cursor.fetchall()}
+
+    async def bulk_upsert_fields(self, fields: Iterable[Dict[str, Any]], batch_size: int = 500,
+                                 dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Import many fields in one transaction, writing only rows whose content changed
 
-                if search:
-                    query += ' AND (name LIKE ? OR description LIKE ?)'
-                    search_term = f'%{search}%'
-                    params.extend([search_term, search_term])
+        Fields are diffed against the stored content hashes and changed rows are
+        upserted with executemany in batches. The per-row FTS and catalog-version
+        triggers are suspended for the import; the FTS index is rebuilt and the
+        version bumped once at the end. With dry_run nothing is written.
 
-                if tags:
-                    query += ' AND tags LIKE ?'
-                    params.append(f'%{tags}%')
+        Returns counts: processed, inserted, updated, unchanged, invalid, and
+        stale (stored fields absent from the input), plus the changed field names.
+        """
+        existing = await self._get_field_hashes()
+        stats: Dict[str, Any] = {
+            'processed': 0, 'inserted': 0, 'updated': 0,
+            'unchanged': 0, 'invalid': 0, 'stale': 0, 'changed': []
+        }
+        seen = set()
+
+        def changed_rows():
+            for field_data in fields:
+                stats['processed'] += 1
+                if not field_data.get('field_id') or not field_data.get('name'):
+                    stats['invalid'] += 1
+                    continue
+
+                row = self._field_row(field_data)
+                field_id, content_hash = row[0], row[-1]
+                seen.add(field_id)
+                if field_id not in existing:
+                    stats['inserted'] += 1
+                elif existing[field_id] != content_hash:
+                    stats['updated'] += 1
+                else:
+                    stats['unchanged'] += 1
+                    continue
+
+                stats['changed'].append(field_data['name'])
+                yield row
+
+        if dry_run:
+            for _ in changed_rows():
+                pass
+        else:
+            async def op(db):
+                await self._drop_fields_triggers(db)
+
+                batch = []
+                for row in changed_rows():
+                    batch.append(row)
+                    if len(batch) >= batch_size:
+                        await db.executemany(FIELD_UPSERT_SQL, batch)
+                        batch = []
+                if batch:
+                    await db.executemany(FIELD_UPSERT_SQL, batch)
+
+                if stats['inserted'] or stats['updated']:
+                    await self._rebuild_fields_fts(db)
+                    await db.execute("""
+                        UPDATE catalog_versions
+                        SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+                        WHERE name = 'fields'
+                    """)
 
-                if region:
-                    query += ' AND region = ?'
-                    params.append(region)
+                await self._create_fields_triggers(db)
 
-                query += ' ORDER BY name'
+            await self.execute_write(op)
 
-                if limit:
-                    query += ' LIMIT ?'
-                    params.append(limit)
-                    if offset:
-                        query += ' OFFSET ?'
-                        params.append(offset)
+        stats['stale'] = len(set(existing) - seen)
+        return stats
 
-                cursor = await db.execute(query, params)
+    @staticmethod
+    def _field_terms(text: Optional[str], columns: List[str]) -> Tuple[List[str], List[str], List[Any]]:
+        """
+        Split user input into words that must each appear somewhere in `columns`
+
+        Returns (fts_phrases, like_conditions, like_params): words of three or more
+        characters become trigram phrases; shorter ones have no trigram to match
+        and fall back to LIKE.
+        """
+        phrases, conditions, params = [], [], []
+        for word in re.findall(r'\w+', text or ''):
+            if len(word) >= 3:
+                phrases.append(f'"{word}"')
+            else:
+                pattern = '%' + word.replace('_', '\\_') + '%'
+                conditions.append('(' + ' OR '.join(f"f.{column} LIKE ? ESCAPE '\\'" for column in columns) + ')')
+                params.extend([pattern] * len(columns))
+        return phrases, conditions, params
+
+    def _build_field_query(self, search: Optional[str], tags: Optional[str], region: Optional[str],
+                           after: Optional[List[Any]] = None) -> Tuple[str, List[Any], bool]:
+        """
+        Build the matching-fields query shared by field search and count
+
+        Every search word must occur (anywhere, as in the old LIKE search) in the
+        name or description, and every tags word in the tags. Rows carry a
+        relevance column. Returns (query, params, ranked); for unranked listings
+        the keyset position `after` is applied here so it can use the index.
+        """
+        match_terms = []
+
+        search_phrases, like_conditions, like_params = self._field_terms(search, ['name', 'description'])
+        if search_phrases:
+            match_terms.append('{name description} : (' + ' AND '.join(search_phrases) + ')')
+
+        tag_phrases, tag_conditions, tag_params = self._field_terms(tags, ['tags'])
+        if tag_phrases:
+            match_terms.append('tags : (' + ' AND '.join(tag_phrases) + ')')
+        like_conditions += tag_conditions
+        like_params += tag_params
+
+        params: List[Any] = []
+        if match_terms:
+            # bm25 weights follow the FTS column order: field_id (unindexed), name, description, tags
+            query = """
+                SELECT f.*, bm25(fields_fts, 0.0, 10.0, 1.0, 3.0) AS relevance
+                FROM fields_fts
+                JOIN fields f ON f.field_id = fields_fts.field_id
+                WHERE fields_fts MATCH ?
+            """
+            params.append(' AND '.join(match_terms))
+        else:
+            query = 'SELECT f.*, 0.0 AS relevance FROM fields f WHERE 1=1'
+
+        for condition in like_conditions:
+            query += f' AND {condition}'
+        params.extend(like_params)
+
+        if region:
+            query += ' AND f.region = ?'
+            params.append(region)
+
+        if after is not None and not match_terms:
+            query += ' AND (f.name, f.field_id) > (?, ?)'
+            params.extend(after[1:])
+
+        return query, params, bool(match_terms)
+
+    @staticmethod
+    def _field_query_key(search: Optional[str], tags: Optional[str], region: Optional[str]) -> str:
+        """Short fingerprint of a field query, so a cursor can't be replayed against another one"""
+        raw = json.dumps([search or None, tags or None, region or None]).encode('utf-8')
+        return hashlib.sha256(raw).hexdigest()[:16]
+
+    @staticmethod
+    def _row_to_field(row) -> Dict[str, Any]:
+        """Convert a fields row to a dict with its JSON columns parsed"""
+        field = dict(row)
+        for json_field in ['tags', 'languages', 'document_types', 'jurisdictions']:
+            if field.get(json_field):
+                try:
+                    field[json_field] = json.loads(field[json_field])
+                except (json.JSONDecodeError, TypeError):
+                    field[json_field] = []
+            else:
+                field[json_field] = []
+        return field
+
+    async def search_fields(self, search: Optional[str] = None, tags: Optional[str] = None,
+                            region: Optional[str] = None, limit: Optional[int] = None,
+                            offset: Optional[int] = None,
+                            cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[int], Optional[str]]:
+        """
+        Search fields through the FTS index
+
+        Returns (fields, total, next_cursor): one page of fields ranked by relevance
+        when searching, otherwise ordered by (name, field_id). The first page also
+        carries the total number of matches from the same query; pages fetched with
+        a cursor are keyset-paged and report total as None. A cursor only continues
+        the search, tags and region it was issued for.
+        """
+        query_key = self._field_query_key(search, tags, region)
+        after = None
+        if cursor:
+            payload = decode_cursor(cursor)
+            after = payload['after']
+            if len(after) != 3 or payload.get('query') != query_key:
+                raise ValueError("Cursor does not match the requested search")
+
+        try:
+            matches, params, ranked = self._build_field_query(search, tags, region, after)
+            order = 'relevance, name, field_id' if ranked else 'name, field_id'
+
+            if after is None:
+                # Rank inside a subquery: bm25() is not available alongside the window count
+                query = f"""
+                    SELECT *, COUNT(*) OVER () AS total_count
+                    FROM ({matches})
+                    ORDER BY {order}
+                """
+            elif ranked:
+                query = f"""
+                    SELECT *, NULL AS total_count
+                    FROM ({matches})
+                    WHERE (relevance, name, field_id) > (?, ?, ?)
+                    ORDER BY {order}
+                """
+                params = params + list(after)
+            else:
+                # Unranked keyset condition is applied inside matches, against the index
+                query = f'SELECT *, NULL AS total_count FROM ({matches}) ORDER BY {order}'
+            page_params = list(params)
+
+            if limit:
+                query += ' LIMIT ?'
+                page_params.append(limit)
+                if offset and after is None:
+                    query += ' OFFSET ?'
+                    page_params.append(offset)
+
+            async with self.connection() as db:
+                cursor = await db.execute(query, page_params)
                 rows = await cursor.fetchall()
-                fields = []
 
-                for row in rows:
-                    field = dict(row)
-                    # Parse JSON fields
-                    for json_field in ['tags', 'languages', 'document_types', 'jurisdictions']:
-                        if field.get(json_field):
-                            try:
-                                field[json_field] = json.loads(field[json_field])
-                            except (json.JSONDecodeError, TypeError):
-                                field[json_field] = []
-                        else:
-                            field[json_field] = []
-                    fields.append(field)
+                if after is not None:
+                    total = None
+                elif rows:
+                    total = rows[0]['total_count']
+                elif offset:
+                    # Paged past the end: no row left to carry the window count
+                    cursor = await db.execute(f'SELECT COUNT(*) FROM ({matches})', params)
+                    total = (await cursor.fetchone())[0]
+                else:
+                    total = 0
+
+            fields = []
+            next_cursor = None
+            for row in rows:
+                field = self._row_to_field(row)
+                field.pop('total_count', None)
+                relevance = field.pop('relevance', None)
+                fields.append(field)
 
-                return fields
+            if limit and len(fields) == limit:
+                last = fields[-1]
+                next_cursor = encode_cursor({'after': [relevance, last['name'], last['field_id']],
+                                             'query': query_key})
+
+            return fields, total, next_cursor
 
         except Exception as e:
-            print(f"❌ Error fetching fields: {e}")
-            return []
+            print(f"❌ Error searching fields: {e}")
+            return [], 0, None
+
+    async def get_fields(self, search: Optional[str] = None, tags: Optional[str] = None,
+                        region: Optional[str] = None, limit: Optional[int] = None,
+                        offset: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get fields with optional search and filtering"""
+        fields, _, _ = await self.search_fields(search, tags, region, limit, offset)
+        return fields
 
     async def get_field_count(self, search: Optional[str] = None, tags: Optional[str] = None,
                              region: Optional[str] = None) -> int:
         """Get total number of fields in database"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                query = 'SELECT COUNT(*) as count FROM fields WHERE 1=1'
-                params = []
-
-                if search:
-                    query += ' AND (name LIKE ? OR description LIKE ?)'
-                    search_term = f'%{search}%'
-                    params.extend([search_term, search_term])
-
-                if tags:
-                    query += ' AND tags LIKE ?'
-                    params.append(f'%{tags}%')
-
-                if region:
-                    query += ' AND region = ?'
-                    params.append(region)
-
-                cursor = await db.execute(query, params)
+            matches, params, _ = self._build_field_query(search, tags, region)
+            async with self.connection() as db:
+                cursor = await db.execute(f'SELECT COUNT(*) FROM ({matches})', params)
                 result = await cursor.fetchone()
                 return result[0] if result else 0
 
@@ -802,11 +1722,21 @@ class AsyncDatabase:
     async def clear_fields(self) -> bool:
         """Clear all fields (for reimporting)"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async def op(db):
+                # Clear the index in one statement rather than once per deleted row
+                await self._drop_fields_triggers(db)
                 await db.execute('DELETE FROM fields')
-                await db.commit()
+                await db.execute('DELETE FROM fields_fts')
+                await db.execute("""
+                    UPDATE catalog_versions
+                    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+                    WHERE name = 'fields'
+                """)
+                await self._create_fields_triggers(db)
                 return True
 
+            return await self.execute_write(op)
+
         except Exception as e:
             print(f"❌ Error clearing fields: {e}")
             return False
@@ -820,27 +1750,46 @@ class AsyncDatabase:
     ) -> Optional[Dict[str, Any]]:
         """Create a new extraction record"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async def op(db):
                 cursor = await db.execute("""
                     INSERT INTO extractions (document_id, workflow_id, zuva_file_id, status)
                     VALUES (?, ?, ?, 'pending')
                 """, (document_id, workflow_id, zuva_file_id))
+                return cursor.lastrowid
 
-                await db.commit()
-                extraction_id = cursor.lastrowid
+            extraction_id = await self.execute_write(op)
 
-                # Return the created extraction
-                return await self.get_extraction(extraction_id)
+            # Return the created extraction
+            return await self.get_extraction(extraction_id)
 
         except Exception as e:
             print(f"❌ Error creating extraction: {e}")
             return None
 
+    @staticmethod
+    def _decode_extraction(row) -> Dict[str, Any]:
+        """
+        Convert an extractions row to a dict with its result blobs decoded
+
+        An unreadable blob is returned as None and reported in decode_error
+        rather than passed off as an extraction without results.
+        """
+        extraction = dict(row)
+        for column in ('results', 'answer_metadata'):
+            if column not in extraction:
+                continue
+            try:
+                extraction[column] = decode_result_blob(extraction[column])
+            except ResultBlobError as e:
+                print(f"❌ Could not decode {column} of extraction {extraction.get('id')}: {e}")
+                extraction[column] = None
+                extraction['decode_error'] = f"Stored {column} could not be read: {e}"
+        return extraction
+
     async def get_extraction(self, extraction_id: int) -> Optional[Dict[str, Any]]:
         """Get extraction by ID"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.connection() as db:
                 cursor = await db.execute("""
                     SELECT id, document_id, workflow_id, zuva_file_id, zuva_request_id,
                            status, results, error_message, created_at, started_at, completed_at
@@ -849,14 +1798,7 @@ class AsyncDatabase:
 
                 row = await cursor.fetchone()
                 if row:
-                    extraction = dict(row)
-                    # Parse JSON results if present
-                    if extraction.get('results'):
-                        try:
-                            extraction['results'] = json.loads(extraction['results'])
-                        except (json.JSONDecodeError, TypeError):
-                            extraction['results'] = None
-                    return extraction
+                    return self._decode_extraction(row)
                 return None
 
         except Exception as e:
@@ -870,8 +1812,7 @@ class AsyncDatabase:
     ) -> Optional[Dict[str, Any]]:
         """Get extraction by document ID and workflow ID"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.connection() as db:
                 cursor = await db.execute("""
                     SELECT id, document_id, workflow_id, zuva_file_id, zuva_request_id,
                            status, results, answer_metadata, error_message, created_at, started_at, completed_at
@@ -881,40 +1822,88 @@ class AsyncDatabase:
 
                 row = await cursor.fetchone()
                 if row:
-                    extraction = dict(row)
-                    # Parse JSON results if present
-                    if extraction.get('results'):
-                        try:
-                            extraction['results'] = json.loads(extraction['results'])
-                        except (json.JSONDecodeError, TypeError):
-                            extraction['results'] = None
-                    # Parse JSON answer_metadata if present
-                    if extraction.get('answer_metadata'):
-                        try:
-                            extraction['answer_metadata'] = json.loads(extraction['answer_metadata'])
-                        except (json.JSONDecodeError, TypeError):
-                            extraction['answer_metadata'] = None
-                    return extraction
+                    return self._decode_extraction(row)
                 return None
 
         except Exception as e:
             print(f"❌ Error getting extraction by document and workflow: {e}")
             return None
 
-    async def update_extraction_status(
+    async def get_extraction_state(
         self,
-        extraction_id: int,
-        status: str,
-        zuva_request_id: Optional[str] = None,
-        error_message: Optional[str] = None
-    ) -> bool:
-        """Update extraction status"""
+        document_id: str,
+        workflow_id: int
+    ) -> Optional[Dict[str, Any]]:
+        """Get an extraction's status fields only; never reads the result blobs (for polling)"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                updates = ["status = ?"]
-                params = [status]
+            async with self.connection() as db:
+                cursor = await db.execute("""
+                    SELECT id, status, error_message, created_at, started_at, completed_at,
+                           stage, attempts, next_attempt_at
+                    FROM extractions
+                    WHERE document_id = ? AND workflow_id = ?
+                """, (document_id, workflow_id))
 
-                if zuva_request_id:
+                row = await cursor.fetchone()
+                return dict(row) if row else None
+
+        except Exception as e:
+            print(f"❌ Error getting extraction state: {e}")
+            return None
+
+    async def get_document_extraction_states(self, document_id: str) -> List[Dict[str, Any]]:
+        """Status fields of every extraction of a document, without result blobs (for event snapshots)"""
+        try:
+            async with self.connection() as db:
+                cursor = await db.execute("""
+                    SELECT id AS extraction_id, document_id, workflow_id, status, stage, attempts,
+                           next_attempt_at, error_message, created_at, started_at, completed_at
+                    FROM extractions
+                    WHERE document_id = ?
+                    ORDER BY workflow_id
+                """, (document_id,))
+                return [dict(row) for row in await cursor.fetchall()]
+
+        except Exception as e:
+            print(f"❌ Error getting document extraction states: {e}")
+            return []
+
+    async def get_extraction_metadata(self, extraction_id: int) -> Optional[Dict[str, Any]]:
+        """Get an extraction's columns except the result blobs, plus whether results exist"""
+        try:
+            async with self.connection() as db:
+                cursor = await db.execute("""
+                    SELECT id, document_id, workflow_id, zuva_file_id, zuva_request_id,
+                           status, error_message, created_at, started_at, completed_at,
+                           results IS NOT NULL AS has_results
+                    FROM extractions WHERE id = ?
+                """, (extraction_id,))
+
+                row = await cursor.fetchone()
+                if row:
+                    extraction = dict(row)
+                    extraction['has_results'] = bool(extraction['has_results'])
+                    return extraction
+                return None
+
+        except Exception as e:
+            print(f"❌ Error getting extraction metadata: {e}")
+            return None
+
+    async def update_extraction_status(
+        self,
+        extraction_id: int,
+        status: str,
+        zuva_request_id: Optional[str] = None,
+        error_message: Optional[str] = None
+    ) -> bool:
+        """Update extraction status"""
+        try:
+            async def op(db):
+                updates = ["status = ?"]
+                params = [status]
+
+                if zuva_request_id:
                     updates.append("zuva_request_id = ?")
                     params.append(zuva_request_id)
 
@@ -937,10 +1926,11 @@ class AsyncDatabase:
                 """
 
                 cursor = await db.execute(query, params)
-                await db.commit()
 
                 return cursor.rowcount > 0
 
+            return await self.execute_write(op)
+
         except Exception as e:
             print(f"❌ Error updating extraction status: {e}")
             return False
@@ -953,9 +1943,9 @@ class AsyncDatabase:
     ) -> bool:
         """Save extraction results and answer metadata"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                results_json = json.dumps(results)
-                answer_metadata_json = json.dumps(answer_metadata) if answer_metadata else None
+            async def op(db):
+                results_blob = encode_result_blob(results)
+                answer_metadata_blob = encode_result_blob(answer_metadata) if answer_metadata else None
 
                 await db.execute("""
                     UPDATE extractions
@@ -964,25 +1954,420 @@ class AsyncDatabase:
                         status = 'complete',
                         completed_at = CURRENT_TIMESTAMP
                     WHERE id = ?
-                """, (results_json, answer_metadata_json, extraction_id))
+                """, (results_blob, answer_metadata_blob, extraction_id))
 
-                await db.commit()
                 print(f"✅ Saved extraction results for extraction_id={extraction_id}")
                 if answer_metadata:
                     print(f"   📊 Saved answer metadata for {len(answer_metadata)} answer-type fields")
                 return True
 
+            return await self.execute_write(op)
+
         except Exception as e:
             print(f"❌ Error saving extraction results: {e}")
             import traceback
             traceback.print_exc()
             return False
 
+    async def update_extraction_file_id(self, extraction_id: int, zuva_file_id: str) -> bool:
+        """Record the Zuva file ID an extraction was uploaded as"""
+        try:
+            async def op(db):
+                cursor = await db.execute("""
+                    UPDATE extractions SET zuva_file_id = ? WHERE id = ?
+                """, (zuva_file_id, extraction_id))
+                return cursor.rowcount > 0
+
+            return await self.execute_write(op)
+
+        except Exception as e:
+            print(f"❌ Error updating extraction file ID: {e}")
+            return False
+
+    # Extraction job queue
+    # Pending rows are jobs; a worker claims one by taking a time-limited lease
+    # and renews it while working. Rows whose lease expired belong to a worker
+    # that died and are handed back to the queue by recover_extraction_jobs.
+
+    async def enqueue_extraction(
+        self,
+        document_id: str,
+        workflow_id: int,
+        document_path: str,
+        field_ids: List[str],
+        group_id: Optional[str] = None,
+        refresh: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Queue an extraction job; a row that is already being processed is left alone
+
+        Jobs sharing a group_id are claimed and run together as one Zuva request.
+        With refresh the job re-extracts every field instead of reusing cached field results.
+        """
+        try:
+            async def op(db):
+                await self._upsert_extraction_job(db, document_id, workflow_id, document_path, field_ids, group_id,
+                                                  refresh=refresh)
+
+                cursor = await db.execute(
+                    "SELECT id FROM extractions WHERE document_id = ? AND workflow_id = ?",
+                    (document_id, workflow_id)
+                )
+                row = await cursor.fetchone()
+                return row[0] if row else None
+
+            extraction_id = await self.execute_write(op)
+            return await self.get_extraction_metadata(extraction_id) if extraction_id else None
+
+        except Exception as e:
+            print(f"❌ Error enqueueing extraction: {e}")
+            return None
+
+    async def _upsert_extraction_job(self, db: aiosqlite.Connection, document_id: str, workflow_id: int,
+                                     document_path: str, field_ids: List[str], group_id: Optional[str] = None,
+                                     priority: int = 0, keep_statuses: Tuple[str, ...] = ('processing',),
+                                     refresh: bool = False):
+        """
+        Insert or reset a pending job row, leaving rows whose status is in `keep_statuses` untouched
+
+        A row that is already pending keeps its group and the more urgent of the
+        two priorities (lower runs first), so queueing a batch over a user's
+        on-demand job neither demotes it nor pulls it into the batch. It also
+        keeps a refresh that was already asked for.
+        """
+        placeholders = ','.join('?' * len(keep_statuses))
+        await db.execute(f"""
+            INSERT INTO extractions (document_id, workflow_id, status, document_path, field_ids,
+                                     group_id, priority, refresh_results, attempts, next_attempt_at)
+            VALUES (?, ?, 'pending', ?, ?, ?, ?, ?, 0, CURRENT_TIMESTAMP)
+            ON CONFLICT(document_id, workflow_id) DO UPDATE SET
+                status = 'pending',
+                document_path = excluded.document_path,
+                field_ids = excluded.field_ids,
+                group_id = CASE WHEN extractions.status = 'pending'
+                                THEN extractions.group_id ELSE excluded.group_id END,
+                priority = CASE WHEN extractions.status = 'pending'
+                                THEN MIN(extractions.priority, excluded.priority) ELSE excluded.priority END,
+                refresh_results = CASE WHEN extractions.status = 'pending'
+                                       THEN MAX(extractions.refresh_results, excluded.refresh_results)
+                                       ELSE excluded.refresh_results END,
+                zuva_file_id = NULL,
+                zuva_request_id = NULL,
+                stage = NULL,
+                error_message = NULL,
+                attempts = 0,
+                next_attempt_at = CURRENT_TIMESTAMP,
+                lease_owner = NULL,
+                lease_expires_at = NULL,
+                cancel_requested = 0,
+                stage_timings = NULL,
+                file_size = NULL,
+                field_count = NULL,
+                started_at = NULL,
+                completed_at = NULL
+            WHERE extractions.status NOT IN ({placeholders})
+        """, (document_id, workflow_id, document_path, json.dumps(field_ids), group_id, priority, int(refresh),
+              *keep_statuses))
+
+    async def claim_extraction_jobs(self, worker_id: str, limit: int = 1,
+                                    lease_seconds: int = 60) -> List[Dict[str, Any]]:
+        """Lease up to `limit` due jobs, plus the queued rest of their groups, and mark them processing"""
+        try:
+            async def op(db):
+                # The single writer serializes claims, so select-then-update cannot double-claim
+                cursor = await db.execute("""
+                    SELECT id FROM extractions
+                    WHERE status = 'pending'
+                      AND cancel_requested = 0
+                      AND document_path IS NOT NULL
+                      AND (next_attempt_at IS NULL OR next_attempt_at <= datetime('now'))
+                    ORDER BY priority, next_attempt_at, id
+                    LIMIT ?
+                """, (limit,))
+                ids = [row[0] for row in await cursor.fetchall()]
+                if not ids:
+                    return []
+
+                # A grouped job brings along the other queued rows of its group
+                placeholders = ','.join('?' * len(ids))
+                cursor = await db.execute(f"""
+                    SELECT id FROM extractions
+                    WHERE status = 'pending'
+                      AND cancel_requested = 0
+                      AND document_path IS NOT NULL
+                      AND group_id IN (
+                          SELECT group_id FROM extractions
+                          WHERE id IN ({placeholders}) AND group_id IS NOT NULL
+                      )
+                """, ids)
+                ids = list(dict.fromkeys(ids + [row[0] for row in await cursor.fetchall()]))
+
+                placeholders = ','.join('?' * len(ids))
+                await db.execute(f"""
+                    UPDATE extractions
+                    SET status = 'processing',
+                        lease_owner = ?,
+                        lease_expires_at = datetime('now', ?),
+                        attempts = attempts + 1,
+                        started_at = COALESCE(started_at, CURRENT_TIMESTAMP)
+                    WHERE id IN ({placeholders})
+                """, (worker_id, f'+{int(lease_seconds)} seconds', *ids))
+
+                # The document's upload-time hash saves re-reading the file (only while the path still matches)
+                cursor = await db.execute(f"""
+                    SELECT e.id, e.document_id, e.workflow_id, e.document_path, e.field_ids,
+                           e.zuva_file_id, e.zuva_request_id, e.group_id, e.attempts, e.refresh_results,
+                           d.content_hash
+                    FROM extractions e
+                    LEFT JOIN documents d ON d.id = e.document_id AND d.file_path = e.document_path
+                    WHERE e.id IN ({placeholders})
+                    ORDER BY e.id
+                """, ids)
+                jobs = []
+                for row in await cursor.fetchall():
+                    job = dict(row)
+                    job['field_ids'] = json.loads(job['field_ids']) if job['field_ids'] else []
+                    jobs.append(job)
+                return jobs
+
+            return await self.execute_write(op)
+
+        except Exception as e:
+            print(f"❌ Error claiming extraction jobs: {e}")
+            return []
+
+    async def renew_extraction_lease(self, extraction_id: int, worker_id: str,
+                                     lease_seconds: int = 60) -> bool:
+        """Extend a job's lease; False if the worker lost it or cancellation was requested"""
+        try:
+            async def op(db):
+                cursor = await db.execute("""
+                    UPDATE extractions SET lease_expires_at = datetime('now', ?)
+                    WHERE id = ? AND lease_owner = ? AND status = 'processing' AND cancel_requested = 0
+                """, (f'+{int(lease_seconds)} seconds', extraction_id, worker_id))
+                return cursor.rowcount > 0
+
+            return await self.execute_write(op)
+
+        except Exception as e:
+            print(f"❌ Error renewing extraction lease: {e}")
+            return False
+
+    async def set_extraction_stage(self, extraction_id: int, stage: str) -> bool:
+        """Record which pipeline stage a job is in"""
+        try:
+            async def op(db):
+                cursor = await db.execute(
+                    "UPDATE extractions SET stage = ? WHERE id = ?", (stage, extraction_id)
+                )
+                return cursor.rowcount > 0
+
+            return await self.execute_write(op)
+
+        except Exception as e:
+            print(f"❌ Error updating extraction stage: {e}")
+            return False
+
+    async def record_extraction_timings(self, extraction_id: int, timings: Dict[str, float],
+                                        file_size: Optional[int] = None,
+                                        field_count: Optional[int] = None) -> bool:
+        """Add one attempt's stage durations (seconds) to the row's totals and record payload sizes"""
+        try:
+            async def op(db):
+                cursor = await db.execute(
+                    "SELECT stage_timings FROM extractions WHERE id = ?", (extraction_id,)
+                )
+                row = await cursor.fetchone()
+                if not row:
+                    return False
+
+                totals = json.loads(row[0]) if row[0] else {}
+                for stage, seconds in timings.items():
+                    totals[stage] = round(totals.get(stage, 0.0) + seconds, 4)
+
+                await db.execute("""
+                    UPDATE extractions
+                    SET stage_timings = ?,
+                        file_size = COALESCE(?, file_size),
+                        field_count = COALESCE(?, field_count)
+                    WHERE id = ?
+                """, (json.dumps(totals), file_size, field_count, extraction_id))
+                return True
+
+            return await self.execute_write(op)
+
+        except Exception as e:
+            print(f"❌ Error recording extraction timings: {e}")
+            return False
+
+    async def get_extraction_timings(self, user_id: int, since_hours: float = 24, workflow_id: Optional[int] = None,
+                                     limit: int = 10000) -> List[Dict[str, Any]]:
+        """Timings and payload sizes of a user's extractions finished in the last `since_hours`, newest first"""
+        try:
+            async with self.connection() as db:
+                query = """
+                    SELECT e.id, e.workflow_id, e.status, e.attempts, e.stage_timings, e.file_size, e.field_count,
+                           LENGTH(e.results) AS results_size
+                    FROM extractions e
+                    JOIN documents d ON d.id = e.document_id
+                    WHERE d.user_id = ?
+                      AND e.stage_timings IS NOT NULL
+                      AND e.completed_at >= datetime('now', ?)
+                """
+                params: List[Any] = [user_id, f'-{float(since_hours)} hours']
+                if workflow_id is not None:
+                    query += " AND e.workflow_id = ?"
+                    params.append(workflow_id)
+                query += " ORDER BY e.completed_at DESC LIMIT ?"
+                params.append(limit)
+
+                cursor = await db.execute(query, params)
+                rows = []
+                for row in await cursor.fetchall():
+                    extraction = dict(row)
+                    extraction['stage_timings'] = json.loads(extraction['stage_timings'])
+                    rows.append(extraction)
+                return rows
+
+        except Exception as e:
+            print(f"❌ Error getting extraction timings: {e}")
+            return []
+
+    async def retry_extraction_job(self, extraction_id: int, worker_id: str, delay_seconds: float,
+                                   error_message: str, reset_request: bool = False,
+                                   reset_file: bool = False) -> bool:
+        """Return a leased job to the queue, due again after `delay_seconds`"""
+        try:
+            async def op(db):
+                cursor = await db.execute("""
+                    UPDATE extractions
+                    SET status = 'pending',
+                        error_message = ?,
+                        next_attempt_at = datetime('now', ?),
+                        zuva_request_id = CASE WHEN ? THEN NULL ELSE zuva_request_id END,
+                        zuva_file_id = CASE WHEN ? THEN NULL ELSE zuva_file_id END,
+                        lease_owner = NULL,
+                        lease_expires_at = NULL
+                    WHERE id = ? AND lease_owner = ? AND status = 'processing' AND cancel_requested = 0
+                """, (error_message, f'+{int(delay_seconds)} seconds', reset_request, reset_file,
+                      extraction_id, worker_id))
+                return cursor.rowcount > 0
+
+            return await self.execute_write(op)
+
+        except Exception as e:
+            print(f"❌ Error rescheduling extraction: {e}")
+            return False
+
+    async def release_extraction_job(self, extraction_id: int, worker_id: str) -> bool:
+        """Hand a leased job back to the queue without charging it an attempt (shutdown)"""
+        try:
+            async def op(db):
+                cursor = await db.execute("""
+                    UPDATE extractions
+                    SET status = 'pending',
+                        attempts = MAX(attempts - 1, 0),
+                        next_attempt_at = CURRENT_TIMESTAMP,
+                        lease_owner = NULL,
+                        lease_expires_at = NULL
+                    WHERE id = ? AND lease_owner = ? AND status = 'processing'
+                """, (extraction_id, worker_id))
+                return cursor.rowcount > 0
+
+            return await self.execute_write(op)
+
+        except Exception as e:
+            print(f"❌ Error releasing extraction: {e}")
+            return False
+
+    async def request_extraction_cancel(self, extraction_id: int) -> bool:
+        """Flag a queued or running job as cancelled; queued jobs fail immediately"""
+        try:
+            async def op(db):
+                cursor = await db.execute("""
+                    UPDATE extractions
+                    SET cancel_requested = 1,
+                        error_message = CASE WHEN status = 'pending' THEN 'Cancelled by user' ELSE error_message END,
+                        completed_at = CASE WHEN status = 'pending' THEN CURRENT_TIMESTAMP ELSE completed_at END,
+                        status = CASE WHEN status = 'pending' THEN 'failed' ELSE status END
+                    WHERE id = ? AND status IN ('pending', 'processing')
+                """, (extraction_id,))
+                return cursor.rowcount > 0
+
+            return await self.execute_write(op)
+
+        except Exception as e:
+            print(f"❌ Error requesting extraction cancel: {e}")
+            return False
+
+    async def finish_cancelled_extraction(self, extraction_id: int) -> bool:
+        """Mark a running job whose cancellation was requested as failed"""
+        try:
+            async def op(db):
+                cursor = await db.execute("""
+                    UPDATE extractions
+                    SET status = 'failed',
+                        error_message = 'Cancelled by user',
+                        completed_at = CURRENT_TIMESTAMP,
+                        lease_owner = NULL,
+                        lease_expires_at = NULL
+                    WHERE id = ? AND cancel_requested = 1 AND status = 'processing'
+                """, (extraction_id,))
+                return cursor.rowcount > 0
+
+            return await self.execute_write(op)
+
+        except Exception as e:
+            print(f"❌ Error finishing cancelled extraction: {e}")
+            return False
+
+    async def recover_extraction_jobs(self) -> Dict[str, int]:
+        """Requeue processing jobs whose lease expired; fail those that cannot be resumed"""
+        try:
+            async def op(db):
+                expired = "status = 'processing' AND (lease_expires_at IS NULL OR lease_expires_at < datetime('now'))"
+
+                cursor = await db.execute(f"""
+                    UPDATE extractions
+                    SET status = 'failed',
+                        error_message = 'Cancelled by user',
+                        completed_at = CURRENT_TIMESTAMP,
+                        lease_owner = NULL,
+                        lease_expires_at = NULL
+                    WHERE {expired} AND cancel_requested = 1
+                """)
+                cancelled = cursor.rowcount
+
+                # Rows started before the queue existed carry no job description
+                cursor = await db.execute(f"""
+                    UPDATE extractions
+                    SET status = 'failed',
+                        error_message = 'Interrupted by a server restart',
+                        completed_at = CURRENT_TIMESTAMP
+                    WHERE {expired} AND (document_path IS NULL OR field_ids IS NULL)
+                """)
+                failed = cursor.rowcount
+
+                cursor = await db.execute(f"""
+                    UPDATE extractions
+                    SET status = 'pending',
+                        next_attempt_at = CURRENT_TIMESTAMP,
+                        lease_owner = NULL,
+                        lease_expires_at = NULL
+                    WHERE {expired}
+                """)
+                return {'requeued': cursor.rowcount, 'failed': failed, 'cancelled': cancelled}
+
+            return await self.execute_write(op)
+
+        except Exception as e:
+            print(f"❌ Error recovering extraction jobs: {e}")
+            return {'requeued': 0, 'failed': 0, 'cancelled': 0}
+
     async def get_document_extractions(self, document_id: str) -> List[Dict[str, Any]]:
         """Get all extractions for a document"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.connection() as db:
                 cursor = await db.execute("""
                     SELECT id, document_id, workflow_id, zuva_file_id, zuva_request_id,
                            status, results, error_message, created_at, started_at, completed_at
@@ -995,14 +2380,7 @@ class AsyncDatabase:
                 extractions = []
 
                 for row in rows:
-                    extraction = dict(row)
-                    # Parse JSON results if present
-                    if extraction.get('results'):
-                        try:
-                            extraction['results'] = json.loads(extraction['results'])
-                        except (json.JSONDecodeError, TypeError):
-                            extraction['results'] = None
-                    extractions.append(extraction)
+                    extractions.append(self._decode_extraction(row))
 
                 return extractions
 
@@ -1010,24 +2388,494 @@ class AsyncDatabase:
             print(f"❌ Error getting document extractions: {e}")
             return []
 
+    async def get_extractions_with_workflows(
+        self,
+        document_id: str,
+        workflow_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Get a document's extractions joined with their workflow names in one query
+
+        Results and answer metadata are decoded once here. Pass workflow_id to
+        limit the result to a single document-workflow pair. Extractions are
+        newest first, keyset-paged on (created_at, id) when a limit is given;
+        returns (extractions, next_cursor).
+        """
+        after = None
+        if cursor:
+            after = decode_cursor(cursor)['after']
+            if len(after) != 2:
+                raise ValueError("Invalid pagination cursor")
+
+        try:
+            query = """
+                SELECT e.id, e.document_id, e.workflow_id, e.zuva_file_id, e.zuva_request_id,
+                       e.status, e.results, e.answer_metadata, e.error_message,
+                       e.created_at, e.started_at, e.completed_at,
+                       w.name AS workflow_name
+                FROM extractions e
+                LEFT JOIN workflows w ON w.id = e.workflow_id
+                WHERE e.document_id = ?
+            """
+            params: List[Any] = [document_id]
+
+            if workflow_id is not None:
+                query += ' AND e.workflow_id = ?'
+                params.append(workflow_id)
+
+            if after is not None:
+                query += ' AND (e.created_at, e.id) < (?, ?)'
+                params.extend(after)
+
+            query += ' ORDER BY e.created_at DESC, e.id DESC'
+
+            if limit:
+                query += ' LIMIT ?'
+                params.append(limit)
+
+            async with self.connection() as db:
+                cursor = await db.execute(query, params)
+                rows = await cursor.fetchall()
+
+            extractions = []
+            for row in rows:
+                extractions.append(self._decode_extraction(row))
+
+            next_cursor = None
+            if limit and len(extractions) == limit:
+                last = extractions[-1]
+                next_cursor = encode_cursor({'after': [last['created_at'], last['id']]})
+
+            return extractions, next_cursor
+
+        except Exception as e:
+            print(f"❌ Error getting extractions with workflows: {e}")
+            return [], None
+
+    # Extraction batches
+    # A batch links many document-workflow pairs; its progress is read live
+    # from the extraction rows, so it needs no updates as jobs finish.
+    async def create_extraction_batch(self, batch_id: str, user_id: int, jobs: List[Dict[str, Any]],
+                                      skipped: Optional[List[Dict[str, Any]]] = None,
+                                      priority: int = 1) -> Optional[Dict[str, Any]]:
+        """
+        Create a batch and queue its jobs in one transaction
+
+        `jobs` are queued at `priority` (document_id, workflow_id, document_path,
+        field_ids, group_id); pairs that are already complete or in progress
+        are tracked as they are rather than queued again. `skipped` pairs
+        (document_id, workflow_id, error) are recorded as not scheduled.
+        """
+        skipped = skipped or []
+        try:
+            async def op(db):
+                total = len(jobs) + len(skipped)
+                await db.execute(
+                    "INSERT INTO extraction_batches (id, user_id, total) VALUES (?, ?, ?)",
+                    (batch_id, user_id, total)
+                )
+
+                for job in jobs:
+                    await self._upsert_extraction_job(
+                        db, job['document_id'], job['workflow_id'], job['document_path'], job['field_ids'],
+                        job.get('group_id'), priority, keep_statuses=('processing', 'complete')
+                    )
+
+                await db.executemany("""
+                    INSERT OR IGNORE INTO extraction_batch_items (batch_id, document_id, workflow_id, error)
+                    VALUES (?, ?, ?, ?)
+                """, [(batch_id, job['document_id'], job['workflow_id'], None) for job in jobs]
+                     + [(batch_id, item['document_id'], item['workflow_id'], item['error']) for item in skipped])
+
+            await self.execute_write(op)
+            return await self.get_extraction_batch(batch_id, user_id)
+
+        except Exception as e:
+            print(f"❌ Error creating extraction batch: {e}")
+            return None
+
+    async def get_extraction_batch(self, batch_id: str, user_id: int) -> Optional[Dict[str, Any]]:
+        """Get a user's batch with item counts per current extraction status"""
+        try:
+            async with self.connection() as db:
+                cursor = await db.execute("""
+                    SELECT id, user_id, total, created_at FROM extraction_batches
+                    WHERE id = ? AND user_id = ?
+                """, (batch_id, user_id))
+                row = await cursor.fetchone()
+                if not row:
+                    return None
+                batch = dict(row)
+
+                cursor = await db.execute("""
+                    SELECT CASE
+                               WHEN i.error IS NOT NULL THEN 'skipped'
+                               WHEN e.id IS NULL THEN 'deleted'
+                               ELSE e.status
+                           END AS item_status,
+                           COUNT(*) AS count,
+                           MAX(e.completed_at) AS last_completed_at
+                    FROM extraction_batch_items i
+                    LEFT JOIN extractions e ON e.document_id = i.document_id AND e.workflow_id = i.workflow_id
+                    WHERE i.batch_id = ?
+                    GROUP BY item_status
+                """, (batch_id,))
+                rows = await cursor.fetchall()
+
+            batch['counts'] = {row['item_status']: row['count'] for row in rows}
+            batch['last_completed_at'] = max((row['last_completed_at'] for row in rows if row['last_completed_at']),
+                                             default=None)
+            return batch
+
+        except Exception as e:
+            print(f"❌ Error getting extraction batch: {e}")
+            return None
+
+    async def get_extraction_batch_items(self, batch_id: str, status: Optional[str] = None,
+                                         limit: int = 100,
+                                         cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Page through a batch's items with their extraction status (no results); returns (items, next_cursor)"""
+        after = None
+        if cursor:
+            after = decode_cursor(cursor)['after']
+            if len(after) != 1:
+                raise ValueError("Invalid pagination cursor")
+
+        try:
+            query = """
+                SELECT * FROM (
+                    SELECT i.id AS item_id, i.document_id, i.workflow_id,
+                           CASE
+                               WHEN i.error IS NOT NULL THEN 'skipped'
+                               WHEN e.id IS NULL THEN 'deleted'
+                               ELSE e.status
+                           END AS status,
+                           e.id AS extraction_id, e.stage, e.attempts,
+                           COALESCE(i.error, e.error_message) AS error_message,
+                           e.started_at, e.completed_at
+                    FROM extraction_batch_items i
+                    LEFT JOIN extractions e ON e.document_id = i.document_id AND e.workflow_id = i.workflow_id
+                    WHERE i.batch_id = ?
+                )
+                WHERE 1 = 1
+            """
+            params: List[Any] = [batch_id]
+
+            if status:
+                query += " AND status = ?"
+                params.append(status)
+
+            if after is not None:
+                query += " AND item_id > ?"
+                params.extend(after)
+
+            query += " ORDER BY item_id LIMIT ?"
+            params.append(limit)
+
+            async with self.connection() as db:
+                db_cursor = await db.execute(query, params)
+                items = [dict(row) for row in await db_cursor.fetchall()]
+
+            next_cursor = None
+            if len(items) == limit:
+                next_cursor = encode_cursor({'after': [items[-1]['item_id']]})
+
+            return items, next_cursor
+
+        except Exception as e:
+            print(f"❌ Error getting extraction batch items: {e}")
+            return [], None
+
+    async def get_extraction_batch_results(self, batch_id: str, limit: int = 20,
+                                           cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Page through a batch's completed extractions with decoded results
+
+        Ordered by completion time, so a client holding the last cursor picks up
+        only extractions that completed since its previous call. Rows from the
+        current second are held back until it has passed, since completed_at has
+        one-second resolution and later rows could otherwise sort before the
+        cursor. Returns (extractions, next_cursor).
+        """
+        after = None
+        if cursor:
+            after = decode_cursor(cursor)['after']
+            if len(after) != 2:
+                raise ValueError("Invalid pagination cursor")
+
+        try:
+            query = """
+                SELECT e.id, e.document_id, e.workflow_id, e.zuva_file_id, e.zuva_request_id,
+                       e.status, e.results, e.answer_metadata, e.error_message,
+                       e.created_at, e.started_at, e.completed_at,
+                       w.name AS workflow_name
+                FROM extraction_batch_items i
+                JOIN extractions e ON e.document_id = i.document_id AND e.workflow_id = i.workflow_id
+                LEFT JOIN workflows w ON w.id = e.workflow_id
+                WHERE i.batch_id = ? AND i.error IS NULL AND e.status = 'complete'
+                  AND e.completed_at < datetime('now', '-1 second')
+            """
+            params: List[Any] = [batch_id]
+
+            if after is not None:
+                query += " AND (e.completed_at, e.id) > (?, ?)"
+                params.extend(after)
+
+            query += " ORDER BY e.completed_at, e.id LIMIT ?"
+            params.append(limit)
+
+            async with self.connection() as db:
+                db_cursor = await db.execute(query, params)
+                rows = await db_cursor.fetchall()
+
+            extractions = []
+            for row in rows:
+                extractions.append(self._decode_extraction(row))
+
+            # Always hand back a position, so polling resumes after the last row seen
+            next_cursor = cursor
+            if extractions:
+                last = extractions[-1]
+                next_cursor = encode_cursor({'after': [last['completed_at'], last['id']]})
+
+            return extractions, next_cursor
+
+        except Exception as e:
+            print(f"❌ Error getting extraction batch results: {e}")
+            return [], cursor
+
+    # Zuva file reuse
+    async def get_zuva_file(self, content_hash: str, region: str,
+                            min_remaining_seconds: int = 3600) -> Optional[Dict[str, Any]]:
+        """Get a previously uploaded Zuva file for this content that stays valid long enough to use"""
+        try:
+            async with self.connection() as db:
+                cursor = await db.execute("""
+                    SELECT content_hash, region, zuva_file_id, size, created_at, expires_at
+                    FROM zuva_files
+                    WHERE content_hash = ? AND region = ?
+                      AND expires_at > datetime('now', ?)
+                """, (content_hash, region, f'+{int(min_remaining_seconds)} seconds'))
+
+                row = await cursor.fetchone()
+                return dict(row) if row else None
+
+        except Exception as e:
+            print(f"❌ Error getting Zuva file: {e}")
+            return None
+
+    async def save_zuva_file(self, content_hash: str, region: str, zuva_file_id: str,
+                             size: int, expires_at: str) -> bool:
+        """Record an uploaded Zuva file (expires_at in UTC, 'YYYY-MM-DD HH:MM:SS')"""
+        try:
+            async def op(db):
+                await db.execute("DELETE FROM zuva_files WHERE expires_at <= datetime('now')")
+                await db.execute("""
+                    INSERT INTO zuva_files (content_hash, region, zuva_file_id, size, expires_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(content_hash, region) DO UPDATE SET
+                        zuva_file_id = excluded.zuva_file_id,
+                        size = excluded.size,
+                        created_at = CURRENT_TIMESTAMP,
+                        expires_at = excluded.expires_at
+                """, (content_hash, region, zuva_file_id, size, expires_at))
+                return True
+
+            return await self.execute_write(op)
+
+        except Exception as e:
+            print(f"❌ Error saving Zuva file: {e}")
+            return False
+
+    async def invalidate_zuva_file(self, zuva_file_id: str) -> bool:
+        """Forget a Zuva file that upstream no longer accepts"""
+        try:
+            async def op(db):
+                cursor = await db.execute("DELETE FROM zuva_files WHERE zuva_file_id = ?", (zuva_file_id,))
+                return cursor.rowcount > 0
+
+            return await self.execute_write(op)
+
+        except Exception as e:
+            print(f"❌ Error invalidating Zuva file: {e}")
+            return False
+
+    # Field-level result cache
+    async def get_field_results(self, content_hash: str, field_ids: List[str],
+                                max_age_hours: Optional[float] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Cached per-field results for a document's content; returns (results, answer_metadata)
+
+        A result is only served while it is younger than `max_age_hours` and
+        its field's definition (last_updated in the fields catalog) hasn't
+        changed since it was extracted.
+        """
+        results: Dict[str, Any] = {}
+        answer_metadata: Dict[str, Any] = {}
+        try:
+            async with self.connection() as db:
+                # Stay well under SQLite's bound-parameter limit
+                for start in range(0, len(field_ids), 500):
+                    chunk = field_ids[start:start + 500]
+                    cursor = await db.execute(f"""
+                        SELECT r.field_id, r.results, r.answer_metadata
+                        FROM field_results r
+                        LEFT JOIN fields f ON f.field_id = r.field_id
+                        WHERE r.content_hash = ? AND r.field_id IN ({','.join('?' * len(chunk))})
+                          AND r.field_version IS f.last_updated
+                          AND (? IS NULL OR r.created_at >= datetime('now', ?))
+                    """, (content_hash, *chunk, max_age_hours, f'-{float(max_age_hours or 0)} hours'))
+
+                    for row in await cursor.fetchall():
+                        try:
+                            field_results = decode_result_blob(row['results'])
+                            answers = decode_result_blob(row['answer_metadata'])
+                        except ResultBlobError as e:
+                            # Treated as a miss, so the field is extracted again and the row replaced
+                            print(f"⚠️  Could not decode cached result for field {row['field_id']} "
+                                  f"of {content_hash[:12]}: {e}")
+                            continue
+                        if field_results is None:
+                            continue
+                        results[row['field_id']] = field_results
+                        if answers:
+                            answer_metadata[row['field_id']] = answers
+
+            return results, answer_metadata
+
+        except Exception as e:
+            print(f"❌ Error getting cached field results: {e}")
+            return {}, {}
+
+    async def save_field_results(self, content_hash: str, results: Dict[str, Any],
+                                 answer_metadata: Optional[Dict[str, Any]] = None) -> int:
+        """Cache freshly extracted per-field results for a document's content"""
+        answer_metadata = answer_metadata or {}
+        try:
+            rows = [
+                (
+                    content_hash,
+                    field_id,
+                    encode_result_blob(field_results),
+                    encode_result_blob(answer_metadata[field_id]) if field_id in answer_metadata else None
+                )
+                for field_id, field_results in results.items()
+            ]
+            if not rows:
+                return 0
+
+            async def op(db):
+                # Each result records the version of the field definition it was extracted with
+                await db.executemany("""
+                    INSERT INTO field_results (content_hash, field_id, results, answer_metadata, field_version)
+                    VALUES (?1, ?2, ?3, ?4, (SELECT last_updated FROM fields WHERE field_id = ?2))
+                    ON CONFLICT(content_hash, field_id) DO UPDATE SET
+                        results = excluded.results,
+                        answer_metadata = excluded.answer_metadata,
+                        field_version = excluded.field_version,
+                        created_at = CURRENT_TIMESTAMP
+                """, rows)
+                return len(rows)
+
+            return await self.execute_write(op)
+
+        except Exception as e:
+            print(f"❌ Error caching field results: {e}")
+            return 0
+
+    # Zuva field definitions
+    async def get_zuva_field_definitions(self, region: str) -> Tuple[Dict[str, Dict[str, Any]], Optional[int]]:
+        """Persisted Zuva field definitions by field_id, and when they were fetched (epoch seconds)"""
+        try:
+            async with self.connection() as db:
+                cursor = await db.execute("""
+                    SELECT field_id, definition, CAST(strftime('%s', fetched_at) AS INTEGER) AS fetched_epoch
+                    FROM zuva_field_definitions
+                    WHERE region = ?
+                """, (region,))
+
+                definitions = {}
+                fetched_at = None
+                for row in await cursor.fetchall():
+                    definitions[row['field_id']] = json.loads(row['definition'])
+                    fetched_at = row['fetched_epoch'] if fetched_at is None else min(fetched_at, row['fetched_epoch'])
+                return definitions, fetched_at
+
+        except Exception as e:
+            print(f"❌ Error getting Zuva field definitions: {e}")
+            return {}, None
+
+    async def replace_zuva_field_definitions(self, region: str, definitions: List[Dict[str, Any]]) -> int:
+        """Replace the persisted Zuva field definitions for a region in one transaction"""
+        try:
+            rows = [
+                (region, definition['field_id'], json.dumps(definition))
+                for definition in definitions if definition.get('field_id')
+            ]
+
+            async def op(db):
+                await db.execute("DELETE FROM zuva_field_definitions WHERE region = ?", (region,))
+                await db.executemany("""
+                    INSERT OR REPLACE INTO zuva_field_definitions (region, field_id, definition)
+                    VALUES (?, ?, ?)
+                """, rows)
+                return len(rows)
+
+            return await self.execute_write(op)
+
+        except Exception as e:
+            print(f"❌ Error saving Zuva field definitions: {e}")
+            return 0
+
     # Utility methods
+    async def get_catalog_version(self, name: str) -> int:
+        """Get the change counter for a cached table (0 if unknown)"""
+        try:
+            async with self.connection() as db:
+                cursor = await db.execute(
+                    'SELECT version FROM catalog_versions WHERE name = ?', (name,)
+                )
+                row = await cursor.fetchone()
+                return row['version'] if row else 0
+
+        except Exception as e:
+            print(f"❌ Error getting catalog version for {name}: {e}")
+            return 0
+
     async def get_connection(self):
-        """Get database connection with foreign keys enabled"""
-        conn = await aiosqlite.connect(self.db_path)
-        await conn.execute("PRAGMA foreign_keys = ON")
-        return conn
+        """Get a standalone (unpooled) connection with the standard PRAGMA setup; caller closes it"""
+        return await self._open_connection()
 
     async def close(self):
-        """Close database connections (for cleanup)"""
-        # aiosqlite doesn't maintain persistent connections, so nothing to close
-        pass
+        """Stop the writer and close all pooled connections (for cleanup)"""
+        self._closed = True
+        if self._writer_task is not None and not self._writer_task.done():
+            self._write_queue.put_nowait(None)
+            try:
+                await self._writer_task
+            except Exception as e:
+                print(f"⚠️  Error stopping database writer: {e}")
+
+        connections, self._pool_connections = self._pool_connections, []
+        while not self._pool.empty():
+            self._pool.get_nowait()
+
+        for conn in connections:
+            try:
+                await conn.close()
+            except Exception as e:
+                print(f"⚠️  Error closing database connection: {e}")
+
+        if connections:
+            print(f"✅ Closed {len(connections)} pooled database connection(s)")
 
     # Document type management methods
     async def get_document_types_hierarchical(self) -> List[Dict[str, Any]]:
         """Get all document types organized by category"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.connection() as db:
 
                 # Get all categories with their types
                 cursor = await db.execute("""
@@ -1074,11 +2922,62 @@ class AsyncDatabase:
             print(f"❌ Error getting hierarchical document types: {e}")
             return []
 
+    async def replace_document_types(self, categories: Dict[str, List[str]],
+                                     dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Replace all document categories and types in one transaction
+
+        Categories keep the order of the mapping; a category with no types gets a
+        standalone type of the same name. Nothing is written when the stored
+        hierarchy already matches. Returns counts and the added/removed entries.
+        """
+        desired = [
+            (category_name, list(types) if types else [category_name])
+            for category_name, types in categories.items()
+        ]
+
+        current = [
+            (category['name'], [doc_type['name'] for doc_type in category['types']])
+            for category in await self.get_document_types_hierarchical()
+        ]
+
+        desired_pairs = {(c, t) for c, types in desired for t in types}
+        current_pairs = {(c, t) for c, types in current for t in types}
+        stats: Dict[str, Any] = {
+            'categories': len(desired),
+            'types': len(desired_pairs),
+            'unchanged': desired == current,
+            'added': sorted(desired_pairs - current_pairs),
+            'removed': sorted(current_pairs - desired_pairs),
+        }
+
+        if dry_run or stats['unchanged']:
+            return stats
+
+        async def op(db):
+            await db.execute("DELETE FROM document_types")
+            await db.execute("DELETE FROM document_categories")
+
+            await db.executemany(
+                "INSERT INTO document_categories (name, display_order) VALUES (?, ?)",
+                [(category_name, order) for order, (category_name, _) in enumerate(desired, 1)]
+            )
+            await db.executemany("""
+                INSERT INTO document_types (category_id, name, display_order)
+                SELECT id, ?, ? FROM document_categories WHERE name = ?
+            """, [
+                (type_name, type_order, category_name)
+                for category_name, types in desired
+                for type_order, type_name in enumerate(types, 1)
+            ])
+
+        await self.execute_write(op)
+        return stats
+
     async def get_document_categories(self) -> List[Dict[str, Any]]:
         """Get all document categories"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.connection() as db:
                 cursor = await db.execute("""
                     SELECT id, name, display_order, created_at
                     FROM document_categories
@@ -1095,8 +2994,7 @@ class AsyncDatabase:
     async def get_document_types_by_category(self, category_id: int) -> List[Dict[str, Any]]:
         """Get all document types for a specific category"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.connection() as db:
                 cursor = await db.execute("""
                     SELECT id, category_id, name, display_order, created_at
                     FROM document_types
@@ -20,6 +20,7 @@ from database_async import AsyncDatabase
 async def get_count():
     db = AsyncDatabase()
     count = await db.get_field_count()
+    await db.close()
     print(count, end='')
 
 asyncio.run(get_count())
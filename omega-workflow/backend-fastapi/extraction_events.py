@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Extraction Events
+In-process fan-out of extraction state changes to streaming subscribers
+"""
+
+import asyncio
+import os
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Callable
+
+# Recent events kept for replay when a client reconnects with its last event id
+EXTRACTION_EVENT_BUFFER = int(os.getenv('EXTRACTION_EVENT_BUFFER', '2000'))
+
+# Undelivered events a slow subscriber may hold before it is dropped (and must reconnect)
+EXTRACTION_EVENT_QUEUE_SIZE = int(os.getenv('EXTRACTION_EVENT_QUEUE_SIZE', '500'))
+
+EventFilter = Callable[[Dict[str, Any]], bool]
+
+
+class EventSubscription:
+    """One subscriber's view of the bus: events to replay first, then a live queue"""
+
+    def __init__(self, bus: 'ExtractionEventBus', matches: EventFilter, queue_size: int):
+        self.bus = bus
+        self.matches = matches
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.replay: List[Dict[str, Any]] = []
+        # True when the cursor could not be resumed and the client needs a fresh snapshot
+        self.resync = False
+        # Event id the subscription starts after (the id to give a snapshot)
+        self.position: Optional[str] = None
+        self.overflowed = False
+        self._last_seq = 0
+
+    def offer(self, event: Dict[str, Any]):
+        """Queue a live event if it matches; drop the subscriber if it has fallen too far behind"""
+        if self.overflowed or not self.matches(event):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.bus.unsubscribe(self)
+            # Wake the reader so it can end the stream; the client resumes from its cursor
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def next(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next undelivered event, or None after `timeout` seconds (or once overflowed)"""
+        while True:
+            try:
+                event = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                return None
+            if event is None:
+                return None
+            # Events already sent during replay may also have been queued live
+            if event['seq'] > self._last_seq:
+                self._last_seq = event['seq']
+                return event
+
+    def mark_sent(self, event: Dict[str, Any]):
+        """Record a replayed event as delivered"""
+        self._last_seq = max(self._last_seq, event['seq'])
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class ExtractionEventBus:
+    """
+    Extraction event bus
+
+    ExtractionService publishes every state and stage transition here; each
+    streaming connection subscribes with a filter (e.g. one document). Event
+    ids are '<epoch>-<seq>': the epoch changes with every process start, so a
+    cursor from before a restart, or older than the replay buffer, is
+    detected and the subscriber is told to resync from a snapshot instead of
+    silently missing events. Events are not shared between processes.
+    """
+
+    def __init__(self, buffer_size: int = EXTRACTION_EVENT_BUFFER,
+                 queue_size: int = EXTRACTION_EVENT_QUEUE_SIZE):
+        """
+        Initialize event bus
+
+        Args:
+            buffer_size: Recent events kept for replay
+            queue_size: Per-subscriber backlog before the subscriber is dropped
+        """
+        self.epoch = uuid.uuid4().hex[:8]
+        self.queue_size = queue_size
+        self._seq = 0
+        self._buffer: deque = deque(maxlen=max(1, buffer_size))
+        self._subscribers: set = set()
+
+    @property
+    def position(self) -> str:
+        """Id of the latest published event (or of the stream start)"""
+        return f"{self.epoch}-{self._seq}"
+
+    def publish(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Stamp an event with its id and time, buffer it and deliver it to subscribers"""
+        self._seq += 1
+        event = {
+            **event,
+            'id': f"{self.epoch}-{self._seq}",
+            'seq': self._seq,
+            'at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+        }
+        self._buffer.append(event)
+        for subscription in list(self._subscribers):
+            subscription.offer(event)
+        return event
+
+    def subscribe(self, matches: EventFilter, cursor: Optional[str] = None) -> EventSubscription:
+        """
+        Subscribe to matching events
+
+        With a cursor (the last event id the client saw) the buffered events
+        after it are set up for replay; without one, or if it cannot be
+        resumed, the subscription is flagged for resync.
+        """
+        subscription = EventSubscription(self, matches, self.queue_size)
+        subscription.position = self.position
+        self._subscribers.add(subscription)
+
+        after = self._parse_cursor(cursor)
+        if after is None:
+            subscription.resync = True
+            subscription._last_seq = self._seq
+        else:
+            subscription.replay = [event for event in self._buffer if event['seq'] > after and matches(event)]
+            subscription._last_seq = after
+        return subscription
+
+    def unsubscribe(self, subscription: EventSubscription):
+        self._subscribers.discard(subscription)
+
+    def _parse_cursor(self, cursor: Optional[str]) -> Optional[int]:
+        """Sequence number to resume after, or None if the cursor cannot be resumed"""
+        if not cursor:
+            return None
+        epoch, _, seq = cursor.partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        after = int(seq)
+        oldest = self._buffer[0]['seq'] if self._buffer else self._seq + 1
+        # Events between the cursor and the oldest buffered one are gone
+        if after > self._seq or after < oldest - 1:
+            return None
+        return after
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
@@ -6,11 +6,167 @@ Coordinates document field extraction using Zuva API
 
 import os
 import asyncio
-from typing import Optional, List, Dict, Any
+import hashlib
+import json
+import re
+import socket
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, Tuple
 from pathlib import Path
 
-from zuva_client import ZuvaClient, ZuvaAPIError
+from zuva_client import ZuvaClient, ZuvaAPIError, ZuvaAuthenticationError, ZuvaExtractionError, ZuvaTimeoutError
 from database_async import AsyncDatabase
+from field_definitions import FieldDefinitionCache
+from extraction_events import ExtractionEventBus
+
+# Job queue settings (overridable via environment)
+EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', '4'))
+EXTRACTION_MAX_ATTEMPTS = int(os.getenv('EXTRACTION_MAX_ATTEMPTS', '3'))
+EXTRACTION_RETRY_BASE_SECONDS = float(os.getenv('EXTRACTION_RETRY_BASE_SECONDS', '10'))
+EXTRACTION_RETRY_MAX_SECONDS = float(os.getenv('EXTRACTION_RETRY_MAX_SECONDS', '300'))
+EXTRACTION_LEASE_SECONDS = int(os.getenv('EXTRACTION_LEASE_SECONDS', '60'))
+EXTRACTION_POLL_SECONDS = float(os.getenv('EXTRACTION_POLL_SECONDS', '2'))
+
+# Bulk batches: size cap, and the queue priority their jobs run at (0 = interactive, claimed first)
+EXTRACTION_BATCH_MAX_PAIRS = int(os.getenv('EXTRACTION_BATCH_MAX_PAIRS', '10000'))
+EXTRACTION_BATCH_PRIORITY = 1
+
+# Zuva accepts at most this many field IDs per extraction request
+ZUVA_MAX_FIELDS_PER_REQUEST = 100
+
+# Uploaded Zuva files are reused by content hash until shortly before they expire
+ZUVA_FILE_TTL_HOURS = float(os.getenv('ZUVA_FILE_TTL_HOURS', '24'))
+ZUVA_FILE_MIN_REMAINING_SECONDS = int(os.getenv('ZUVA_FILE_MIN_REMAINING_SECONDS', '3600'))
+
+# Cached per-field results older than this are extracted again
+FIELD_RESULT_CACHE_TTL_HOURS = float(os.getenv('FIELD_RESULT_CACHE_TTL_HOURS', str(24 * 30)))
+
+
+# Zuva field IDs are UUIDs
+UUID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
+
+# Timed pipeline stages, in order, and the file size buckets metrics are split by
+EXTRACTION_STAGES = ('hash', 'cache', 'upload', 'request', 'wait', 'fetch', 'parse', 'enrich', 'save')
+FILE_SIZE_BUCKETS = (
+    (100 * 1024, '<100KB'),
+    (1024 * 1024, '100KB-1MB'),
+    (10 * 1024 * 1024, '1MB-10MB'),
+    (None, '>=10MB'),
+)
+
+
+class PermanentExtractionError(Exception):
+    """Raised when an extraction job cannot succeed however often it is retried"""
+    pass
+
+
+class NoWorkflowsAssignedError(Exception):
+    """Raised when a document-level extraction is requested for a document without workflows"""
+    pass
+
+
+# Failures that another attempt cannot fix; anything else (including malformed Zuva responses) is retried
+PERMANENT_ERRORS = (ZuvaAuthenticationError, PermanentExtractionError)
+
+
+def file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> Tuple[str, int]:
+    """Hash a file's content; returns (hex digest, size in bytes)"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def zuva_file_expiry(upload_metadata: Dict[str, Any]) -> str:
+    """UTC expiry of an uploaded file as a SQLite timestamp, from Zuva's response or the default TTL"""
+    expires = None
+    expiration = upload_metadata.get('expiration') if upload_metadata else None
+    if expiration:
+        try:
+            expires = datetime.fromisoformat(str(expiration).replace('Z', '+00:00'))
+            if expires.tzinfo is None:
+                expires = expires.replace(tzinfo=timezone.utc)
+        except ValueError:
+            expires = None
+    if expires is None:
+        expires = datetime.now(timezone.utc) + timedelta(hours=ZUVA_FILE_TTL_HOURS)
+    return expires.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+@contextmanager
+def stage_timer(timings: Dict[str, float], stage: str):
+    """Add the wall time spent in the block to timings[stage]"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - started
+
+
+def file_size_bucket(size: Optional[int]) -> str:
+    """Label of the FILE_SIZE_BUCKETS bucket a file size falls in"""
+    if size is None:
+        return 'unknown'
+    for limit, label in FILE_SIZE_BUCKETS:
+        if limit is None or size < limit:
+            return label
+
+
+def percentile_summary(values: List[float]) -> Dict[str, Any]:
+    """Count and nearest-rank p50/p95/p99/max of a list of values"""
+    ordered = sorted(values)
+    summary: Dict[str, Any] = {'count': len(ordered)}
+    for name, pct in (('p50', 50), ('p95', 95), ('p99', 99), ('max', 100)):
+        if ordered:
+            rank = max(1, -(-pct * len(ordered) // 100))
+            summary[name] = round(ordered[rank - 1], 3)
+        else:
+            summary[name] = None
+    return summary
+
+
+def summarize_extraction_timings(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-stage percentiles overall, per workflow and per file size bucket, plus payload sizes"""
+    def stage_percentiles(group: List[Dict[str, Any]]) -> Dict[str, Any]:
+        stages = [stage for stage in EXTRACTION_STAGES + ('total',)
+                  if any(stage in row['stage_timings'] for row in group)]
+        return {
+            stage: percentile_summary([row['stage_timings'][stage] for row in group if stage in row['stage_timings']])
+            for stage in stages
+        }
+
+    by_workflow: Dict[int, List[Dict[str, Any]]] = {}
+    by_size: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        by_workflow.setdefault(row['workflow_id'], []).append(row)
+        by_size.setdefault(file_size_bucket(row.get('file_size')), []).append(row)
+
+    size_order = [label for _, label in FILE_SIZE_BUCKETS] + ['unknown']
+    return {
+        'extractions': len(rows),
+        'status': dict(Counter(row['status'] for row in rows)),
+        'stages': stage_percentiles(rows),
+        'payload': {
+            'file_size': percentile_summary([row['file_size'] for row in rows if row.get('file_size') is not None]),
+            'field_count': percentile_summary([row['field_count'] for row in rows if row.get('field_count') is not None]),
+            'results_size': percentile_summary([row['results_size'] for row in rows if row.get('results_size') is not None]),
+        },
+        'by_workflow': {
+            str(workflow_id): {'extractions': len(group), 'stages': stage_percentiles(group)}
+            for workflow_id, group in sorted(by_workflow.items())
+        },
+        'by_file_size': {
+            label: {'extractions': len(by_size[label]), 'stages': stage_percentiles(by_size[label])}
+            for label in size_order if label in by_size
+        },
+    }
 
 
 class ExtractionService:
@@ -22,22 +178,154 @@ class ExtractionService:
     - Zuva API integration
     - Database state management
     - Error handling and retries
+
+    Extractions are queued in the extractions table and run by a fixed pool of
+    workers, so Zuva concurrency is bounded by the pool size. Each running job
+    holds a lease that its worker renews; jobs left behind by a crashed or
+    restarted process are picked up again once their lease expires, resuming
+    from the last completed stage.
     """
 
-    def __init__(self, db: AsyncDatabase, zuva_token: Optional[str] = None):
+    def __init__(
+        self,
+        db: AsyncDatabase,
+        zuva_token: Optional[str] = None,
+        max_workers: int = EXTRACTION_WORKERS,
+        max_attempts: int = EXTRACTION_MAX_ATTEMPTS,
+        lease_seconds: int = EXTRACTION_LEASE_SECONDS
+    ):
         """
         Initialize extraction service
 
         Args:
             db: Database instance
             zuva_token: Zuva API token (from env if not provided)
+            max_workers: Number of extractions processed concurrently
+            max_attempts: Attempts per job before it is marked failed
+            lease_seconds: How long a job stays claimed without a heartbeat
         """
         self.db = db
         self.zuva_token = zuva_token or os.getenv('ZUVA_API_TOKEN')
         self.zuva_client = None
 
+        self.max_workers = max(1, max_workers)
+        self.max_attempts = max(1, max_attempts)
+        self.lease_seconds = max(3, lease_seconds)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[int, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+
+        # Zuva field definitions (answer options), persisted and shared by all jobs
+        self.field_definitions = FieldDefinitionCache(db)
+
+        # In-flight uploads by (content hash, region), so concurrent jobs for one file upload it once
+        self._uploads: Dict[Tuple[str, str], asyncio.Future] = {}
+
+        # State and stage transitions, streamed to subscribed clients
+        self.events = ExtractionEventBus()
+
         print(f"✅ Extraction service initialized")
 
+    # Worker pool
+
+    async def start(self):
+        """Recover orphaned jobs and start the worker pool"""
+        if self._workers:
+            return
+
+        recovered = await self.db.recover_extraction_jobs()
+        if any(recovered.values()):
+            print(f"♻️  Recovered extraction jobs: {recovered['requeued']} requeued, "
+                  f"{recovered['failed']} failed, {recovered['cancelled']} cancelled")
+
+        self._workers = [asyncio.create_task(self._worker_loop()) for _ in range(self.max_workers)]
+        self._workers.append(asyncio.create_task(self._reaper_loop()))
+        print(f"👷 Started {self.max_workers} extraction worker(s) as {self.worker_id}")
+
+    async def _worker_loop(self):
+        """Claim and run jobs until the service stops"""
+        while True:
+            # Cleared before claiming, so a job queued while the claim runs still wakes us:
+            # it is committed before the event is set, so either this claim sees it or the set survives
+            self._wakeup.clear()
+
+            # One claim yields one unit of work: a single job, or every queued row of a document group
+            jobs = await self.db.claim_extraction_jobs(self.worker_id, limit=1, lease_seconds=self.lease_seconds)
+            if not jobs:
+                # Sleep until a new job is queued or the next retry may be due
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=EXTRACTION_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._publish(jobs, 'processing', attempts=max(job['attempts'] for job in jobs))
+            await self._run_jobs(jobs)
+
+    async def _reaper_loop(self):
+        """Periodically requeue jobs whose worker stopped renewing its lease"""
+        while True:
+            await asyncio.sleep(self.lease_seconds)
+            recovered = await self.db.recover_extraction_jobs()
+            if any(recovered.values()):
+                print(f"♻️  Recovered extraction jobs: {recovered}")
+                self._wakeup.set()
+
+    async def _run_jobs(self, jobs: List[Dict[str, Any]]):
+        """Run one claimed unit of work with a lease heartbeat; stop it when cancelled"""
+        extraction_ids = [job['id'] for job in jobs]
+        task = asyncio.create_task(self._process_extraction(jobs))
+        heartbeat = asyncio.create_task(self._heartbeat(extraction_ids, task))
+        for extraction_id in extraction_ids:
+            self._running[extraction_id] = task
+
+        try:
+            await asyncio.wait({task})
+        except asyncio.CancelledError:
+            # Shutting down: stop the work and hand it back for the next start
+            task.cancel()
+            await asyncio.wait({task})
+            for extraction_id in extraction_ids:
+                await self.db.release_extraction_job(extraction_id, self.worker_id)
+            raise
+        finally:
+            heartbeat.cancel()
+            for extraction_id in extraction_ids:
+                self._running.pop(extraction_id, None)
+
+        if task.cancelled():
+            for extraction_id in extraction_ids:
+                job = next(job for job in jobs if job['id'] == extraction_id)
+                if await self.db.finish_cancelled_extraction(extraction_id):
+                    print(f"🛑 Extraction {extraction_id} cancelled")
+                    self._publish([job], 'failed', error_message='Cancelled by user')
+                else:
+                    # Group members that were not cancelled themselves run again without it
+                    await self.db.release_extraction_job(extraction_id, self.worker_id)
+                    self._publish([job], 'pending')
+        elif task.exception() is not None:
+            # Escaped _process_extraction's own handling (e.g. a failed status write):
+            # settle the jobs now instead of leaving them leased until the reaper runs
+            error = task.exception()
+            try:
+                await self._retry_or_fail(jobs, f"Extraction processing error: {error}")
+            except Exception as e:
+                print(f"❌ Could not reschedule extractions {extraction_ids} after {error}: {e}")
+
+    async def _heartbeat(self, extraction_ids: List[int], task: asyncio.Task):
+        """Renew the leases; stop the work if a lease is lost or a job was cancelled"""
+        while not task.done():
+            await asyncio.sleep(self.lease_seconds / 3)
+            for extraction_id in extraction_ids:
+                if task.done():
+                    return
+                if not await self.db.renew_extraction_lease(extraction_id, self.worker_id, self.lease_seconds):
+                    print(f"⚠️  Lost lease on extraction {extraction_id} (cancelled or reclaimed), stopping")
+                    task.cancel()
+                    return
+
     async def _get_zuva_client(self) -> ZuvaClient:
         """Get or create Zuva client instance"""
         if not self.zuva_client:
@@ -48,7 +336,8 @@ class ExtractionService:
         self,
         document_id: str,
         workflow_id: int,
-        document_path: str
+        document_path: str,
+        refresh: bool = False
     ) -> Dict[str, Any]:
         """
         Start extraction process for a document-workflow pair
@@ -57,6 +346,7 @@ class ExtractionService:
             document_id: Document ID
             workflow_id: Workflow ID
             document_path: Path to document file
+            refresh: Re-extract a completed extraction, bypassing cached field results
 
         Returns:
             Extraction record with status
@@ -64,130 +354,31 @@ class ExtractionService:
         try:
             print(f"🚀 Starting extraction for document={document_id}, workflow={workflow_id}")
 
-            # Check if extraction already exists
-            existing = await self.db.get_extraction_by_document_workflow(
-                document_id, workflow_id
-            )
-
-            if existing:
-                if existing['status'] == 'complete':
-                    print(f"✅ Extraction already complete, returning cached results")
-                    return existing
-                elif existing['status'] == 'processing':
-                    print(f"⏳ Extraction already in progress")
-                    return existing
-                elif existing['status'] == 'failed':
-                    print(f"🔄 Previous extraction failed, retrying...")
-                    # Continue to retry
-
-            # Get workflow to retrieve field IDs
-            # We need to get the workflow without user_id check for extraction
-            import aiosqlite
-            async with aiosqlite.connect(self.db.db_path) as db:
-                db.row_factory = aiosqlite.Row
-                cursor = await db.execute("""
-                    SELECT id, user_id, name, description, fields, document_types, status, created_at, updated_at
-                    FROM workflows WHERE id = ?
-                """, (workflow_id,))
-                row = await cursor.fetchone()
-                workflow = dict(row) if row else None
-
-            if not workflow:
-                raise ValueError(f"Workflow not found: {workflow_id}")
-
-            # Parse field IDs from workflow
-            import json
-            fields_data = json.loads(workflow.get('fields', '[]'))
-
-            # Extract field IDs - handle both object format and string format
-            field_ids = []
-
-            # Handle list format (array of objects or strings)
-            if isinstance(fields_data, list):
-                for field in fields_data:
-                    if isinstance(field, dict):
-                        # Object format: {"name": "Title", "fieldId": "uuid"}
-                        field_id = field.get('fieldId') or field.get('field_id')
-                        if field_id:
-                            field_ids.append(field_id)
-                    elif isinstance(field, str):
-                        # String format: "uuid"
-                        field_ids.append(field)
-
-            # Handle nested category format (dict of arrays)
-            elif isinstance(fields_data, dict):
-                for category_name, category_fields in fields_data.items():
-                    if isinstance(category_fields, list):
-                        for field in category_fields:
-                            if isinstance(field, dict):
-                                field_id = field.get('fieldId') or field.get('field_id')
-                                if field_id:
-                                    field_ids.append(field_id)
-                            elif isinstance(field, str):
-                                field_ids.append(field)
-
-            if not field_ids:
-                raise ValueError(f"No fields configured in workflow {workflow_id}")
-
-            # Validate field IDs are valid UUIDs
-            import re
-            UUID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
-
-            validated_field_ids = []
-            invalid_fields = []
-
-            for fid in field_ids:
-                if UUID_PATTERN.match(str(fid)):
-                    validated_field_ids.append(fid)
-                else:
-                    invalid_fields.append(fid)
-
-            # Deduplicate validated field IDs
-            validated_field_ids = list(dict.fromkeys(validated_field_ids))
-
-            if invalid_fields:
-                print(f"⚠️  Warning: {len(invalid_fields)} invalid field IDs filtered out from workflow {workflow_id}")
-                for inv_field in invalid_fields[:5]:  # Show first 5
-                    print(f"   - Invalid: '{inv_field}' (not a valid UUID)")
-                if len(invalid_fields) > 5:
-                    print(f"   ... and {len(invalid_fields) - 5} more")
-
-            if not validated_field_ids:
-                raise ValueError(
-                    f"No valid field IDs found in workflow {workflow_id}. "
-                    f"All {len(field_ids)} fields were invalid or missing fieldId. "
-                    f"Fields must be valid UUIDs in format: xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx"
-                )
+            # Check if extraction already exists (status only - results aren't needed here)
+            existing = await self.db.get_extraction_state(document_id, workflow_id)
+            if self._is_settled(existing, refresh):
+                return existing
 
-            field_ids = validated_field_ids
+            field_ids = await self._get_workflow_field_ids(workflow_id)
 
             print(f"📋 Extracting {len(field_ids)} fields")
             print(f"   Field IDs: {field_ids[:3]}{'...' if len(field_ids) > 3 else ''}")
 
-            # Create or update extraction record
-            if existing:
-                extraction_id = existing['id']
-                await self.db.update_extraction_status(extraction_id, 'pending')
-                extraction = await self.db.get_extraction(extraction_id)
-            else:
-                extraction = await self.db.create_extraction(
-                    document_id=document_id,
-                    workflow_id=workflow_id
-                )
+            # Queue the job; a worker from the pool picks it up
+            extraction = await self.db.enqueue_extraction(
+                document_id=document_id,
+                workflow_id=workflow_id,
+                document_path=document_path,
+                field_ids=field_ids,
+                refresh=refresh
+            )
 
             if not extraction:
                 raise ValueError("Failed to create extraction record")
 
-            extraction_id = extraction['id']
-
-            # Start async extraction in background
-            asyncio.create_task(
-                self._process_extraction(
-                    extraction_id=extraction_id,
-                    document_path=document_path,
-                    field_ids=field_ids
-                )
-            )
+            self._wakeup.set()
+            self._publish([extraction], extraction['status'])
+            print(f"📥 Queued extraction {extraction['id']}")
 
             return extraction
 
@@ -195,116 +386,574 @@ class ExtractionService:
             print(f"❌ Error starting extraction: {e}")
             raise
 
-    async def _process_extraction(
+    async def start_document_extraction(
         self,
-        extraction_id: int,
+        document_id: str,
         document_path: str,
-        field_ids: List[str]
-    ):
+        refresh: bool = False
+    ) -> Dict[str, Any]:
         """
-        Process extraction in background
+        Start one combined extraction for every workflow assigned to a document
+
+        The field IDs of all workflows are merged into a single Zuva request
+        (split into chunks of ZUVA_MAX_FIELDS_PER_REQUEST) and the results are
+        split back into each workflow's extraction row.
 
         Args:
-            extraction_id: Extraction record ID
+            document_id: Document ID
             document_path: Path to document file
-            field_ids: List of field IDs to extract
+            refresh: Re-extract completed workflows, bypassing cached field results
+
+        Returns:
+            Group ID and the extraction record of each workflow; workflows
+            without valid fields are listed with status 'skipped' and an error
+
+        Raises:
+            NoWorkflowsAssignedError: If no workflow is assigned to the document
         """
         try:
-            # Update status to processing
-            await self.db.update_extraction_status(extraction_id, 'processing')
-            print(f"⚙️  Processing extraction {extraction_id}")
+            workflow_ids = await self.db.get_document_workflows(document_id)
+            if not workflow_ids:
+                raise NoWorkflowsAssignedError(f"No workflows assigned to document {document_id}")
+
+            print(f"🚀 Starting document extraction for document={document_id}, workflows={workflow_ids}")
+
+            group_id = uuid.uuid4().hex
+            extractions = []
+            union = set()
+
+            for workflow_id in workflow_ids:
+                existing = await self.db.get_extraction_state(document_id, workflow_id)
+                if self._is_settled(existing, refresh):
+                    extractions.append({**existing, 'workflow_id': workflow_id})
+                    continue
+
+                try:
+                    field_ids = await self._get_workflow_field_ids(workflow_id)
+                except ValueError as e:
+                    # One misconfigured workflow must not block the others, but the caller is told about it
+                    print(f"⚠️  Skipping workflow {workflow_id}: {e}")
+                    extractions.append({'id': None, 'workflow_id': workflow_id, 'status': 'skipped', 'error': str(e)})
+                    continue
+
+                extraction = await self.db.enqueue_extraction(
+                    document_id=document_id,
+                    workflow_id=workflow_id,
+                    document_path=document_path,
+                    field_ids=field_ids,
+                    group_id=group_id,
+                    refresh=refresh
+                )
+                if not extraction:
+                    raise ValueError(f"Failed to create extraction record for workflow {workflow_id}")
 
-            # Get Zuva client
-            client = await self._get_zuva_client()
+                union.update(field_ids)
+                extractions.append(extraction)
+                self._publish([extraction], extraction['status'])
 
-            # Step 1: Upload file to Zuva (with timeout)
-            print(f"📤 Uploading file to Zuva...")
-            try:
-                file_id, file_metadata = await asyncio.wait_for(
-                    client.upload_file(document_path),
-                    timeout=60.0  # 60 second timeout for upload
-                )
-            except asyncio.TimeoutError:
-                raise ZuvaAPIError("File upload timeout after 60 seconds")
-
-            # Update extraction with Zuva file ID
-            extraction = await self.db.get_extraction(extraction_id)
-            if extraction:
-                # Store zuva_file_id
-                import aiosqlite
-                async with aiosqlite.connect(self.db.db_path) as db:
-                    await db.execute("""
-                        UPDATE extractions SET zuva_file_id = ? WHERE id = ?
-                    """, (file_id, extraction_id))
-                    await db.commit()
-
-            # Step 2: Request extraction (with timeout)
-            print(f"🔍 Requesting field extraction...")
+            if union:
+                self._wakeup.set()
+                print(f"📥 Queued document extraction {group_id}: {len(union)} unique fields")
+
+            return {'group_id': group_id if union else None, 'extractions': extractions}
+
+        except Exception as e:
+            print(f"❌ Error starting document extraction: {e}")
+            raise
+
+    async def start_batch_extraction(
+        self,
+        user_id: int,
+        documents: List[Dict[str, Any]],
+        workflow_ids: List[int]
+    ) -> Dict[str, Any]:
+        """
+        Queue every document x workflow pair as one batch
+
+        Each document's workflows share a group, so a document costs one
+        combined Zuva request however many workflows it runs. Batch jobs are
+        queued below interactive extractions and run on the same bounded
+        worker pool, so a large batch never starves single-document requests.
+        Pairs whose extraction is already complete or in progress are tracked
+        as they are; pairs that cannot run (missing file, workflow without
+        valid fields) are recorded as skipped.
+
+        Args:
+            user_id: Owner of the batch
+            documents: Document records (id, file_path), already checked for ownership
+            workflow_ids: Workflows to run on every document
+
+        Returns:
+            Batch record with item counts per status
+        """
+        pairs = len(documents) * len(workflow_ids)
+        if pairs > EXTRACTION_BATCH_MAX_PAIRS:
+            raise ValueError(f"Batch of {pairs} extractions exceeds the limit of {EXTRACTION_BATCH_MAX_PAIRS}")
+
+        batch_id = uuid.uuid4().hex
+        print(f"🚀 Starting batch {batch_id}: {len(documents)} documents x {len(workflow_ids)} workflows")
+
+        # Field IDs are resolved once per workflow, not once per pair
+        workflow_fields: Dict[int, List[str]] = {}
+        workflow_errors: Dict[int, str] = {}
+        for workflow_id in workflow_ids:
             try:
-                request_id, request_data = await asyncio.wait_for(
-                    client.request_extraction(
-                        file_ids=[file_id],
-                        field_ids=field_ids
-                    ),
-                    timeout=30.0  # 30 second timeout for extraction request
-                )
-            except asyncio.TimeoutError:
-                raise ZuvaAPIError("Extraction request timeout after 30 seconds")
-
-            # Update extraction with request ID
-            await self.db.update_extraction_status(
-                extraction_id,
-                'processing',
-                zuva_request_id=request_id
+                workflow_fields[workflow_id] = await self._get_workflow_field_ids(workflow_id)
+            except ValueError as e:
+                print(f"⚠️  Skipping workflow {workflow_id} in batch {batch_id}: {e}")
+                workflow_errors[workflow_id] = str(e)
+
+        jobs = []
+        skipped = []
+        for document in documents:
+            document_path = document.get('file_path')
+            file_missing = not document_path or not Path(document_path).exists()
+            group_id = uuid.uuid4().hex
+
+            for workflow_id in workflow_ids:
+                error = "Document file not found" if file_missing else workflow_errors.get(workflow_id)
+                if error:
+                    skipped.append({'document_id': document['id'], 'workflow_id': workflow_id, 'error': error})
+                    continue
+
+                jobs.append({
+                    'document_id': document['id'],
+                    'workflow_id': workflow_id,
+                    'document_path': document_path,
+                    'field_ids': workflow_fields[workflow_id],
+                    'group_id': group_id
+                })
+
+        batch = await self.db.create_extraction_batch(
+            batch_id, user_id, jobs, skipped, priority=EXTRACTION_BATCH_PRIORITY
+        )
+        if not batch:
+            raise ValueError("Failed to create extraction batch")
+
+        if jobs:
+            self._wakeup.set()
+        print(f"📥 Queued batch {batch_id}: {len(jobs)} extractions, {len(skipped)} skipped")
+
+        return self._batch_progress(batch)
+
+    async def get_batch_status(self, batch_id: str, user_id: int) -> Optional[Dict[str, Any]]:
+        """Aggregate progress of a user's batch, or None if it doesn't exist"""
+        batch = await self.db.get_extraction_batch(batch_id, user_id)
+        return self._batch_progress(batch) if batch else None
+
+    @staticmethod
+    def _batch_progress(batch: Dict[str, Any]) -> Dict[str, Any]:
+        """Add completion figures to a batch record"""
+        counts = batch['counts']
+        remaining = counts.get('pending', 0) + counts.get('processing', 0)
+        finished = batch['total'] - remaining
+        return {
+            **batch,
+            'finished': finished,
+            'remaining': remaining,
+            'progress': round(finished / batch['total'], 4) if batch['total'] else 1.0,
+            'done': remaining == 0
+        }
+
+    def _is_settled(self, existing: Optional[Dict[str, Any]], refresh: bool = False) -> bool:
+        """Whether an existing extraction should be returned as-is instead of queued again"""
+        if not existing:
+            return False
+
+        if existing['status'] == 'complete' and refresh:
+            print(f"🔄 Refreshing completed extraction")
+            return False
+        elif existing['status'] == 'complete':
+            print(f"✅ Extraction already complete, returning cached results")
+            return True
+        elif existing['status'] == 'processing':
+            print(f"⏳ Extraction already in progress")
+            return True
+        elif existing['status'] == 'failed':
+            print(f"🔄 Previous extraction failed, retrying...")
+        elif existing['status'] == 'pending':
+            print(f"🔄 Extraction already queued, refreshing job")
+        return False
+
+    async def _get_workflow_field_ids(self, workflow_id: int) -> List[str]:
+        """Validated, deduplicated Zuva field IDs configured on a workflow"""
+        # Get workflow to retrieve field IDs
+        # We need to get the workflow without user_id check for extraction
+        async with self.db.connection() as db:
+            cursor = await db.execute("""
+                SELECT id, user_id, name, description, fields, document_types, status, created_at, updated_at
+                FROM workflows WHERE id = ?
+            """, (workflow_id,))
+            row = await cursor.fetchone()
+            workflow = dict(row) if row else None
+
+        if not workflow:
+            raise ValueError(f"Workflow not found: {workflow_id}")
+
+        # Parse field IDs from workflow
+        fields_data = json.loads(workflow.get('fields', '[]'))
+
+        # Extract field IDs - handle both object format and string format
+        field_ids = []
+
+        # Handle list format (array of objects or strings)
+        if isinstance(fields_data, list):
+            for field in fields_data:
+                if isinstance(field, dict):
+                    # Object format: {"name": "Title", "fieldId": "uuid"}
+                    field_id = field.get('fieldId') or field.get('field_id')
+                    if field_id:
+                        field_ids.append(field_id)
+                elif isinstance(field, str):
+                    # String format: "uuid"
+                    field_ids.append(field)
+
+        # Handle nested category format (dict of arrays)
+        elif isinstance(fields_data, dict):
+            for category_name, category_fields in fields_data.items():
+                if isinstance(category_fields, list):
+                    for field in category_fields:
+                        if isinstance(field, dict):
+                            field_id = field.get('fieldId') or field.get('field_id')
+                            if field_id:
+                                field_ids.append(field_id)
+                        elif isinstance(field, str):
+                            field_ids.append(field)
+
+        if not field_ids:
+            raise ValueError(f"No fields configured in workflow {workflow_id}")
+
+        # Validate field IDs are valid UUIDs
+        validated_field_ids = []
+        invalid_fields = []
+
+        for fid in field_ids:
+            if UUID_PATTERN.match(str(fid)):
+                validated_field_ids.append(fid)
+            else:
+                invalid_fields.append(fid)
+
+        # Deduplicate validated field IDs
+        validated_field_ids = list(dict.fromkeys(validated_field_ids))
+
+        if invalid_fields:
+            print(f"⚠️  Warning: {len(invalid_fields)} invalid field IDs filtered out from workflow {workflow_id}")
+            for inv_field in invalid_fields[:5]:  # Show first 5
+                print(f"   - Invalid: '{inv_field}' (not a valid UUID)")
+            if len(invalid_fields) > 5:
+                print(f"   ... and {len(invalid_fields) - 5} more")
+
+        if not validated_field_ids:
+            raise ValueError(
+                f"No valid field IDs found in workflow {workflow_id}. "
+                f"All {len(field_ids)} fields were invalid or missing fieldId. "
+                f"Fields must be valid UUIDs in format: xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx"
             )
 
+        return validated_field_ids
+
+    async def _process_extraction(self, jobs: List[Dict[str, Any]]):
+        """
+        Process a claimed unit of extraction work
+
+        A unit is one job, or every row of a document-level group. The union of
+        the rows' field IDs is requested from Zuva once (in chunks of at most
+        ZUVA_MAX_FIELDS_PER_REQUEST) and the parsed results are split back into
+        each row. Fields already extracted from the same file content are taken
+        from the field result cache instead of being requested, unless a job
+        asked for a refresh; cached results expire after
+        FIELD_RESULT_CACHE_TTL_HOURS or when the field is redefined. Stages that
+        already completed on an earlier attempt (upload, request) are skipped,
+        so a retry resumes where the previous one stopped.
+
+        Args:
+            jobs: Claimed jobs from claim_extraction_jobs
+        """
+        extraction_ids = [job['id'] for job in jobs]
+        label = (f"extraction {extraction_ids[0]}" if len(jobs) == 1
+                 else f"extractions {extraction_ids} (document {jobs[0]['document_id']})")
+        document_path = jobs[0]['document_path']
+        field_ids = list(dict.fromkeys(fid for job in jobs for fid in job['field_ids']))
+        attempts = max(job['attempts'] for job in jobs)
+        stage = 'hash'
+        file_id = None
+        size = None
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+
+        try:
+            print(f"⚙️  Processing {label}: {len(field_ids)} fields (attempt {attempts}/{self.max_attempts})")
+
+            if not Path(document_path).exists():
+                raise PermanentExtractionError(f"Document file not found: {document_path}")
+            if not field_ids:
+                raise PermanentExtractionError("No valid field IDs to extract")
+
+            with stage_timer(timings, stage):
+                # Uploads are hashed as they are written; older documents are hashed here
+                content_hash = jobs[0].get('content_hash')
+                if content_hash:
+                    size = Path(document_path).stat().st_size
+                else:
+                    content_hash, size = await asyncio.to_thread(file_sha256, document_path)
+
+            # Fields already extracted from this content (by any workflow) are not requested again
+            cached_results: Dict[str, Any] = {}
+            cached_answers: Dict[str, Any] = {}
+            if any(job.get('refresh_results') for job in jobs):
+                print(f"🔄 Refresh requested, extracting all {len(field_ids)} fields")
+            else:
+                stage = 'cache'
+                with stage_timer(timings, stage):
+                    cached_results, cached_answers = await self.db.get_field_results(
+                        content_hash, field_ids, max_age_hours=FIELD_RESULT_CACHE_TTL_HOURS
+                    )
+            stored_requests = self._shared_value(jobs, 'zuva_request_id')
+            if cached_results and not stored_requests:
+                field_ids = [fid for fid in field_ids if fid not in cached_results]
+                print(f"♻️  {len(cached_results)} field(s) served from the result cache, {len(field_ids)} to extract")
+
+            if not field_ids:
+                stage = 'save'
+                with stage_timer(timings, 'save'):
+                    await self._save_results(jobs, cached_results, cached_answers)
+                print(f"✅ {label[0].upper()}{label[1:]} completed from cached field results")
+                return
+
+            # Get Zuva client
+            client = await self._get_zuva_client()
+
+            # Step 1: Upload file to Zuva, or reuse an earlier upload of the same content
+            file_id = self._shared_value(jobs, 'zuva_file_id')
+            if not file_id:
+                stage = 'upload'
+                await self._set_stage(jobs, stage)
+                with stage_timer(timings, stage):
+                    file_id = await self._get_zuva_file_id(client, document_path, content_hash, size)
+
+                # Store zuva_file_id so a retry can skip the upload
+                for extraction_id in extraction_ids:
+                    await self.db.update_extraction_file_id(extraction_id, file_id)
+
+            # Step 2: Request extraction, one request per chunk of fields (with timeout)
+            request_ids = stored_requests.split(',') if stored_requests else []
+            if not request_ids:
+                stage = 'request'
+                await self._set_stage(jobs, stage)
+                print(f"🔍 Requesting field extraction...")
+                with stage_timer(timings, 'request'):
+                    for start in range(0, len(field_ids), ZUVA_MAX_FIELDS_PER_REQUEST):
+                        try:
+                            request_id, request_data = await asyncio.wait_for(
+                                client.request_extraction(
+                                    file_ids=[file_id],
+                                    field_ids=field_ids[start:start + ZUVA_MAX_FIELDS_PER_REQUEST]
+                                ),
+                                timeout=30.0  # 30 second timeout for extraction request
+                            )
+                        except asyncio.TimeoutError:
+                            raise ZuvaAPIError("Extraction request timeout after 30 seconds")
+                        request_ids.append(request_id)
+
+                # Update extractions with the request IDs
+                for extraction_id in extraction_ids:
+                    await self.db.update_extraction_status(
+                        extraction_id,
+                        'processing',
+                        zuva_request_id=','.join(request_ids)
+                    )
+
             # Step 3: Wait for extraction to complete (with built-in timeout)
+            stage = 'wait'
+            await self._set_stage(jobs, stage)
             print(f"⏳ Waiting for extraction to complete...")
-            status_data = await client.wait_for_extraction(request_id)
+            with stage_timer(timings, 'wait'):
+                await asyncio.gather(*(client.wait_for_extraction(request_id) for request_id in request_ids))
 
             # Step 4: Get results
+            stage = 'fetch'
+            await self._set_stage(jobs, stage)
             print(f"📥 Retrieving extraction results...")
-            raw_results = await client.get_extraction_results(request_id)
+            parsed_results: Dict[str, Any] = {}
+            answer_metadata: Dict[str, Any] = {}
+            for request_id in request_ids:
+                stage = 'fetch'
+                with stage_timer(timings, stage):
+                    raw_results = await client.get_extraction_results(request_id)
+
+                # Step 5: Parse results
+                stage = 'parse'
+                with stage_timer(timings, stage):
+                    chunk_results, chunk_answers = client.parse_extraction_results(raw_results)
+                parsed_results.update(chunk_results)
+                answer_metadata.update(chunk_answers)
 
-            # Step 5: Parse and save results
-            parsed_results, answer_metadata = client.parse_extraction_results(raw_results)
             print(f"✅ Extraction complete! Extracted {len(parsed_results)} fields")
             if answer_metadata:
                 print(f"   📊 Answer-type fields: {len(answer_metadata)}")
 
             # Step 6: Enrich answer metadata with answer options from field definitions
             if answer_metadata:
-                print(f"🔍 Fetching field definitions to enrich answer options...")
-                field_definitions = await client.get_field_definitions()
+                stage = 'enrich'
+                with stage_timer(timings, stage):
+                    field_definitions = await self.field_definitions.get_many(client, list(answer_metadata))
 
                 for field_id, metadata in answer_metadata.items():
-                    field_def = next((f for f in field_definitions if f.get('field_id') == field_id), None)
+                    field_def = field_definitions.get(field_id)
                     if field_def and field_def.get('answer_options'):
                         metadata['answer_options'] = field_def['answer_options']
                         print(f"   ✅ Added answer options for {metadata.get('field_name')}")
 
-            # Save to database
-            await self.db.save_extraction_results(extraction_id, parsed_results, answer_metadata)
+            # Cache the fresh fields, then save cached + fresh results to each row
+            stage = 'save'
+            with stage_timer(timings, 'save'):
+                await self.db.save_field_results(content_hash, parsed_results, answer_metadata)
+                await self._save_results(
+                    jobs,
+                    {**cached_results, **parsed_results},
+                    {**cached_answers, **answer_metadata}
+                )
+
+            print(f"✅ {label[0].upper()}{label[1:]} completed successfully")
 
-            print(f"✅ Extraction {extraction_id} completed successfully")
+        except asyncio.CancelledError:
+            # Cancelled or shut down mid-stage: the partial attempt is not a meaningful sample
+            timings = {}
+            raise
 
-        except ZuvaAPIError as e:
-            error_msg = f"Zuva API error: {e}"
+        except PERMANENT_ERRORS as e:
+            error_msg = f"Extraction processing error ({stage}): {e}"
             print(f"❌ {error_msg}")
-            await self.db.update_extraction_status(
-                extraction_id,
-                'failed',
-                error_message=error_msg
-            )
+            for extraction_id in extraction_ids:
+                await self.db.update_extraction_status(
+                    extraction_id,
+                    'failed',
+                    error_message=error_msg
+                )
+            self._publish(jobs, 'failed', stage=stage, error_message=error_msg)
 
         except Exception as e:
-            error_msg = f"Extraction processing error: {e}"
-            print(f"❌ {error_msg}")
-            await self.db.update_extraction_status(
-                extraction_id,
-                'failed',
-                error_message=error_msg
+            prefix = "Zuva API error" if isinstance(e, ZuvaAPIError) else "Extraction processing error"
+            # A request Zuva reported as failed must be re-issued; a slow one is polled again
+            reset_request = (
+                stage == 'wait'
+                and isinstance(e, ZuvaExtractionError)
+                and not isinstance(e, ZuvaTimeoutError)
+            )
+            # A rejected request may mean the (possibly reused) file is gone upstream:
+            # forget it so the next attempt uploads afresh
+            reset_file = stage == 'request' and bool(file_id)
+            if reset_file:
+                await self.db.invalidate_zuva_file(file_id)
+            await self._retry_or_fail(jobs, f"{prefix} ({stage}): {e}", reset_request, reset_file)
+
+        finally:
+            if timings:
+                timings['total'] = time.perf_counter() - started
+                # Metrics only: a failed write must not turn a finished job into an error
+                try:
+                    for job in jobs:
+                        await self.db.record_extraction_timings(job['id'], timings, size, len(job['field_ids']))
+                except Exception as e:
+                    print(f"⚠️  Could not record stage timings for {label}: {e}")
+
+    @staticmethod
+    def _shared_value(jobs: List[Dict[str, Any]], key: str) -> Optional[str]:
+        """A column value every job in the unit agrees on, else None"""
+        values = {job.get(key) for job in jobs}
+        return values.pop() if len(values) == 1 else None
+
+    async def _save_results(self, jobs: List[Dict[str, Any]], results: Dict[str, Any],
+                            answer_metadata: Dict[str, Any]):
+        """Save results to every job in the unit, each keeping only its own workflow's fields"""
+        await self._set_stage(jobs, 'save')
+        for job in jobs:
+            wanted = set(job['field_ids'])
+            await self.db.save_extraction_results(
+                job['id'],
+                {fid: value for fid, value in results.items() if fid in wanted},
+                {fid: value for fid, value in answer_metadata.items() if fid in wanted}
+            )
+            self._publish([job], 'complete', field_count=len(wanted))
+
+    async def _set_stage(self, jobs: List[Dict[str, Any]], stage: str):
+        """Record the current stage on every job in the unit"""
+        for job in jobs:
+            await self.db.set_extraction_stage(job['id'], stage)
+        self._publish(jobs, 'processing', stage=stage)
+
+    def _publish(self, jobs: List[Dict[str, Any]], status: str, **details):
+        """Publish a state change of each job (or extraction record) to event subscribers"""
+        for job in jobs:
+            self.events.publish({
+                'extraction_id': job['id'],
+                'document_id': job['document_id'],
+                'workflow_id': job['workflow_id'],
+                'status': status,
+                **details
+            })
+
+    async def _get_zuva_file_id(self, client: ZuvaClient, document_path: str, content_hash: str, size: int) -> str:
+        """Zuva file ID for a document, uploading only when this content has no valid upload"""
+        cached = await self.db.get_zuva_file(content_hash, client.region, ZUVA_FILE_MIN_REMAINING_SECONDS)
+        if cached:
+            print(f"♻️  Reusing Zuva file {cached['zuva_file_id']} (sha256 {content_hash[:12]}…)")
+            return cached['zuva_file_id']
+
+        key = (content_hash, client.region)
+        upload = self._uploads.get(key)
+        if upload is None:
+            upload = asyncio.ensure_future(self._upload_file(client, document_path, content_hash, size))
+            self._uploads[key] = upload
+            upload.add_done_callback(lambda _: self._uploads.pop(key, None))
+        else:
+            print(f"⏳ Waiting for in-flight upload of sha256 {content_hash[:12]}…")
+
+        # Shielded: one cancelled job must not abort an upload other jobs are waiting on
+        return await asyncio.shield(upload)
+
+    async def _upload_file(self, client: ZuvaClient, document_path: str, content_hash: str, size: int) -> str:
+        """Upload a file to Zuva (with timeout) and record it for reuse"""
+        print(f"📤 Uploading file to Zuva...")
+        try:
+            file_id, file_metadata = await asyncio.wait_for(
+                client.upload_file(document_path),
+                timeout=60.0  # 60 second timeout for upload
             )
+        except asyncio.TimeoutError:
+            raise ZuvaAPIError("File upload timeout after 60 seconds")
+
+        await self.db.save_zuva_file(content_hash, client.region, file_id, size, zuva_file_expiry(file_metadata))
+        return file_id
+
+    async def _retry_or_fail(self, jobs: List[Dict[str, Any]], error_msg: str, reset_request: bool = False,
+                             reset_file: bool = False):
+        """Reschedule a failed attempt with exponential backoff, or fail the jobs for good"""
+        attempts = max(job['attempts'] for job in jobs)
+
+        if attempts >= self.max_attempts:
+            print(f"❌ {error_msg} (giving up after {attempts} attempts)")
+            for job in jobs:
+                await self.db.update_extraction_status(
+                    job['id'],
+                    'failed',
+                    error_message=error_msg
+                )
+            self._publish(jobs, 'failed', attempts=attempts, error_message=error_msg)
+            return
+
+        delay = min(EXTRACTION_RETRY_BASE_SECONDS * (2 ** (attempts - 1)), EXTRACTION_RETRY_MAX_SECONDS)
+        print(f"⚠️  {error_msg} (attempt {attempts}/{self.max_attempts}, retrying in {delay:.0f}s)")
+        for job in jobs:
+            await self.db.retry_extraction_job(
+                job['id'],
+                self.worker_id,
+                delay,
+                error_message=error_msg,
+                reset_request=reset_request,
+                reset_file=reset_file
+            )
+        self._publish(jobs, 'pending', attempts=attempts, error_message=error_msg, retry_in_seconds=delay)
 
     async def get_extraction_status(
         self,
@@ -319,12 +968,11 @@ class ExtractionService:
             workflow_id: Workflow ID
 
         Returns:
-            Extraction record with status and results
+            Extraction record with status (results are fetched separately)
         """
         try:
-            extraction = await self.db.get_extraction_by_document_workflow(
-                document_id, workflow_id
-            )
+            # Polled every few seconds: read the status columns, not the result blobs
+            extraction = await self.db.get_extraction_state(document_id, workflow_id)
 
             if not extraction:
                 return None
@@ -332,7 +980,9 @@ class ExtractionService:
             return {
                 'id': extraction['id'],
                 'status': extraction['status'],
-                'results': extraction.get('results'),
+                'stage': extraction.get('stage'),
+                'attempts': extraction.get('attempts'),
+                'next_attempt_at': extraction.get('next_attempt_at'),
                 'error_message': extraction.get('error_message'),
                 'created_at': extraction['created_at'],
                 'started_at': extraction.get('started_at'),
@@ -375,6 +1025,31 @@ class ExtractionService:
             print(f"❌ Error getting extraction results: {e}")
             return None
 
+    async def get_extraction_metrics(
+        self,
+        user_id: int,
+        since_hours: float = 24,
+        workflow_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Aggregate stage timings of a user's recently finished extractions
+
+        Args:
+            user_id: Owner of the documents whose extractions are aggregated
+            since_hours: Only extractions completed within this many hours
+            workflow_id: Restrict to one workflow
+
+        Returns:
+            p50/p95/p99/max per stage (seconds), overall, per workflow and per
+            file size bucket, plus payload size percentiles (bytes)
+        """
+        rows = await self.db.get_extraction_timings(user_id, since_hours=since_hours, workflow_id=workflow_id)
+        return {
+            'window_hours': since_hours,
+            'workflow_id': workflow_id,
+            **summarize_extraction_timings(rows)
+        }
+
     async def cancel_extraction(
         self,
         document_id: str,
@@ -391,9 +1066,7 @@ class ExtractionService:
             True if cancelled, False otherwise
         """
         try:
-            extraction = await self.db.get_extraction_by_document_workflow(
-                document_id, workflow_id
-            )
+            extraction = await self.db.get_extraction_state(document_id, workflow_id)
 
             if not extraction:
                 return False
@@ -401,12 +1074,16 @@ class ExtractionService:
             if extraction['status'] not in ['pending', 'processing']:
                 return False
 
-            # Update status to failed with cancellation message
-            await self.db.update_extraction_status(
-                extraction['id'],
-                'failed',
-                error_message='Cancelled by user'
-            )
+            # Queued jobs fail at once; running ones are stopped by their worker
+            if not await self.db.request_extraction_cancel(extraction['id']):
+                return False
+
+            task = self._running.get(extraction['id'])
+            if task:
+                task.cancel()
+            elif extraction['status'] == 'pending':
+                self._publish([{**extraction, 'document_id': document_id, 'workflow_id': workflow_id}],
+                              'failed', error_message='Cancelled by user')
 
             return True
 
@@ -415,7 +1092,13 @@ class ExtractionService:
             return False
 
     async def cleanup(self):
-        """Cleanup resources"""
+        """Stop the worker pool (requeueing running jobs) and cleanup resources"""
+        for worker in self._workers:
+            worker.cancel()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
         if self.zuva_client:
             await self.zuva_client.close()
 
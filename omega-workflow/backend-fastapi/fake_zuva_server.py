@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Fake Zuva API Server
+Local stand-in for the Zuva API (files, extraction, status, results, fields)
+with configurable latency, error injection and generated payloads, for
+load testing ExtractionService and ZuvaClient without a real token.
+
+Usage:
+    python3 fake_zuva_server.py --port 8765
+    python3 fake_zuva_server.py --processing 8:0.6 --error-rate 0.02 --failure-rate 0.05
+
+Point the backend at it with:
+    ZUVA_BASE_URL=http://127.0.0.1:8765/api/v2 ZUVA_API_TOKEN=fake uvicorn main:app
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+
+from fastapi import FastAPI, Request, Query, HTTPException
+from fastapi.responses import JSONResponse
+
+WORDS = ['agreement', 'party', 'shall', 'notice', 'term', 'assign', 'consent', 'licensor',
+         'effective', 'date', 'termination', 'governing', 'law', 'confidential', 'payment']
+
+
+class Latency:
+    """Log-normal latency distribution given as 'median[:sigma]' in seconds"""
+
+    def __init__(self, spec: str):
+        median, _, sigma = str(spec).partition(':')
+        self.median = max(float(median), 0.0)
+        self.sigma = float(sigma) if sigma else 0.0
+        self.spec = spec
+
+    def sample(self, rng: random.Random = random) -> float:
+        if self.median <= 0:
+            return 0.0
+        if self.sigma <= 0:
+            return self.median
+        return rng.lognormvariate(math.log(self.median), self.sigma)
+
+
+class FakeZuvaConfig:
+    """Behaviour knobs; every option can also be set through a FAKE_ZUVA_* environment variable"""
+
+    def __init__(self, **overrides):
+        env = os.getenv
+        self.upload_latency = Latency(overrides.get('upload_latency') or env('FAKE_ZUVA_UPLOAD_LATENCY', '0.2:0.5'))
+        self.api_latency = Latency(overrides.get('api_latency') or env('FAKE_ZUVA_API_LATENCY', '0.05:0.5'))
+        self.processing = Latency(overrides.get('processing') or env('FAKE_ZUVA_PROCESSING', '8:0.6'))
+        self.error_rate = float(overrides.get('error_rate', env('FAKE_ZUVA_ERROR_RATE', '0')))
+        self.failure_rate = float(overrides.get('failure_rate', env('FAKE_ZUVA_FAILURE_RATE', '0')))
+        self.max_extractions = int(overrides.get('max_extractions', env('FAKE_ZUVA_MAX_EXTRACTIONS', '3')))
+        self.text_words = int(overrides.get('text_words', env('FAKE_ZUVA_TEXT_WORDS', '40')))
+        self.file_ttl_hours = float(overrides.get('file_ttl_hours', env('FAKE_ZUVA_FILE_TTL_HOURS', '48')))
+        self.fields_path = overrides.get('fields_path') or env('FAKE_ZUVA_FIELDS', str(Path(__file__).parent / 'fields.json'))
+        self.seed = overrides.get('seed')
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'upload_latency': self.upload_latency.spec,
+            'api_latency': self.api_latency.spec,
+            'processing': self.processing.spec,
+            'error_rate': self.error_rate,
+            'failure_rate': self.failure_rate,
+            'max_extractions': self.max_extractions,
+            'text_words': self.text_words,
+            'fields_path': self.fields_path,
+        }
+
+
+def load_field_definitions(path: str) -> List[Dict[str, Any]]:
+    """Field catalog served by /fields; answer-type fields get synthetic answer options"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            fields = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Could not load {path} ({e}); serving a synthetic catalog")
+        fields = [
+            {'field_id': str(uuid.UUID(int=i)), 'name': f'Synthetic Field {i}', 'type': 'text'}
+            for i in range(1, 201)
+        ]
+
+    for field in fields:
+        if field.get('type') == 'answers':
+            field.setdefault('answer_options', {'a': 'Yes', 'b': 'No', 'c': 'Not specified'})
+    return fields
+
+
+def create_app(config: Optional[FakeZuvaConfig] = None) -> FastAPI:
+    """Build the fake Zuva app"""
+    config = config or FakeZuvaConfig()
+    rng = random.Random(config.seed)
+    fields = load_field_definitions(config.fields_path)
+    fields_by_id = {field['field_id']: field for field in fields}
+
+    files: Dict[str, Dict[str, Any]] = {}
+    requests: Dict[str, Dict[str, Any]] = {}
+    stats: Dict[str, int] = {}
+
+    app = FastAPI(title="Fake Zuva API")
+
+    async def simulate(endpoint: str, request: Request, latency: Latency):
+        """Count the call, check auth, sleep for the sampled latency and maybe inject an error"""
+        stats[endpoint] = stats.get(endpoint, 0) + 1
+        if not request.headers.get('authorization', '').startswith('Bearer '):
+            raise HTTPException(status_code=401, detail="Missing bearer token")
+        await asyncio.sleep(latency.sample(rng))
+        if config.error_rate and rng.random() < config.error_rate:
+            stats['injected_errors'] = stats.get('injected_errors', 0) + 1
+            raise HTTPException(status_code=rng.choice([500, 502, 503]), detail="Injected failure")
+
+    def request_status(request_id: str) -> Dict[str, Any]:
+        job = requests[request_id]
+        now = time.monotonic()
+        if now < job['started_at']:
+            state = 'queued'
+        elif now < job['ready_at']:
+            state = 'processing'
+        else:
+            state = 'failed' if job['fails'] else 'complete'
+
+        status = {'request_id': request_id, 'file_id': job['file_id'], 'status': state}
+        if state == 'failed':
+            status['message'] = 'Injected extraction failure'
+        return status
+
+    def build_results(request_id: str) -> Dict[str, Any]:
+        job = requests[request_id]
+        job_rng = random.Random(request_id)
+        results = []
+        for field_id in job['field_ids']:
+            field = fields_by_id.get(field_id, {})
+            item = {'field_id': field_id, 'field_name': field.get('name'), 'file_id': job['file_id']}
+
+            if field.get('type') == 'answers':
+                option = job_rng.choice(sorted(field['answer_options']))
+                item['answers'] = [{'option': option, 'value': field['answer_options'][option]}]
+                item['extractions'] = None
+                results.append(item)
+                continue
+
+            count = job_rng.randint(0, config.max_extractions)
+            if count == 0:
+                item['extractions'] = None
+            else:
+                item['extractions'] = []
+                for _ in range(count):
+                    page = job_rng.randint(0, 29)
+                    top = job_rng.uniform(50, 700)
+                    item['extractions'].append({
+                        'text': ' '.join(job_rng.choice(WORDS) for _ in range(config.text_words)),
+                        'spans': [{
+                            'start': 0,
+                            'end': config.text_words * 8,
+                            'score': round(job_rng.uniform(0.5, 1.0), 3),
+                            'pages': {'start': page, 'end': page},
+                            'bboxes': [{
+                                'page': page,
+                                'bounds': [{'left': 72, 'top': top, 'right': 540, 'bottom': top + 40}]
+                            }]
+                        }]
+                    })
+            results.append(item)
+        return {'file_id': job['file_id'], 'request_id': request_id, 'results': results}
+
+    @app.post("/api/v2/files", status_code=201)
+    async def upload_file(request: Request):
+        await simulate('files', request, config.upload_latency)
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+
+        file_id = uuid.uuid4().hex
+        expiration = datetime.now(timezone.utc) + timedelta(hours=config.file_ttl_hours)
+        files[file_id] = {'size': size}
+        return {
+            'file_id': file_id,
+            'attributes': {'content-type': request.headers.get('content-type'), 'size': size},
+            'permissions': [],
+            'expiration': expiration.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        }
+
+    @app.post("/api/v2/extraction", status_code=202)
+    async def request_extraction(request: Request):
+        await simulate('extraction', request, config.api_latency)
+        payload = await request.json()
+        file_ids = payload.get('file_ids') or []
+        field_ids = payload.get('field_ids') or []
+
+        problems = [fid for fid in file_ids if fid not in files]
+        problems += [fid for fid in field_ids if fid not in fields_by_id]
+        if not file_ids or not field_ids or len(file_ids) > 100 or len(field_ids) > 100 or problems:
+            return JSONResponse(status_code=400, content={'error': {
+                'code': 'invalid_request',
+                'message': f"Invalid file_ids/field_ids: {problems[:5] or 'count out of range'}"
+            }})
+
+        now = time.monotonic()
+        entries = []
+        for file_id in file_ids:
+            request_id = uuid.uuid4().hex
+            started_at = now + rng.uniform(0, 0.5)
+            requests[request_id] = {
+                'file_id': file_id,
+                'field_ids': list(field_ids),
+                'started_at': started_at,
+                'ready_at': started_at + config.processing.sample(rng),
+                'fails': rng.random() < config.failure_rate,
+            }
+            entries.append({'request_id': request_id, 'file_id': file_id, 'status': 'queued'})
+        return {'file_ids': entries}
+
+    @app.get("/api/v2/extraction/{request_id}")
+    async def extraction_status(request_id: str, request: Request):
+        await simulate('status', request, config.api_latency)
+        if request_id not in requests:
+            raise HTTPException(status_code=404, detail="Unknown request_id")
+        return request_status(request_id)
+
+    @app.get("/api/v2/extractions")
+    async def extraction_statuses(request: Request, request_id: List[str] = Query(default=[])):
+        await simulate('statuses', request, config.api_latency)
+        return {'statuses': [request_status(rid) for rid in request_id if rid in requests]}
+
+    @app.get("/api/v2/extraction/{request_id}/results/text")
+    async def extraction_results(request_id: str, request: Request):
+        await simulate('results', request, config.api_latency)
+        if request_id not in requests:
+            raise HTTPException(status_code=404, detail="Unknown request_id")
+        if request_status(request_id)['status'] != 'complete':
+            raise HTTPException(status_code=409, detail="Extraction is not complete")
+        return build_results(request_id)
+
+    @app.get("/api/v2/fields")
+    async def field_definitions(request: Request):
+        await simulate('fields', request, config.api_latency)
+        return fields
+
+    @app.get("/__stats")
+    async def server_stats():
+        """Call counts per endpoint, for asserting request volume in load tests"""
+        return {'config': config.describe(), 'calls': stats, 'files': len(files), 'requests': len(requests)}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake Zuva API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--upload-latency', help="median[:sigma] seconds per upload")
+    parser.add_argument('--api-latency', help="median[:sigma] seconds per API call")
+    parser.add_argument('--processing', help="median[:sigma] seconds until an extraction completes")
+    parser.add_argument('--error-rate', type=float, help="Fraction of calls answered with a 5xx")
+    parser.add_argument('--failure-rate', type=float, help="Fraction of extractions that end 'failed'")
+    parser.add_argument('--max-extractions', type=int, help="Maximum extractions generated per field")
+    parser.add_argument('--text-words', type=int, help="Words per generated extraction")
+    parser.add_argument('--fields', dest='fields_path', help="Field catalog JSON (default: fields.json)")
+    parser.add_argument('--seed', type=int, help="Random seed for reproducible runs")
+    args = parser.parse_args()
+
+    overrides = {key: value for key, value in vars(args).items() if value is not None and key not in ('host', 'port')}
+    config = FakeZuvaConfig(**overrides)
+    print(f"🧪 Fake Zuva API on http://{args.host}:{args.port}/api/v2")
+    print(f"   {config.describe()}")
+
+    import uvicorn
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Field Catalog
+Process-wide in-memory index of the fields table
+"""
+
+import asyncio
+import time
+from typing import Optional, List, Dict, Any
+
+from database_async import AsyncDatabase
+
+
+class FieldCatalog:
+    """
+    In-memory field catalog
+
+    Loads the fields table once and indexes it by field_id and by name. The
+    fields table carries a version counter (bumped by triggers on every
+    change, including imports run from another process); the catalog re-reads
+    that counter at most once per check interval and reloads when it moves.
+    """
+
+    def __init__(self, db: AsyncDatabase, check_interval: float = 5.0):
+        """
+        Initialize field catalog
+
+        Args:
+            db: Database instance
+            check_interval: Minimum seconds between version checks
+        """
+        self.db = db
+        self.check_interval = check_interval
+
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_name: Dict[str, Dict[str, Any]] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        """Force a version check on the next lookup"""
+        self._checked_at = 0.0
+
+    async def refresh(self, force: bool = False):
+        """Reload the catalog if the fields table changed since the last load"""
+        if not force and self._version is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return
+
+        async with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            if not force and self._version is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return
+
+            version = await self.db.get_catalog_version('fields')
+            self._checked_at = time.monotonic()
+            if not force and version == self._version:
+                return
+
+            fields = await self.db.get_fields()
+            by_id = {}
+            by_name = {}
+            for field in fields:
+                by_id[field['field_id']] = field
+                # First field wins when names collide (fields are ordered by name)
+                by_name.setdefault(field['name'], field)
+
+            self._by_id, self._by_name = by_id, by_name
+            self._version = version
+            print(f"📚 Field catalog loaded: {len(by_id)} fields (version {version})")
+
+    async def get(self, field_id: str) -> Optional[Dict[str, Any]]:
+        """Get a field by its Zuva field ID"""
+        await self.refresh()
+        return self._by_id.get(field_id)
+
+    async def get_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """Get a field by its display name"""
+        await self.refresh()
+        return self._by_name.get(name)
+
+    async def find_missing(self, field_ids: List[str] = (), names: List[str] = ()) -> List[str]:
+        """Return the field IDs and names that are not in the catalog"""
+        await self.refresh()
+        missing = [fid for fid in field_ids if fid not in self._by_id]
+        missing.extend(name for name in names if name not in self._by_name)
+        return missing
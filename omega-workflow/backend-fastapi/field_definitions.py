@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Zuva Field Definitions
+Database-backed cache of Zuva's field definitions, indexed by field_id
+"""
+
+import asyncio
+import os
+import time
+from typing import Optional, List, Dict, Any
+
+from database_async import AsyncDatabase
+from zuva_client import ZuvaClient
+
+# Definitions older than this are refreshed in the background (seconds)
+FIELD_DEFINITIONS_TTL = int(os.getenv('ZUVA_FIELD_DEFINITIONS_TTL', '86400'))
+# After a failed refresh, wait this long before asking Zuva again (seconds)
+FIELD_DEFINITIONS_RETRY_DELAY = int(os.getenv('ZUVA_FIELD_DEFINITIONS_RETRY_DELAY', '60'))
+
+
+class FieldDefinitionCache:
+    """
+    Zuva field definition cache
+
+    Definitions are persisted to the local database, so restarts and new
+    ZuvaClient instances reuse them instead of refetching the catalog. Lookups
+    are served from an in-memory index by field_id. Once the stored copy is
+    older than the TTL it is refreshed in the background; only the very first
+    load (nothing stored yet) waits for Zuva. Refreshes are single-flight:
+    concurrent callers share one /fields request, and a failed refresh is not
+    retried before retry_delay has passed.
+    """
+
+    def __init__(self, db: AsyncDatabase, ttl: int = FIELD_DEFINITIONS_TTL,
+                 retry_delay: int = FIELD_DEFINITIONS_RETRY_DELAY):
+        """
+        Initialize field definition cache
+
+        Args:
+            db: Database instance
+            ttl: Seconds before stored definitions are refreshed
+            retry_delay: Seconds to wait after a failed refresh
+        """
+        self.db = db
+        self.ttl = ttl
+        self.retry_delay = retry_delay
+
+        # Per region: field_id -> definition, when it was fetched, and when a failed
+        # refresh may be retried (epoch seconds)
+        self._by_id: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._fetched_at: Dict[str, Optional[float]] = {}
+        self._retry_after: Dict[str, float] = {}
+        self._refreshes: Dict[str, asyncio.Task] = {}
+        self._load_lock = asyncio.Lock()
+
+    async def get_many(self, client: ZuvaClient, field_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Definitions for the given field IDs (unknown IDs are omitted)"""
+        region = client.region
+        await self._load(region)
+
+        if self._retrying(region):
+            pass
+        elif not self._by_id.get(region):
+            # Nothing stored yet: this caller has to wait for Zuva
+            await self.refresh(client)
+        elif self._is_stale(region) or any(fid not in self._by_id[region] for fid in field_ids):
+            self._refresh_in_background(client)
+
+        by_id = self._by_id.get(region, {})
+        return {fid: by_id[fid] for fid in field_ids if fid in by_id}
+
+    async def get(self, client: ZuvaClient, field_id: str) -> Optional[Dict[str, Any]]:
+        """Definition for one field ID"""
+        return (await self.get_many(client, [field_id])).get(field_id)
+
+    async def refresh(self, client: ZuvaClient):
+        """Fetch definitions from Zuva and persist them; concurrent calls share one fetch"""
+        region = client.region
+        task = self._refreshes.get(region)
+        if task is None or task.done():
+            task = asyncio.create_task(self._fetch(client))
+            self._refreshes[region] = task
+        await asyncio.shield(task)
+
+    def _refresh_in_background(self, client: ZuvaClient):
+        """Start a refresh unless one is already running"""
+        task = self._refreshes.get(client.region)
+        if task is None or task.done():
+            self._refreshes[client.region] = asyncio.create_task(self._fetch(client))
+
+    async def _fetch(self, client: ZuvaClient):
+        """Fetch, persist and index the definitions for the client's region"""
+        region = client.region
+        try:
+            definitions = await client.get_field_definitions(force_refresh=True)
+        except Exception as e:
+            print(f"⚠️  Could not refresh Zuva field definitions: {e}")
+            # Don't retry on every lookup; wait a while before the next attempt
+            self._retry_after[region] = time.time() + self.retry_delay
+            return
+
+        await self.db.replace_zuva_field_definitions(region, definitions)
+        self._by_id[region] = {d['field_id']: d for d in definitions if d.get('field_id')}
+        self._fetched_at[region] = time.time()
+        self._retry_after.pop(region, None)
+        print(f"📚 Zuva field definitions refreshed: {len(self._by_id[region])} fields ({region})")
+
+    async def _load(self, region: str):
+        """Load the persisted definitions into memory once per region"""
+        if region in self._by_id:
+            return
+        async with self._load_lock:
+            if region in self._by_id:
+                return
+            definitions, fetched_at = await self.db.get_zuva_field_definitions(region)
+            self._by_id[region] = definitions
+            self._fetched_at[region] = fetched_at
+
+    def _retrying(self, region: str) -> bool:
+        """Whether a refresh for the region failed recently and should not be tried yet"""
+        return time.time() < self._retry_after.get(region, 0)
+
+    def _is_stale(self, region: str) -> bool:
+        fetched_at = self._fetched_at.get(region)
+        return fetched_at is None or time.time() - fetched_at > self.ttl
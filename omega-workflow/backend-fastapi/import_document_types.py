@@ -4,11 +4,13 @@ Import document types and categories from JSON data into the database.
 Run this script to populate the document_categories and document_types tables.
 """
 
+import argparse
 import asyncio
-import aiosqlite
-import json
+import time
 from pathlib import Path
 
+from database_async import AsyncDatabase
+
 # Document types JSON data
 DOCUMENT_TYPES_JSON = {
     "Contract": [
@@ -88,11 +90,11 @@ DOCUMENT_TYPES_JSON = {
 DB_PATH = Path(__file__).parent / "database" / "omega.db"
 
 
-async def import_document_types():
+async def import_document_types(dry_run: bool = False):
     """Import document types and categories into the database."""
 
     print("=" * 60)
-    print("DOCUMENT TYPES IMPORT SCRIPT")
+    print("DOCUMENT TYPES IMPORT SCRIPT" + (" (DRY RUN)" if dry_run else ""))
     print("=" * 60)
     print()
 
@@ -102,100 +104,63 @@ async def import_document_types():
     print(f"📁 Database: {DB_PATH}")
     print()
 
-    async with aiosqlite.connect(str(DB_PATH)) as db:
-        # Clear existing data (for re-imports)
-        print("🗑️  Clearing existing document types data...")
-        await db.execute("DELETE FROM document_types")
-        await db.execute("DELETE FROM document_categories")
-        await db.commit()
-        print("   ✅ Existing data cleared")
-        print()
-
-        # Import categories and types
+    db = AsyncDatabase(str(DB_PATH))
+    try:
+        # Whole hierarchy is replaced in one transaction, and only if it changed
         print("📥 Importing document types...")
+        started = time.perf_counter()
+        stats = await db.replace_document_types(DOCUMENT_TYPES_JSON, dry_run=dry_run)
+        elapsed = time.perf_counter() - started
+        rows = stats['categories'] + stats['types']
+        rate = rows / elapsed if elapsed > 0 else 0
         print()
 
-        category_count = 0
-        type_count = 0
-        display_order = 1
-
-        for category_name, types in DOCUMENT_TYPES_JSON.items():
-            # Insert category
-            cursor = await db.execute(
-                "INSERT INTO document_categories (name, display_order) VALUES (?, ?)",
-                (category_name, display_order)
-            )
-            category_id = cursor.lastrowid
-            category_count += 1
-
-            print(f"   📂 {category_name}")
-
-            # Insert types for this category
-            if types:
-                type_order = 1
-                for type_name in types:
-                    await db.execute(
-                        """INSERT INTO document_types
-                           (category_id, name, display_order)
-                           VALUES (?, ?, ?)""",
-                        (category_id, type_name, type_order)
-                    )
-                    type_count += 1
-                    type_order += 1
-                    print(f"      └─ {type_name}")
-            else:
-                # Category with no subtypes - create a type with same name as category
-                await db.execute(
-                    """INSERT INTO document_types
-                       (category_id, name, display_order)
-                       VALUES (?, ?, ?)""",
-                    (category_id, category_name, 1)
-                )
-                type_count += 1
-                print(f"      └─ {category_name} (standalone)")
-
-            display_order += 1
-
-        await db.commit()
+        for category_name, type_name in stats['added']:
+            print(f"   + {category_name} → {type_name}")
+        for category_name, type_name in stats['removed']:
+            print(f"   - {category_name} → {type_name}")
 
         print()
         print("=" * 60)
         print("IMPORT SUMMARY")
         print("=" * 60)
-        print(f"✅ Categories imported: {category_count}")
-        print(f"✅ Document types imported: {type_count}")
+        if stats['unchanged']:
+            print("⏭️  Document types already up to date - nothing written")
+        elif dry_run:
+            print("🔍 Dry run - changes listed above were not written")
+        else:
+            print(f"✅ Categories imported: {stats['categories']}")
+            print(f"✅ Document types imported: {stats['types']}")
+        print(f"⏱️  {rows} rows in {elapsed:.3f}s ({rate:,.0f} rows/sec)")
         print()
 
         # Verify import
         print("🔍 Verifying import...")
-        cursor = await db.execute("SELECT COUNT(*) FROM document_categories")
-        cat_count = (await cursor.fetchone())[0]
-
-        cursor = await db.execute("SELECT COUNT(*) FROM document_types")
-        type_count_db = (await cursor.fetchone())[0]
-
-        print(f"   Categories in DB: {cat_count}")
-        print(f"   Types in DB: {type_count_db}")
+        categories = await db.get_document_types_hierarchical()
+        print(f"   Categories in DB: {len(categories)}")
+        print(f"   Types in DB: {sum(len(category['types']) for category in categories)}")
         print()
 
         # Show sample data
         print("📋 Sample data:")
-        cursor = await db.execute("""
-            SELECT c.name as category, dt.name as type
-            FROM document_categories c
-            LEFT JOIN document_types dt ON c.id = dt.category_id
-            ORDER BY c.display_order, dt.display_order
-            LIMIT 10
-        """)
-        rows = await cursor.fetchall()
-        for row in rows:
-            print(f"   {row[0]} → {row[1]}")
+        samples = [
+            (category['name'], doc_type['name'])
+            for category in categories
+            for doc_type in category['types'] or [{'name': None}]
+        ]
+        for category_name, type_name in samples[:10]:
+            print(f"   {category_name} → {type_name}")
         print()
 
         print("=" * 60)
         print("✅ IMPORT COMPLETE!")
         print("=" * 60)
+    finally:
+        await db.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(import_document_types())
+    parser = argparse.ArgumentParser(description="Import document categories and types")
+    parser.add_argument('--dry-run', action='store_true', help="Report what would change without writing")
+    args = parser.parse_args()
+    asyncio.run(import_document_types(dry_run=args.dry_run))
@@ -6,84 +6,113 @@ Async version for FastAPI backend
 import json
 import os
 import sys
+import time
+import argparse
 import asyncio
 from database_async import AsyncDatabase
 
-async def import_fields():
-    """Import fields from the JSON file"""
-    # Try different possible paths for the fields.json file
-    possible_paths = [
-        '/app/design/fields.json',  # Container path (mounted)
-        os.path.join(os.path.dirname(__file__), '../design/fields.json'),  # Local development
-        os.path.join(os.path.dirname(__file__), 'fields.json'),  # Same directory
-    ]
-
-    json_path = None
-    for path in possible_paths:
+# Possible locations of fields.json, in lookup order
+POSSIBLE_PATHS = [
+    '/app/design/fields.json',  # Container path (mounted)
+    os.path.join(os.path.dirname(__file__), '../design/fields.json'),  # Local development
+    os.path.join(os.path.dirname(__file__), 'fields.json'),  # Same directory
+]
+
+def iter_json_array(path: str, chunk_size: int = 64 * 1024):
+    """Yield the elements of a top-level JSON array without loading the whole file"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    started = False
+
+    with open(path, 'r', encoding='utf-8') as f:
+        while True:
+            # Skip whitespace and separators, reading more input as needed
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos == len(buffer):
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise ValueError(f"Unexpected end of file in {path}")
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError(f"Expected a JSON array in {path}")
+                started = True
+                pos += 1
+                continue
+
+            if buffer[pos] == ']':
+                return
+
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Element spans the chunk boundary
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+
+            yield item
+            pos = end
+
+def find_fields_json():
+    """Return the first fields.json found in the known locations, or None"""
+    for path in POSSIBLE_PATHS:
         if os.path.exists(path):
-            json_path = path
-            break
+            return path
+    return None
+
+async def import_fields(json_path: str = None, dry_run: bool = False, batch_size: int = 500):
+    """Import the fields from the JSON file, writing only rows that changed"""
+    json_path = json_path or find_fields_json()
 
     if json_path is None:
         print(f"❌ Error: fields.json not found in any of these locations:")
-        for path in possible_paths:
+        for path in POSSIBLE_PATHS:
             print(f"  - {path}")
         return False
 
     try:
-        # Load the JSON data
-        print(f"📂 Loading fields from {json_path}")
-        with open(json_path, 'r', encoding='utf-8') as f:
-            fields_data = json.load(f)
-
-        print(f"📊 Found {len(fields_data)} fields to import")
+        print(f"📂 Streaming fields from {json_path}")
 
         # Initialize database
         db = AsyncDatabase()
 
-        # Clear existing fields first (optional - uncomment if needed)
-        # print("🗑️  Clearing existing fields...")
-        # await db.clear_fields()
-
-        # Import each field
-        success_count = 0
-        error_count = 0
-
-        for i, field_data in enumerate(fields_data):
-            try:
-                # Validate required fields
-                if not field_data.get('field_id'):
-                    print(f"⚠️  Skipping field {i+1}: missing field_id")
-                    error_count += 1
-                    continue
-
-                if not field_data.get('name'):
-                    print(f"⚠️  Skipping field {i+1}: missing name")
-                    error_count += 1
-                    continue
-
-                # Import the field
-                if await db.create_field(field_data):
-                    success_count += 1
-                    if (success_count % 100) == 0:
-                        print(f"✅ Imported {success_count} fields...")
-                else:
-                    error_count += 1
-                    print(f"❌ Failed to import field: {field_data.get('name', 'Unknown')}")
-
-            except Exception as e:
-                error_count += 1
-                print(f"❌ Error importing field {i+1}: {e}")
+        started = time.perf_counter()
+        stats = await db.bulk_upsert_fields(
+            iter_json_array(json_path),
+            batch_size=batch_size,
+            dry_run=dry_run
+        )
+        elapsed = time.perf_counter() - started
+        rate = stats['processed'] / elapsed if elapsed > 0 else 0
 
         # Final results
-        print(f"\n📊 Import Results:")
-        print(f"✅ Successfully imported: {success_count} fields")
-        print(f"❌ Errors: {error_count} fields")
+        print(f"\n📊 {'Dry run' if dry_run else 'Import'} Results:")
+        print(f"📥 Processed: {stats['processed']} fields in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+        print(f"🆕 {'Would insert' if dry_run else 'Inserted'}: {stats['inserted']}")
+        print(f"✏️  {'Would update' if dry_run else 'Updated'}: {stats['updated']}")
+        print(f"⏭️  Unchanged: {stats['unchanged']}")
+        print(f"❌ Invalid (missing field_id or name): {stats['invalid']}")
+        if stats['stale']:
+            print(f"⚠️  In database but not in file: {stats['stale']}")
+
+        if dry_run:
+            for name in stats['changed'][:20]:
+                print(f"  ~ {name}")
+            if len(stats['changed']) > 20:
+                print(f"  ... and {len(stats['changed']) - 20} more")
 
         total_count = await db.get_field_count()
         print(f"📁 Total in database: {total_count} fields")
 
-        return success_count > 0
+        await db.close()
+        return stats['processed'] > stats['invalid']
 
     except Exception as e:
         print(f"❌ Critical error during import: {e}")
@@ -114,12 +143,21 @@ async def test_import():
     for field in search_results:
         print(f"  - {field['name']}")
 
+    await db.close()
+
 async def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="Import fields.json into the database")
+    parser.add_argument('--path', help="fields.json to import (default: search known locations)")
+    parser.add_argument('--dry-run', action='store_true', help="Report what would change without writing")
+    parser.add_argument('--batch-size', type=int, default=500, help="Rows per executemany batch")
+    args = parser.parse_args()
+
     print("🚀 Starting field import process...")
 
-    if await import_fields():
-        await test_import()
+    if await import_fields(args.path, dry_run=args.dry_run, batch_size=args.batch_size):
+        if not args.dry_run:
+            await test_import()
         print("\n✅ Field import completed successfully!")
         return 0
     else:
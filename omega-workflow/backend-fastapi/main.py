@@ -6,26 +6,30 @@ Modern async backend replacing Flask implementation
 
 import os
 import json
+import hashlib
 import uuid
 import tempfile
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Union, Tuple
 from pathlib import Path
 
-from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form, Query, status
+from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form, Query, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, EmailStr, validator
 import asyncio
 import aiofiles
-import aiosqlite
 from jose import jwt
 
 # Import async database layer
-from database_async import AsyncDatabase
-from extraction_service import ExtractionService
+from database_async import AsyncDatabase, DOCUMENT_SORT_COLUMNS
+from extraction_service import ExtractionService, NoWorkflowsAssignedError
+from field_catalog import FieldCatalog
+from principal_cache import PrincipalCache
+from password_hasher import PasswordHasher
+from response_cache import ResponseCache, CATALOG_STATIC_MAX_AGE, CATALOG_SEARCH_CACHE_MAX_ENTRIES
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -36,6 +40,50 @@ app = FastAPI(
     redoc_url="/api/redoc"
 )
 
+class UploadSizeLimitMiddleware:
+    """
+    Refuse an upload request body larger than MAX_UPLOAD_REQUEST_SIZE with 413
+
+    Starlette spools every multipart part to a temporary file before the
+    endpoint runs, so the per-file MAX_UPLOAD_SIZE check in save_upload can't
+    stop an oversized body from being received. A declared Content-Length over
+    the limit is refused before anything is read; bodies without one are
+    counted as they arrive.
+    """
+
+    def __init__(self, app, path: str):
+        self.app = app
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Upload exceeds {MAX_UPLOAD_REQUEST_SIZE // (1024*1024)}MB limit"
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > MAX_UPLOAD_REQUEST_SIZE:
+            response = JSONResponse({"detail": detail}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > MAX_UPLOAD_REQUEST_SIZE:
+                    # Raised while the form is parsed, so it surfaces as the 413 response
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+# Added before CORS so CORS wraps it and 413 responses stay readable cross-origin
+app.add_middleware(UploadSizeLimitMiddleware, path="/api/documents/upload")
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -43,19 +91,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag"],  # Pagination metadata for list endpoints
 )
 
 # Configuration
 JWT_SECRET = os.getenv("JWT_SECRET", "omega-workflow-secret-key-change-in-production")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24
+# Stream tokens travel in query strings (EventSource can't send headers), so they are short-lived and single-purpose
+EXTRACTION_STREAM_SCOPE = "extraction-events"
+EXTRACTION_STREAM_TOKEN_SECONDS = int(os.getenv("EXTRACTION_STREAM_TOKEN_SECONDS", "300"))
+# Per-request auth logging (token prefixes, payloads, login steps); off keeps the auth path quiet
+AUTH_VERBOSE = os.getenv("AUTH_VERBOSE", "false").lower() == "true"
 UPLOAD_DIR = Path("/app/uploads")
-MAX_UPLOAD_SIZE = 50 * 1024 * 1024  # 50MB
+MAX_UPLOAD_SIZE = 50 * 1024 * 1024  # 50MB per file
+MAX_UPLOAD_REQUEST_SIZE = int(os.getenv("MAX_UPLOAD_REQUEST_SIZE", str(4 * MAX_UPLOAD_SIZE)))  # Whole upload request body
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Uploads are streamed to disk in 1MB chunks
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "4"))  # Files of one request written at once
 
 # Initialize components
 security = HTTPBearer()  # For required auth
 security_optional = HTTPBearer(auto_error=False)  # For optional auth
 db = AsyncDatabase()
+field_catalog = FieldCatalog(db)
+principal_cache = PrincipalCache(db)
+password_hasher = PasswordHasher()
+response_cache = ResponseCache(db)
+search_cache = ResponseCache(db, max_entries=CATALOG_SEARCH_CACHE_MAX_ENTRIES)
 extraction_service = None
 
 # Ensure upload directory exists
@@ -73,10 +135,23 @@ async def startup_event():
     # Load workflows
     await load_workflows_from_database()
 
-    # Initialize extraction service
+    # Warm the field catalog so the first results request doesn't pay for it
+    await field_catalog.refresh()
+
+    # Initialize extraction service and resume any queued or orphaned jobs
     extraction_service = ExtractionService(db)
+    await extraction_service.start()
     print("✅ Extraction service initialized")
 
+# Shutdown event handler
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release external clients and pooled database connections"""
+    if extraction_service:
+        await extraction_service.cleanup()
+    password_hasher.shutdown()
+    await db.close()
+
 # Pydantic models
 class UserCreate(BaseModel):
     username: str
@@ -135,6 +210,11 @@ class DocumentUpdate(BaseModel):
         return v.strip()
 
 # Authentication utilities
+def auth_log(message: str):
+    """Print an auth-path message only when AUTH_VERBOSE is on"""
+    if AUTH_VERBOSE:
+        print(message)
+
 def create_access_token(data: dict) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
@@ -146,70 +226,101 @@ def create_access_token(data: dict) -> str:
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password against PBKDF2 hash"""
-    try:
-        # Check if it's a pbkdf2 hash
-        if hashed_password.startswith('pbkdf2:'):
-            import hashlib
-            parts = hashed_password.split(':')
-            if len(parts) == 3:
-                salt = parts[1]
-                stored_hash = parts[2]
-                salted_password = f"{salt}:{plain_password}"
-                computed_hash = hashlib.pbkdf2_hmac('sha256', salted_password.encode(), salt.encode(), 100000)
-                result = computed_hash.hex() == stored_hash
-                print(f"🔐 PBKDF2 verification result: {result}")
-                return result
-        
-        print(f"⚠️ Unknown hash format: {hashed_password[:20]}...")
-        return False
-        
-    except Exception as e:
-        print(f"Password verification error: {e}")
-        return False
-
-def get_password_hash(password: str) -> str:
-    """Hash password using PBKDF2 (reliable fallback)"""
-    # Use PBKDF2 directly for reliable password hashing
-    import hashlib
-    import secrets
-    salt = secrets.token_hex(16)
-    salted_password = f"{salt}:{password}"
-    hashed = hashlib.pbkdf2_hmac('sha256', salted_password.encode(), salt.encode(), 100000)
-    result = f"pbkdf2:{salt}:{hashed.hex()}"
-    print(f"✅ Generated PBKDF2 hash: {result[:30]}...")
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify password against a PBKDF2 hash (off the event loop)"""
+    result = await password_hasher.verify(plain_password, hashed_password)
+    auth_log(f"🔐 PBKDF2 verification result: {result}")
+    return result
+
+async def get_password_hash(password: str) -> str:
+    """Hash password using PBKDF2 (off the event loop)"""
+    result = await password_hasher.hash(password)
+    auth_log(f"✅ Generated PBKDF2 hash: {result[:30]}...")
     return result
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
     """Get current authenticated user from JWT token"""
+    return await _user_from_token(credentials.credentials)
+
+async def get_stream_user(
+    document_id: str,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security_optional),
+    stream_token: Optional[str] = Query(None, description="Token from POST .../extraction/events/token, for clients that cannot send headers (EventSource)")
+) -> Dict[str, Any]:
+    """
+    Get current user for a document's event stream
+
+    Accepts the usual Authorization header, or a short-lived stream token in
+    the query string. Query strings end up in access and proxy logs, so only
+    stream tokens are accepted there: they expire after
+    EXTRACTION_STREAM_TOKEN_SECONDS and only open this one document's
+    stream. Scrub the stream_token parameter from logs where possible.
+    """
+    if credentials:
+        return await _user_from_token(credentials.credentials)
+    if not stream_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await _user_from_token(stream_token, scope=EXTRACTION_STREAM_SCOPE, document_id=document_id)
+
+def create_stream_token(user_id: int, document_id: str) -> str:
+    """Create a short-lived token that only opens one document's extraction event stream"""
+    expire = datetime.utcnow() + timedelta(seconds=EXTRACTION_STREAM_TOKEN_SECONDS)
+    return jwt.encode(
+        {"sub": str(user_id), "scope": EXTRACTION_STREAM_SCOPE, "doc": document_id, "exp": expire},
+        JWT_SECRET, algorithm=JWT_ALGORITHM
+    )
+
+async def _user_from_token(token: str, scope: Optional[str] = None, document_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Validate a JWT and load its user (served from the principal cache when possible)
+
+    Scoped tokens (e.g. stream tokens) are only accepted when that scope is
+    asked for, and a scoped token must name the document it was issued for.
+    """
+    # Only general-purpose tokens are cached, so a cache hit can't bypass the scope check
+    if scope is None:
+        user = await principal_cache.get(token)
+        if user is not None:
+            return user
+
     try:
-        token = credentials.credentials
-        print(f"🔐 Validating token (first 20 chars): {token[:20]}...")
+        auth_log(f"🔐 Validating token (first 20 chars): {token[:20]}...")
 
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        print(f"✅ Token decoded successfully. Payload: {payload}")
+        auth_log(f"✅ Token decoded successfully. Payload: {payload}")
 
         user_id_str = payload.get("sub")
         if user_id_str is None:
-            print(f"❌ Token missing 'sub' claim")
+            auth_log(f"❌ Token missing 'sub' claim")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         user_id = int(user_id_str)
-        print(f"👤 User ID from token: {user_id}")
+        auth_log(f"👤 User ID from token: {user_id}")
+
+        if payload.get("scope") != scope or (scope is not None and payload.get("doc") != document_id):
+            auth_log(f"❌ Token scope {payload.get('scope')!r} not valid here")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
 
     except jwt.ExpiredSignatureError:
-        print(f"❌ Token has expired")
+        auth_log(f"❌ Token has expired")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token has expired",
             headers={"WWW-Authenticate": "Bearer"},
         )
     except jwt.JWTError as e:
-        print(f"❌ JWT validation error: {e}")
+        auth_log(f"❌ JWT validation error: {e}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
@@ -218,29 +329,31 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
 
     user = await db.get_user_by_id(user_id)
     if user is None:
-        print(f"❌ User {user_id} not found in database")
+        auth_log(f"❌ User {user_id} not found in database")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    print(f"✅ User authenticated successfully: {user['username']} (ID: {user['id']})")
+    if scope is None:
+        principal_cache.put(token, user, payload.get("exp"))
+    auth_log(f"✅ User authenticated successfully: {user['username']} (ID: {user['id']})")
     return user
 
 # Optional authentication for some endpoints
 async def get_current_user_optional(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security_optional)) -> Optional[Dict[str, Any]]:
     """Get current user if authenticated, None if not"""
-    print(f"🔓 Optional auth check - credentials present: {credentials is not None}")
+    auth_log(f"🔓 Optional auth check - credentials present: {credentials is not None}")
     if credentials is None:
-        print(f"   No credentials provided")
+        auth_log(f"   No credentials provided")
         return None
     try:
         user = await get_current_user(credentials)
-        print(f"   Optional auth successful")
+        auth_log(f"   Optional auth successful")
         return user
     except HTTPException as e:
-        print(f"   Optional auth failed: {e.detail}")
+        auth_log(f"   Optional auth failed: {e.detail}")
         return None
 
 # Health check
@@ -270,7 +383,7 @@ async def register(user_data: UserCreate):
             )
         
         # Hash password and create user
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash(user_data.password)
         user = await db.create_user(user_data.username, user_data.email, hashed_password)
         
         if not user:
@@ -310,16 +423,16 @@ async def register(user_data: UserCreate):
 async def login(user_data: UserLogin):
     """Authenticate user and return token (accepts username OR email)"""
     try:
-        print(f"🔐 Login attempt - username/email: {user_data.username}")
+        auth_log(f"🔐 Login attempt - username/email: {user_data.username}")
 
         # Try to get user by username first
         user = await db.get_user_by_username(user_data.username)
-        print(f"   User found by username: {user is not None}")
+        auth_log(f"   User found by username: {user is not None}")
 
         # If not found by username, try by email
         if not user:
             user = await db.get_user_by_email(user_data.username)
-            print(f"   User found by email: {user is not None}")
+            auth_log(f"   User found by email: {user is not None}")
 
         if not user:
             print(f"❌ User not found for: {user_data.username}")
@@ -329,12 +442,12 @@ async def login(user_data: UserLogin):
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        print(f"   User object: username={user['username']}, email={user['email']}")
-        print(f"   Password hash: {user['password_hash'][:30]}...")
+        auth_log(f"   User object: username={user['username']}, email={user['email']}")
+        auth_log(f"   Password hash: {user['password_hash'][:30]}...")
 
         # Verify password
-        password_valid = verify_password(user_data.password, user["password_hash"])
-        print(f"   Password valid: {password_valid}")
+        password_valid = await verify_password(user_data.password, user["password_hash"])
+        auth_log(f"   Password valid: {password_valid}")
 
         if not password_valid:
             print(f"❌ Invalid password for user: {user['username']}")
@@ -343,7 +456,15 @@ async def login(user_data: UserLogin):
                 detail="Invalid username or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        
+
+        # Upgrade legacy or outdated hashes now that we have the plain password
+        if password_hasher.needs_rehash(user["password_hash"]):
+            new_hash = await get_password_hash(user_data.password)
+            if await db.update_user_password_hash(user["id"], new_hash, current_hash=user["password_hash"]):
+                print(f"🔐 Upgraded password hash for user {user['id']}")
+                # Cached principals carry the user row; refresh just this user's (the users version doesn't move)
+                principal_cache.invalidate_user(user["id"])
+
         # Create access token
         access_token = create_access_token(data={"sub": user["id"]})
 
@@ -383,35 +504,45 @@ async def get_me(current_user: Dict[str, Any] = Depends(get_current_user)):
 # Fields endpoints
 @app.get("/api/fields")
 async def get_fields(
+    request: Request,
     search: Optional[str] = None,
     tags: Optional[str] = None,
     region: Optional[str] = None,
     limit: Optional[int] = None,
-    offset: Optional[int] = None
+    offset: Optional[int] = None,
+    cursor: Optional[str] = None
 ):
-    """Get available fields for workflow creation"""
-    try:
-        # Get fields from database
-        fields = await db.get_fields(
+    """
+    Get available fields for workflow creation
+
+    Pass the returned nextCursor as `cursor` to fetch the following page;
+    total is only reported on the first page.
+    """
+    async def build():
+        # One FTS query returns both the page and the total match count
+        fields, total_count, next_cursor = await db.search_fields(
             search=search,
             tags=tags,
             region=region,
             limit=limit,
-            offset=offset
-        )
-
-        # Get total count (with same filters)
-        total_count = await db.get_field_count(
-            search=search,
-            tags=tags,
-            region=region
+            offset=offset,
+            cursor=cursor
         )
 
         return {
             "fields": fields,
             "total": total_count,
-            "count": len(fields)
+            "count": len(fields),
+            "nextCursor": next_cursor
         }
+
+    try:
+        # Served from the response cache until the fields catalog changes; searches and
+        # cursor pages (one entry per query) get their own small cache
+        cache = search_cache if search or tags or cursor else response_cache
+        return await cache.respond(request, build, catalogs=('fields',))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         print(f"Error fetching fields: {e}")
         raise HTTPException(
@@ -421,9 +552,9 @@ async def get_fields(
 
 # Document types endpoints
 @app.get("/api/document-types")
-async def get_document_types():
+async def get_document_types(request: Request):
     """Get all document types organized by category (hierarchical structure)"""
-    try:
+    async def build():
         document_types = await db.get_document_types_hierarchical()
 
         return {
@@ -432,6 +563,10 @@ async def get_document_types():
             "total_categories": len(document_types),
             "total_types": sum(len(cat['types']) for cat in document_types)
         }
+
+    try:
+        # Served from the response cache until the document types are re-imported
+        return await response_cache.respond(request, build, catalogs=('document_types',))
     except Exception as e:
         print(f"Error fetching document types: {e}")
         raise HTTPException(
@@ -441,7 +576,18 @@ async def get_document_types():
 
 # Document endpoints
 @app.get("/api/documents")
-async def get_documents(current_user: Optional[Dict[str, Any]] = Depends(get_current_user_optional)):
+async def get_documents(
+    response: Response,
+    search: Optional[str] = None,
+    type: Optional[str] = None,
+    workflow_id: Optional[int] = None,
+    sort: str = 'uploadedAt',
+    order: str = 'desc',
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_user_optional)
+):
     """Get user's documents with workflow information (requires authentication)"""
     print(f"📄 GET /api/documents - current_user: {current_user['username'] if current_user else 'None'}")
 
@@ -452,31 +598,81 @@ async def get_documents(current_user: Optional[Dict[str, Any]] = Depends(get_cur
             detail="Authentication required"
         )
 
+    if sort not in DOCUMENT_SORT_COLUMNS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid sort field. Allowed: {', '.join(DOCUMENT_SORT_COLUMNS)}"
+        )
+
     print(f"✅ Fetching documents for user {current_user['id']}")
-    documents = await db.get_documents(current_user["id"])
+    # Documents and their workflow assignments come back from one grouped query
+    try:
+        documents, total_count, next_cursor = await db.get_documents_with_workflows(
+            current_user["id"],
+            search=search,
+            doc_type=type,
+            workflow_id=workflow_id,
+            sort=sort,
+            order=order,
+            limit=limit,
+            offset=offset,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    # Add workflow information and map field names for frontend compatibility
+    # Map database field names to frontend-expected field names
     for doc in documents:
-        # Get workflows
-        workflow_ids = await db.get_document_workflows(doc["id"])
-        workflow_names = []
-
-        for wf_id in workflow_ids:
-            workflow = next((wf for wf in saved_workflows if wf['id'] == wf_id), None)
-            if workflow:
-                workflow_names.append(workflow['name'])
-
-        doc["workflows"] = workflow_ids
-        doc["workflowNames"] = workflow_names
-
-        # Map database field names to frontend-expected field names
+        doc["workflows"] = doc.pop("workflow_ids")
+        doc["workflowNames"] = doc.pop("workflow_names")
         doc["type"] = doc.get("doc_type", "Unknown")  # Map doc_type -> type
         doc["uploadedAt"] = doc.get("upload_date")  # Map upload_date -> uploadedAt
         doc["uploadedBy"] = "You"  # Could be enhanced to show actual username
 
+    # Body stays a plain list for the frontend; paging metadata rides in headers
+    if total_count is not None:
+        response.headers["X-Total-Count"] = str(total_count)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
     print(f"   Returning {len(documents)} documents with mapped fields")
     return documents
 
+class UploadRejected(Exception):
+    """An uploaded file that fails validation (empty or too large)"""
+
+async def save_upload(file: UploadFile, file_path: Path) -> Tuple[int, str]:
+    """
+    Copy an upload to disk in chunks, enforcing MAX_UPLOAD_SIZE as it goes; returns (size, sha256)
+
+    The part has already been spooled by the multipart parser, so this bounds
+    what is kept per file, not what is received: UploadSizeLimitMiddleware
+    caps the request body itself.
+    """
+    size_limit_error = f"File size exceeds {MAX_UPLOAD_SIZE // (1024*1024)}MB limit"
+    # The multipart parser already knows the part size; reject before writing anything
+    if file.size is not None and file.size > MAX_UPLOAD_SIZE:
+        raise UploadRejected(size_limit_error)
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(file_path, 'wb') as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_UPLOAD_SIZE:
+                    raise UploadRejected(size_limit_error)
+                digest.update(chunk)
+                await f.write(chunk)
+        if size == 0:
+            raise UploadRejected("File is empty")
+    except BaseException:
+        # Never leave a partial file behind
+        file_path.unlink(missing_ok=True)
+        raise
+
+    return size, digest.hexdigest()
+
 @app.post("/api/documents/upload", response_model=UploadResponse)
 async def upload_documents(
     files: List[UploadFile] = File(...),
@@ -488,70 +684,56 @@ async def upload_documents(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No files provided"
         )
-    
-    uploaded_files = []
-    failed_files = []
-    
-    for file in files:
+
+    semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+
+    async def store(file: UploadFile) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, str]]]:
+        """Write one file to disk; returns (document row to insert, None) or (None, failure)"""
         if not file.filename:
-            failed_files.append({"name": "unnamed", "error": "No filename provided"})
-            continue
-        
+            return None, {"name": "unnamed", "error": "No filename provided"}
+
+        # Generate unique document ID and stream the file to disk
+        doc_id = str(uuid.uuid4())[:8]
+        file_extension = Path(file.filename).suffix
+        file_path = UPLOAD_DIR / f"{doc_id}_{file.filename}"
         try:
-            # Validate file size
-            content = await file.read()
-            if len(content) == 0:
-                failed_files.append({"name": file.filename, "error": "File is empty"})
-                continue
-            
-            if len(content) > MAX_UPLOAD_SIZE:
-                failed_files.append({
-                    "name": file.filename, 
-                    "error": f"File size exceeds {MAX_UPLOAD_SIZE // (1024*1024)}MB limit"
-                })
-                continue
-            
-            # Generate unique document ID and save file
-            doc_id = str(uuid.uuid4())[:8]
-            file_extension = Path(file.filename).suffix
-            safe_filename = f"{doc_id}_{file.filename}"
-            file_path = UPLOAD_DIR / safe_filename
-            
-            # Save file asynchronously
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(content)
-            
-            # Save to database
-            doc_info = await db.create_document(
-                user_id=current_user["id"],
-                doc_id=doc_id,
-                name=file.filename,
-                filename=file.filename,
-                size=len(content),
-                doc_type=file_extension.upper().lstrip('.') or 'Unknown',
-                file_path=str(file_path)
-            )
-            
-            if doc_info:
-                uploaded_files.append({
-                    "id": doc_id,
-                    "name": file.filename,
-                    "size": len(content),
-                    "type": file_extension.upper().lstrip('.') or 'Unknown',
-                    "success": True
-                })
-            else:
-                # Clean up file if database save failed
-                try:
-                    file_path.unlink()
-                except:
-                    pass
-                failed_files.append({"name": file.filename, "error": "Database save failed"})
-                
+            async with semaphore:
+                size, content_hash = await save_upload(file, file_path)
         except Exception as e:
-            failed_files.append({"name": file.filename, "error": str(e)})
-            continue
-    
+            return None, {"name": file.filename, "error": str(e)}
+
+        return {
+            "id": doc_id,
+            "name": file.filename,
+            "filename": file.filename,
+            "size": size,
+            "doc_type": file_extension.upper().lstrip('.') or 'Unknown',
+            "file_path": str(file_path),
+            "content_hash": content_hash
+        }, None
+
+    stored = await asyncio.gather(*(store(file) for file in files))
+    documents = [document for document, _ in stored if document]
+    failed_files = [failure for _, failure in stored if failure]
+
+    # Insert every document row in one transaction
+    created_ids = {doc["id"] for doc in await db.create_documents(current_user["id"], documents)}
+
+    uploaded_files = []
+    for document in documents:
+        if document["id"] in created_ids:
+            uploaded_files.append({
+                "id": document["id"],
+                "name": document["name"],
+                "size": document["size"],
+                "type": document["doc_type"],
+                "success": True
+            })
+        else:
+            # Clean up file if database save failed
+            Path(document["file_path"]).unlink(missing_ok=True)
+            failed_files.append({"name": document["name"], "error": "Database save failed"})
+
     success_count = len(uploaded_files)
     total_files = success_count + len(failed_files)
     
@@ -738,6 +920,7 @@ async def get_workflows():
     return workflows
 
 @app.get("/api/analyze/workflows/templates")
+@response_cache.cached(max_age=CATALOG_STATIC_MAX_AGE)
 async def get_templates():
     """Get workflow templates"""
     templates = [
@@ -906,9 +1089,9 @@ class WorkflowAssignment(BaseModel):
     workflowIds: List[Union[str, int]]
 
 # Field validation helper functions
-async def validate_field_ids(field_ids: list, db_instance: AsyncDatabase) -> tuple[bool, list]:
+async def validate_field_ids(field_ids: list, catalog: FieldCatalog) -> tuple[bool, list]:
     """
-    Validate that all field_ids exist in the fields table
+    Validate that all field_ids exist in the field catalog
     Returns (is_valid, invalid_field_ids)
 
     Note: If field names are provided instead of UUIDs, they will be validated against field names in database
@@ -922,45 +1105,34 @@ async def validate_field_ids(field_ids: list, db_instance: AsyncDatabase) -> tup
     field_id_list = [fid for fid in field_ids if re.match(uuid_pattern, fid, re.IGNORECASE)]
     field_name_list = [fid for fid in field_ids if not re.match(uuid_pattern, fid, re.IGNORECASE)]
 
-    invalid_ids = []
-
-    # Validate field IDs (UUIDs)
-    if field_id_list:
-        placeholders = ','.join(['?'] * len(field_id_list))
-        query = f"SELECT field_id FROM fields WHERE field_id IN ({placeholders})"
-
-        try:
-            import aiosqlite
-            async with await db_instance.get_connection() as conn:
-                conn.row_factory = None  # We only need values
-                cursor = await conn.execute(query, tuple(field_id_list))
-                results = await cursor.fetchall()
-                valid_ids = {row[0] for row in results}
-
-                invalid_ids.extend([fid for fid in field_id_list if fid not in valid_ids])
-        except Exception as e:
-            print(f"Error validating field_ids: {e}")
-            raise
+    try:
+        invalid_ids = await catalog.find_missing(field_id_list, field_name_list)
+    except Exception as e:
+        print(f"Error validating field_ids: {e}")
+        raise
 
-    # Validate field names
-    if field_name_list:
-        placeholders = ','.join(['?'] * len(field_name_list))
-        query = f"SELECT name FROM fields WHERE name IN ({placeholders})"
+    return len(invalid_ids) == 0, invalid_ids
 
-        try:
-            import aiosqlite
-            async with await db_instance.get_connection() as conn:
-                conn.row_factory = None  # We only need values
-                cursor = await conn.execute(query, tuple(field_name_list))
-                results = await cursor.fetchall()
-                valid_names = {row[0] for row in results}
-
-                invalid_ids.extend([fname for fname in field_name_list if fname not in valid_names])
-        except Exception as e:
-            print(f"Error validating field names: {e}")
-            raise
+async def resolve_template_fields(fields_data, catalog: FieldCatalog):
+    """
+    Resolve bare field names in a template to {'fieldId', 'name'} entries using the field catalog
+    Names that are not in the catalog are left as-is so validation can report them
+    """
+    async def resolve(field):
+        if isinstance(field, str):
+            catalog_field = await catalog.get_by_name(field)
+            if catalog_field:
+                return {'fieldId': catalog_field['field_id'], 'name': field}
+        return field
 
-    return len(invalid_ids) == 0, invalid_ids
+    if isinstance(fields_data, dict):
+        return {
+            group: [await resolve(field) for field in group_fields] if isinstance(group_fields, list) else group_fields
+            for group, group_fields in fields_data.items()
+        }
+    if isinstance(fields_data, list):
+        return [await resolve(field) for field in fields_data]
+    return fields_data
 
 def extract_field_ids_from_workflow(fields_data):
     """
@@ -1691,7 +1863,12 @@ async def create_workflow_from_template(workflow_id: str, template_data: Workflo
         workflow_sessions[workflow_id]['name'] = template_data.templateName
         workflow_sessions[workflow_id]['currentStep'] = 2
         workflow_sessions[workflow_id]['updatedAt'] = datetime.utcnow().isoformat()
-    
+
+    # Templates list some fields by name only; attach their Zuva field IDs
+    workflow_sessions[workflow_id]['fields'] = await resolve_template_fields(
+        workflow_sessions[workflow_id].get('fields', []), field_catalog
+    )
+
     return {'success': True, 'workflow': workflow_sessions[workflow_id]}
 
 @app.post("/api/analyze/workflows/create/{workflow_id}/fields")
@@ -1752,7 +1929,7 @@ async def save_workflow(
     # Validate field_ids exist in database
     if field_ids:
         try:
-            is_valid, invalid_field_ids = await validate_field_ids(field_ids, db)
+            is_valid, invalid_field_ids = await validate_field_ids(field_ids, field_catalog)
 
             if not is_valid:
                 print(f"Validation failed: Invalid field_ids found: {invalid_field_ids}")
@@ -1924,7 +2101,7 @@ async def assign_document_workflows(
             workflow = await db.get_workflow(wf_id, current_user["id"])
             if not workflow:
                 # Check if workflow exists for any user (to distinguish between not found vs access denied)
-                async with aiosqlite.connect(db.db_path) as conn:
+                async with db.connection() as conn:
                     cursor = await conn.execute("SELECT name, user_id FROM workflows WHERE id = ?", (wf_id,))
                     other_workflow = await cursor.fetchone()
 
@@ -1968,7 +2145,7 @@ async def assign_document_workflows(
 # Helper functions for extraction results
 async def _enrich_field_metadata(field_id: str) -> Dict[str, Any]:
     """
-    Enrich field ID with metadata from fields table
+    Enrich field ID with metadata from the field catalog
 
     Args:
         field_id: Field ID to enrich
@@ -1977,9 +2154,8 @@ async def _enrich_field_metadata(field_id: str) -> Dict[str, Any]:
         Dictionary with field metadata (name, description, type, etc.)
     """
     try:
-        # Query fields table
-        fields = await db.get_fields()
-        field_data = next((f for f in fields if f['field_id'] == field_id), None)
+        # Look up in the in-memory field catalog
+        field_data = await field_catalog.get(field_id)
 
         if field_data:
             return {
@@ -2047,138 +2223,143 @@ def _enrich_extraction_bbox(extraction: Dict[str, Any]) -> Dict[str, Any]:
     return extraction
 
 
-async def _get_single_workflow_results(document_id: str, workflow_id: int) -> Dict[str, Any]:
+async def _build_workflow_results(extraction: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Get extraction results for a single document-workflow pair with enriched field metadata
+    Build the results response for one extraction row (already joined with its workflow)
 
     Args:
-        document_id: Document ID
-        workflow_id: Workflow ID
+        extraction: Row from db.get_extractions_with_workflows with decoded results
 
     Returns:
         Extraction results with field metadata
     """
-    try:
-        # Query extractions table
-        extraction = await db.get_extraction_by_document_workflow(
-            document_id, workflow_id
-        )
+    document_id = extraction['document_id']
+    workflow_id = extraction['workflow_id']
 
-        if not extraction:
-            return {
-                "status": "not_found",
-                "message": "No extractions found for this document and workflow"
-            }
+    # Check status
+    if extraction['status'] != 'complete':
+        return {
+            "status": extraction['status'],
+            "message": f"Extraction is {extraction['status']}",
+            "documentId": document_id,
+            "workflowId": workflow_id,
+            "extractedAt": extraction.get('completed_at'),
+            "startedAt": extraction.get('started_at'),
+            "createdAt": extraction.get('created_at'),
+            "errorMessage": extraction.get('error_message')
+        }
 
-        # Check status
-        if extraction['status'] != 'complete':
-            return {
-                "status": extraction['status'],
-                "message": f"Extraction is {extraction['status']}",
-                "documentId": document_id,
-                "workflowId": workflow_id,
-                "extractedAt": extraction.get('completed_at'),
-                "startedAt": extraction.get('started_at'),
-                "createdAt": extraction.get('created_at'),
-                "errorMessage": extraction.get('error_message')
-            }
+    extraction_data = extraction.get('results', {})
+    answer_metadata = extraction.get('answer_metadata', {})
 
-        # Parse results JSON
-        extraction_data = extraction.get('results', {})
-        answer_metadata = extraction.get('answer_metadata', {})
+    if not extraction_data:
+        response = {
+            "status": "complete",
+            "message": "Extraction complete but no results available",
+            "documentId": document_id,
+            "workflowId": workflow_id,
+            "extractedAt": extraction.get('completed_at'),
+            "fields": {}
+        }
+        if extraction.get('decode_error'):
+            # Stored results exist but can't be read; don't pass that off as an empty extraction
+            response["message"] = "Extraction complete but its stored results could not be read"
+            response["errorMessage"] = extraction['decode_error']
+        return response
 
-        if not extraction_data:
-            return {
-                "status": "complete",
-                "message": "Extraction complete but no results available",
-                "documentId": document_id,
-                "workflowId": workflow_id,
-                "extractedAt": extraction.get('completed_at'),
-                "fields": {}
-            }
+    workflow_name = extraction.get('workflow_name')
 
-        # Fetch workflow to get field names and structure
-        workflow = None
-        workflow_name = None
-        try:
-            # Get workflow without user_id restriction for extraction results
-            import aiosqlite
-            async with aiosqlite.connect(db.db_path) as conn:
-                conn.row_factory = aiosqlite.Row
-                cursor = await conn.execute("""
-                    SELECT id, user_id, name, description, fields, document_types, status, created_at, updated_at
-                    FROM workflows WHERE id = ?
-                """, (workflow_id,))
-                row = await cursor.fetchone()
-                workflow = dict(row) if row else None
-                if workflow:
-                    workflow_name = workflow.get('name', f'Workflow {workflow_id}')
-        except Exception as e:
-            print(f"Warning: Could not fetch workflow {workflow_id}: {e}")
+    # Build response with enriched field details
+    enriched_fields = {}
 
-        # Build response with enriched field details
-        enriched_fields = {}
+    # Iterate through extraction results and enrich with metadata
+    for field_id, field_results in extraction_data.items():
+        # Get field metadata
+        field_metadata = await _enrich_field_metadata(field_id)
 
-        # Iterate through extraction results and enrich with metadata
-        for field_id, field_results in extraction_data.items():
-            # Get field metadata
-            field_metadata = await _enrich_field_metadata(field_id)
+        # Check if this is an answer-type field
+        field_answer_metadata = answer_metadata.get(field_id) if answer_metadata else None
 
-            # Check if this is an answer-type field
-            field_answer_metadata = answer_metadata.get(field_id) if answer_metadata else None
+        # Enrich extractions with bbox from spans if needed
+        extractions_list = field_results if isinstance(field_results, list) else [field_results]
+        enriched_extractions = [_enrich_extraction_bbox(ext) for ext in extractions_list]
 
-            # Enrich extractions with bbox from spans if needed
-            extractions_list = field_results if isinstance(field_results, list) else [field_results]
-            enriched_extractions = [_enrich_extraction_bbox(ext) for ext in extractions_list]
+        # Structure: { field_id: { metadata, extractions, answers, answerOptions } }
+        field_data = {
+            'metadata': field_metadata,
+            'extractions': enriched_extractions
+        }
 
-            # Structure: { field_id: { metadata, extractions, answers, answerOptions } }
-            field_data = {
-                'metadata': field_metadata,
-                'extractions': enriched_extractions
-            }
+        # Add answer-specific data if available
+        if field_answer_metadata:
+            field_data['hasAnswers'] = True
+            field_data['answers'] = field_answer_metadata.get('answers', [])  # [{option: "c", value: "..."}]
+            field_data['answerOptions'] = field_answer_metadata.get('answer_options', {})  # {a: "...", b: "..."}
+            field_data['fieldName'] = field_answer_metadata.get('field_name', '')
+        else:
+            field_data['hasAnswers'] = False
 
-            # Add answer-specific data if available
-            if field_answer_metadata:
-                field_data['hasAnswers'] = True
-                field_data['answers'] = field_answer_metadata.get('answers', [])  # [{option: "c", value: "..."}]
-                field_data['answerOptions'] = field_answer_metadata.get('answer_options', {})  # {a: "...", b: "..."}
-                field_data['fieldName'] = field_answer_metadata.get('field_name', '')
-            else:
-                field_data['hasAnswers'] = False
+        enriched_fields[field_id] = field_data
 
-            enriched_fields[field_id] = field_data
+    return {
+        "status": "complete",
+        "documentId": document_id,
+        "workflowId": workflow_id,
+        "workflowName": workflow_name,
+        "extractedAt": extraction.get('completed_at'),
+        "startedAt": extraction.get('started_at'),
+        "createdAt": extraction.get('created_at'),
+        "fieldCount": len(enriched_fields),
+        "fields": enriched_fields
+    }
 
-        response = {
-            "status": "complete",
-            "documentId": document_id,
-            "workflowId": workflow_id,
-            "workflowName": workflow_name,
-            "extractedAt": extraction.get('completed_at'),
-            "startedAt": extraction.get('started_at'),
-            "createdAt": extraction.get('created_at'),
-            "fieldCount": len(enriched_fields),
-            "fields": enriched_fields
-        }
+async def _get_single_workflow_results(document_id: str, workflow_id: int) -> Dict[str, Any]:
+    """
+    Get extraction results for a single document-workflow pair with enriched field metadata
 
-        return response
+    Args:
+        document_id: Document ID
+        workflow_id: Workflow ID
+
+    Returns:
+        Extraction results with field metadata
+    """
+    try:
+        extractions, _ = await db.get_extractions_with_workflows(document_id, workflow_id)
+
+        if not extractions:
+            return {
+                "status": "not_found",
+                "message": "No extractions found for this document and workflow"
+            }
+
+        return await _build_workflow_results(extractions[0])
 
     except Exception as e:
         print(f"Error fetching single workflow extraction results: {e}")
         raise
 
-async def _get_all_workflow_results(document_id: str) -> Dict[str, Any]:
+async def _get_all_workflow_results(
+    document_id: str,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Get extraction results for all workflows associated with a document
 
     Args:
         document_id: Document ID
+        limit: Maximum workflows per page (all if omitted)
+        cursor: Continuation token from a previous page's nextCursor
 
     Returns:
         List of extraction results for all workflows
     """
     try:
-        # Get all extractions for this document
-        extractions = await db.get_document_extractions(document_id)
+        # One query fetches every extraction with its workflow name
+        extractions, next_cursor = await db.get_extractions_with_workflows(
+            document_id, limit=limit, cursor=cursor
+        )
 
         if not extractions:
             return {
@@ -2194,10 +2375,8 @@ async def _get_all_workflow_results(document_id: str) -> Dict[str, Any]:
         for extraction in extractions:
             workflow_id = extraction['workflow_id']
 
-            # Get results for each workflow
             try:
-                workflow_result = await _get_single_workflow_results(document_id, workflow_id)
-                workflow_results.append(workflow_result)
+                workflow_results.append(await _build_workflow_results(extraction))
             except Exception as e:
                 print(f"Warning: Could not get results for workflow {workflow_id}: {e}")
                 workflow_results.append({
@@ -2210,7 +2389,8 @@ async def _get_all_workflow_results(document_id: str) -> Dict[str, Any]:
             "status": "success",
             "documentId": document_id,
             "workflowCount": len(workflow_results),
-            "workflows": workflow_results
+            "workflows": workflow_results,
+            "nextCursor": next_cursor
         }
 
     except Exception as e:
@@ -2220,10 +2400,16 @@ async def _get_all_workflow_results(document_id: str) -> Dict[str, Any]:
 @app.post("/api/documents/{document_id}/extract")
 async def start_document_extraction(
     document_id: str,
-    workflow_id: int,
+    workflow_id: Optional[int] = Query(None, description="Workflow ID (optional - extracts all assigned workflows in one request if omitted)"),
+    refresh: bool = Query(False, description="Re-extract completed extractions without reusing cached field results"),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
-    """Start field extraction for a document-workflow pair"""
+    """
+    Start field extraction for a document-workflow pair
+    Without workflow_id, every workflow assigned to the document is extracted
+    through a single combined Zuva request. Fields already extracted from the
+    same file are reused unless refresh is set.
+    """
     try:
         # Verify document belongs to user
         document = await db.get_document(document_id, user_id=current_user["id"])
@@ -2241,11 +2427,35 @@ async def start_document_extraction(
                 detail="Document file not found"
             )
 
+        # Document-level mode: one Zuva request covering all assigned workflows
+        if workflow_id is None:
+            group = await extraction_service.start_document_extraction(
+                document_id=document_id,
+                document_path=file_path,
+                refresh=refresh
+            )
+
+            return {
+                "success": True,
+                "group_id": group['group_id'],
+                "extractions": [
+                    {
+                        "workflow_id": extraction['workflow_id'],
+                        "extraction_id": extraction['id'],
+                        "status": extraction['status'],
+                        **({"error": extraction['error']} if extraction.get('error') else {})
+                    }
+                    for extraction in group['extractions']
+                ],
+                "message": "Extraction started successfully"
+            }
+
         # Start extraction
         extraction = await extraction_service.start_extraction(
             document_id=document_id,
             workflow_id=workflow_id,
-            document_path=file_path
+            document_path=file_path,
+            refresh=refresh
         )
 
         return {
@@ -2257,6 +2467,11 @@ async def start_document_extraction(
 
     except HTTPException:
         raise
+    except NoWorkflowsAssignedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except Exception as e:
         print(f"Error starting extraction: {e}")
         raise HTTPException(
@@ -2303,10 +2518,147 @@ async def get_extraction_status(
             detail="Failed to get extraction status"
         )
 
+@app.post("/api/documents/{document_id}/extraction/cancel")
+async def cancel_document_extraction(
+    document_id: str,
+    workflow_id: int,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Cancel a queued or running extraction for a document-workflow pair"""
+    try:
+        # Verify document belongs to user
+        document = await db.get_document(document_id, user_id=current_user["id"])
+        if not document:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Document not found"
+            )
+
+        cancelled = await extraction_service.cancel_extraction(
+            document_id=document_id,
+            workflow_id=workflow_id
+        )
+
+        if not cancelled:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="No queued or running extraction to cancel"
+            )
+
+        return {
+            "success": True,
+            "message": "Extraction cancelled"
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error cancelling extraction: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to cancel extraction"
+        )
+
+# Seconds between keep-alive comments on idle event streams
+EXTRACTION_EVENTS_HEARTBEAT_SECONDS = float(os.getenv('EXTRACTION_EVENTS_HEARTBEAT_SECONDS', '15'))
+
+def _sse_message(event: str, data: Dict[str, Any], event_id: Optional[str] = None) -> str:
+    """Format one Server-Sent Events message"""
+    lines = [f"id: {event_id}"] if event_id else []
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+@app.post("/api/documents/{document_id}/extraction/events/token")
+async def create_extraction_events_token(
+    document_id: str,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Issue a short-lived token that opens this document's extraction event stream"""
+    document = await db.get_document(document_id, user_id=current_user["id"])
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    return {
+        "token": create_stream_token(current_user["id"], document_id),
+        "expiresIn": EXTRACTION_STREAM_TOKEN_SECONDS
+    }
+
+@app.get("/api/documents/{document_id}/extraction/events")
+async def stream_extraction_events(
+    document_id: str,
+    request: Request,
+    workflow_id: Optional[int] = Query(None, description="Only events of this workflow"),
+    cursor: Optional[str] = Query(None, description="Last event id received (alternative to the Last-Event-ID header)"),
+    current_user: Dict[str, Any] = Depends(get_stream_user)
+):
+    """
+    Stream extraction progress for a document as Server-Sent Events
+    Sends a 'snapshot' of current extraction states, then an 'extraction' event for every
+    status change (pending, processing, complete, failed) and pipeline stage as it happens.
+    Reconnecting with Last-Event-ID (EventSource does this automatically) or ?cursor=
+    replays missed events; if they are no longer available a fresh snapshot is sent instead.
+    EventSource cannot set headers, so browsers pass a stream token from
+    POST /api/documents/{id}/extraction/events/token as ?stream_token= (never the login JWT).
+    The token is checked when the stream opens; once it expires, a dropped connection needs a
+    new token and reconnects with ?cursor= set to the last event id received.
+    """
+    # Ownership is checked once per connection, not per update
+    document = await db.get_document(document_id, user_id=current_user["id"])
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+
+    last_event_id = request.headers.get("last-event-id") or cursor
+
+    def matches(event: Dict[str, Any]) -> bool:
+        return event['document_id'] == document_id and (workflow_id is None or event['workflow_id'] == workflow_id)
+
+    async def event_stream():
+        subscription = extraction_service.events.subscribe(matches, cursor=last_event_id)
+        try:
+            yield "retry: 3000\n\n"
+
+            if subscription.resync:
+                states = await db.get_document_extraction_states(document_id)
+                yield _sse_message("snapshot", {
+                    "document_id": document_id,
+                    "extractions": [state for state in states if workflow_id is None or state['workflow_id'] == workflow_id]
+                }, subscription.position)
+
+            for event in subscription.replay:
+                subscription.mark_sent(event)
+                yield _sse_message("extraction", event, event['id'])
+
+            while True:
+                event = await subscription.next(EXTRACTION_EVENTS_HEARTBEAT_SECONDS)
+                if event is not None:
+                    yield _sse_message("extraction", event, event['id'])
+                    continue
+
+                # Fell too far behind: end the stream so the client reconnects and replays
+                if subscription.overflowed or await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/documents/{document_id}/extraction/results")
 async def get_extraction_results(
     document_id: str,
     workflow_id: Optional[int] = Query(None, description="Workflow ID (optional - returns all workflows if omitted)"),
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Workflows per page when workflow_id is omitted"),
+    cursor: Optional[str] = Query(None, description="nextCursor from the previous page"),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """
@@ -2328,10 +2680,12 @@ async def get_extraction_results(
             return await _get_single_workflow_results(document_id, workflow_id)
 
         # Otherwise, return all workflow results for this document
-        return await _get_all_workflow_results(document_id)
+        return await _get_all_workflow_results(document_id, limit=limit, cursor=cursor)
 
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         print(f"Error getting extraction results: {e}")
         raise HTTPException(
@@ -2339,9 +2693,214 @@ async def get_extraction_results(
             detail=f"Failed to get extraction results: {str(e)}"
         )
 
+# Bulk extraction batches
+class BatchExtractionRequest(BaseModel):
+    documentIds: List[str]
+    workflowIds: List[int]
+
+async def _get_user_batch(batch_id: str, user_id: int) -> Dict[str, Any]:
+    """Batch progress for its owner; 404 otherwise"""
+    batch = await extraction_service.get_batch_status(batch_id, user_id)
+    if not batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Extraction batch not found"
+        )
+    return batch
+
+@app.post("/api/extractions/batches", status_code=status.HTTP_202_ACCEPTED)
+async def start_batch_extraction(
+    request: BatchExtractionRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Start extraction for every document x workflow pair
+    Returns one batch id; poll the batch for aggregate progress and page through
+    its results as extractions complete
+    """
+    try:
+        document_ids = list(dict.fromkeys(request.documentIds))
+        workflow_ids = list(dict.fromkeys(request.workflowIds))
+        if not document_ids or not workflow_ids:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="documentIds and workflowIds must not be empty"
+            )
+
+        # Verify every document and workflow belongs to user
+        documents = await db.get_documents_by_ids(document_ids, user_id=current_user["id"])
+        missing_documents = [doc_id for doc_id in document_ids if doc_id not in documents]
+        missing_workflows = [
+            workflow_id for workflow_id in workflow_ids
+            if not await db.get_workflow(workflow_id, user_id=current_user["id"])
+        ]
+        if missing_documents or missing_workflows:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={
+                    "message": "Documents or workflows not found",
+                    "documentIds": missing_documents[:50],
+                    "workflowIds": missing_workflows
+                }
+            )
+
+        batch = await extraction_service.start_batch_extraction(
+            user_id=current_user["id"],
+            documents=[documents[doc_id] for doc_id in document_ids],
+            workflow_ids=workflow_ids
+        )
+
+        return {
+            "success": True,
+            "batch_id": batch['id'],
+            **batch,
+            "message": "Batch extraction started successfully"
+        }
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        print(f"Error starting batch extraction: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to start batch extraction: {str(e)}"
+        )
+
+@app.get("/api/extractions/batches/{batch_id}")
+async def get_batch_extraction_status(
+    batch_id: str,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Aggregate progress of a batch: item counts per status, finished/remaining and done flag"""
+    try:
+        return await _get_user_batch(batch_id, current_user["id"])
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error getting batch status: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get batch status"
+        )
+
+@app.get("/api/extractions/batches/{batch_id}/items")
+async def get_batch_extraction_items(
+    batch_id: str,
+    item_status: Optional[str] = Query(None, alias="status", description="Only items in this status (pending, processing, complete, failed, skipped)"),
+    limit: int = Query(100, ge=1, le=500, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="nextCursor from the previous page"),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Page through a batch's document-workflow pairs with their extraction status"""
+    try:
+        await _get_user_batch(batch_id, current_user["id"])
+
+        items, next_cursor = await db.get_extraction_batch_items(
+            batch_id, status=item_status, limit=limit, cursor=cursor
+        )
+
+        return {
+            "batchId": batch_id,
+            "items": items,
+            "nextCursor": next_cursor
+        }
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        print(f"Error getting batch items: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get batch items"
+        )
+
+@app.get("/api/extractions/batches/{batch_id}/results")
+async def get_batch_extraction_results(
+    batch_id: str,
+    limit: int = Query(20, ge=1, le=100, description="Extractions per page"),
+    cursor: Optional[str] = Query(None, description="nextCursor from the previous call"),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Get results of a batch's completed extractions, oldest completion first
+    Pass back nextCursor to receive only extractions completed since the previous call;
+    keep polling until done is true (an empty page only means nothing new has completed yet)
+    """
+    try:
+        batch = await _get_user_batch(batch_id, current_user["id"])
+
+        # Results completed within the last second are held back (see get_extraction_batch_results);
+        # the threshold is taken before the query so everything older than it is on this page
+        settled_before = (datetime.utcnow() - timedelta(seconds=1)).strftime('%Y-%m-%d %H:%M:%S')
+        extractions, next_cursor = await db.get_extraction_batch_results(batch_id, limit=limit, cursor=cursor)
+
+        results = []
+        for extraction in extractions:
+            result = await _build_workflow_results(extraction)
+            result['extractionId'] = extraction['id']
+            results.append(result)
+
+        last_completed_at = batch.get('last_completed_at')
+        done = (
+            batch['done']
+            and len(extractions) < limit
+            and (not last_completed_at or last_completed_at < settled_before)
+        )
+
+        return {
+            "batchId": batch_id,
+            "done": done,
+            "progress": batch['progress'],
+            "resultCount": len(results),
+            "results": results,
+            "nextCursor": next_cursor
+        }
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        print(f"Error getting batch results: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get batch results: {str(e)}"
+        )
+
+@app.get("/api/metrics/extractions")
+async def get_extraction_metrics(
+    since_hours: float = Query(24, gt=0, le=24 * 90, description="Window of completed extractions to aggregate"),
+    workflow_id: Optional[int] = Query(None, description="Restrict to one workflow"),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Extraction latency metrics for the current user's documents
+    Returns p50/p95/p99 per pipeline stage (upload, request, wait, fetch, parse, enrich, save),
+    overall and broken down by workflow and file size bucket, plus payload size percentiles
+    """
+    try:
+        return await extraction_service.get_extraction_metrics(
+            current_user["id"],
+            since_hours=since_hours,
+            workflow_id=workflow_id
+        )
+
+    except Exception as e:
+        print(f"Error getting extraction metrics: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get extraction metrics"
+        )
+
 # ==================== Market Maps API Endpoints ====================
 
 @app.get("/api/market-maps/trending")
+@response_cache.cached(max_age=CATALOG_STATIC_MAX_AGE)
 async def get_market_trends():
     """Get trending market data for visualization"""
     return {
@@ -2368,6 +2927,7 @@ async def get_market_trends():
     }
 
 @app.get("/api/market-maps/market-size")
+@response_cache.cached(max_age=CATALOG_STATIC_MAX_AGE)
 async def get_market_size():
     """Get market size metrics and data"""
     return {
@@ -2400,6 +2960,7 @@ async def get_market_size():
     }
 
 @app.get("/api/market-maps/strategies")
+@response_cache.cached(max_age=CATALOG_STATIC_MAX_AGE)
 async def get_ma_strategies():
     """Get M&A strategy recommendations"""
     return {
@@ -2444,6 +3005,7 @@ async def get_ma_strategies():
     }
 
 @app.get("/api/market-maps/companies")
+@response_cache.cached(max_age=CATALOG_STATIC_MAX_AGE)
 async def get_target_companies(category: str = None):
     """Get list of potential M&A target companies"""
     companies = [
@@ -2473,6 +3035,7 @@ async def get_target_companies(category: str = None):
     }
 
 @app.get("/api/market-maps/analyses")
+@response_cache.cached(max_age=CATALOG_STATIC_MAX_AGE)
 async def get_market_analyses():
     """Get market analysis documents"""
     return {
@@ -2535,6 +3098,8 @@ Other Endpoints:
   GET /api/analyze/workflows          - List workflows
   GET /api/analyze/workflows/templates - List templates
   GET /api/documents                  - List documents
+  POST /api/extractions/batches       - Bulk extraction (documents x workflows)
+  GET /api/metrics/extractions        - Extraction stage timings
 
 Press Ctrl+C to stop the server
 ========================================
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Password Hasher
+PBKDF2 password hashing on a dedicated, bounded thread pool
+"""
+
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+# Work factor for new hashes; stored hashes with fewer iterations are upgraded on login
+PASSWORD_HASH_ITERATIONS = int(os.getenv('PASSWORD_HASH_ITERATIONS', '100000'))
+
+# Hashes computed at once; further logins queue instead of taking over every core
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(min(2, os.cpu_count() or 1))))
+
+HASH_ALGORITHM = 'pbkdf2_sha256'
+LEGACY_PREFIX = 'pbkdf2:'
+LEGACY_ITERATIONS = 100000
+
+
+def hash_password(password: str, iterations: int = PASSWORD_HASH_ITERATIONS) -> str:
+    """Hash a password as 'pbkdf2_sha256$<iterations>$<salt>$<hash>' (blocking)"""
+    salt = secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), iterations)
+    return f"{HASH_ALGORITHM}${iterations}${salt}${digest.hex()}"
+
+
+def parse_hash(stored_hash: str) -> Optional[Tuple[int, str, str, bool]]:
+    """(iterations, salt, hex digest, is_legacy) for a stored hash, or None if unrecognised"""
+    if stored_hash.startswith(LEGACY_PREFIX):
+        # Original format: 'pbkdf2:<salt>:<hash>', salt also prefixed to the password
+        parts = stored_hash.split(':')
+        if len(parts) == 3:
+            return LEGACY_ITERATIONS, parts[1], parts[2], True
+        return None
+
+    parts = stored_hash.split('$')
+    if len(parts) == 4 and parts[0] == HASH_ALGORITHM and parts[1].isdigit():
+        return int(parts[1]), parts[2], parts[3], False
+    return None
+
+
+def verify_password(password: str, stored_hash: str) -> bool:
+    """Check a password against a stored hash in either format (blocking)"""
+    parsed = parse_hash(stored_hash)
+    if parsed is None:
+        print(f"⚠️ Unknown hash format: {stored_hash[:20]}...")
+        return False
+
+    iterations, salt, expected, legacy = parsed
+    secret = f"{salt}:{password}" if legacy else password
+    digest = hashlib.pbkdf2_hmac('sha256', secret.encode(), salt.encode(), iterations)
+    return hmac.compare_digest(digest.hex(), expected)
+
+
+class PasswordHasher:
+    """
+    Async password hasher
+
+    PBKDF2 holds a core for tens of milliseconds per call, so hashing runs on
+    its own small thread pool (hashlib releases the GIL while it works) rather
+    than on the event loop or the default executor shared with file I/O. The
+    pool size bounds how many hashes run at once; the rest wait in its queue.
+    """
+
+    def __init__(self, iterations: int = PASSWORD_HASH_ITERATIONS, max_workers: int = PASSWORD_HASH_WORKERS):
+        """
+        Initialize password hasher
+
+        Args:
+            iterations: PBKDF2 iterations for new hashes
+            max_workers: Hashes computed concurrently
+        """
+        self.iterations = iterations
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='password-hash')
+
+    async def hash(self, password: str) -> str:
+        """Hash a new password with the current work factor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, hash_password, password, self.iterations)
+
+    async def verify(self, password: str, stored_hash: str) -> bool:
+        """Check a password against a stored hash"""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, verify_password, password, stored_hash)
+        except Exception as e:
+            print(f"Password verification error: {e}")
+            return False
+
+    def needs_rehash(self, stored_hash: str) -> bool:
+        """True if a hash uses the legacy format or a different work factor than new hashes"""
+        parsed = parse_hash(stored_hash)
+        if parsed is None:
+            return False
+        iterations, _, _, legacy = parsed
+        return legacy or iterations != self.iterations
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Principal Cache
+Process-wide cache of verified bearer tokens and the users they belong to
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Set
+
+from database_async import AsyncDatabase
+
+# Seconds a verified token is trusted before it is decoded and looked up again
+AUTH_CACHE_TTL = float(os.getenv('AUTH_CACHE_TTL', '60'))
+
+# Maximum cached tokens; least recently used entries are evicted first
+AUTH_CACHE_MAX_SIZE = int(os.getenv('AUTH_CACHE_MAX_SIZE', '10000'))
+
+
+class PrincipalCache:
+    """
+    Verified-principal cache
+
+    Maps a bearer token to the user it authenticated, so repeat requests skip
+    JWT decoding and the users lookup. An entry lives until the earlier of
+    the TTL and the token's own expiry, and the cache is LRU-bounded. The
+    users table carries a version counter (bumped by triggers when a user's
+    id, username or email changes or the user is deleted, including from
+    another process); the cache
+    re-reads it at most once per check interval and drops everything when it
+    moves, so a change made elsewhere is seen within that interval. Code in
+    this process that changes a user calls invalidate_user() to drop that
+    user's tokens immediately.
+    """
+
+    def __init__(self, db: AsyncDatabase, ttl: float = AUTH_CACHE_TTL,
+                 max_size: int = AUTH_CACHE_MAX_SIZE, check_interval: float = 5.0):
+        """
+        Initialize principal cache
+
+        Args:
+            db: Database instance
+            ttl: Seconds a cached principal stays valid (0 disables the cache)
+            max_size: Maximum cached tokens
+            check_interval: Minimum seconds between users version checks
+        """
+        self.db = db
+        self.ttl = ttl
+        self.max_size = max(1, max_size)
+        self.check_interval = check_interval
+
+        # token -> (user, expires_at on the monotonic clock)
+        self._entries: OrderedDict = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    async def refresh(self):
+        """Drop every entry if the users table changed since the last check"""
+        if self._version is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return
+
+        async with self._lock:
+            # Another caller may have checked while we waited for the lock
+            if self._version is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return
+
+            version = await self.db.get_catalog_version('users')
+            self._checked_at = time.monotonic()
+            if self._version is not None and version != self._version:
+                self.clear()
+            self._version = version
+
+    async def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Cached user for a token, or None if it has to be verified"""
+        if not self.enabled:
+            return None
+        await self.refresh()
+
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        user, expires_at = entry
+        if time.monotonic() >= expires_at:
+            self._discard(token)
+            return None
+        self._entries.move_to_end(token)
+        # Callers may modify the user they get back
+        return dict(user)
+
+    def put(self, token: str, user: Dict[str, Any], token_expires_at: Optional[float] = None):
+        """
+        Cache a verified principal
+
+        Args:
+            token: Bearer token that was verified
+            user: User row it authenticated
+            token_expires_at: Token expiry as a Unix timestamp (JWT 'exp'), if any
+        """
+        if not self.enabled:
+            return
+        ttl = self.ttl
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at - time.time())
+        if ttl <= 0:
+            return
+
+        self._discard(token)
+        self._entries[token] = (dict(user), time.monotonic() + ttl)
+        self._tokens_by_user.setdefault(user['id'], set()).add(token)
+        while len(self._entries) > self.max_size:
+            self._discard(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int):
+        """Forget every cached token of one user"""
+        for token in list(self._tokens_by_user.get(user_id, ())):
+            self._discard(token)
+
+    def clear(self):
+        """Forget every cached token"""
+        self._entries.clear()
+        self._tokens_by_user.clear()
+
+    def _discard(self, token: str):
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        user_id = entry[0]['id']
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
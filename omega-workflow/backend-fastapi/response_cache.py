@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Response Cache
+Serialized catalog responses with content-hash ETags and conditional GET support
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple, Callable
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from database_async import AsyncDatabase
+
+# Upper bound on how long an entry is served, even if its catalog version never moves
+CATALOG_CACHE_TTL = float(os.getenv('CATALOG_CACHE_TTL', '300'))
+
+# Maximum cached responses (one per endpoint and query string)
+CATALOG_CACHE_MAX_ENTRIES = int(os.getenv('CATALOG_CACHE_MAX_ENTRIES', '512'))
+
+# Maximum cached filtered catalog searches (one per search-as-you-type query or cursor),
+# kept apart so they can't evict the catalog pages
+CATALOG_SEARCH_CACHE_MAX_ENTRIES = int(os.getenv('CATALOG_SEARCH_CACHE_MAX_ENTRIES', '64'))
+
+# Cache-Control max-age for responses that only change on redeploy
+CATALOG_STATIC_MAX_AGE = int(os.getenv('CATALOG_STATIC_MAX_AGE', '300'))
+
+
+class ResponseCache:
+    """
+    Catalog response cache
+
+    Keeps the serialized JSON body of each catalog response, keyed by path
+    and query string, with a strong ETag over its content. An entry records
+    the catalog versions it was built from (the 'fields' and
+    'document_types' counters are bumped by triggers, so any import,
+    whichever process runs it, moves them); versions are re-read at most
+    once per check interval and a moved version rebuilds the entry. Entries
+    with no catalog behind them only change on redeploy. Requests whose
+    If-None-Match matches the current ETag get a bodyless 304.
+    """
+
+    def __init__(self, db: AsyncDatabase, check_interval: float = 5.0,
+                 ttl: float = CATALOG_CACHE_TTL, max_entries: int = CATALOG_CACHE_MAX_ENTRIES):
+        """
+        Initialize response cache
+
+        Args:
+            db: Database instance
+            check_interval: Minimum seconds between version checks per catalog
+            ttl: Maximum seconds an entry is served before it is rebuilt
+            max_entries: Maximum cached responses
+        """
+        self.db = db
+        self.check_interval = check_interval
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+
+        # key -> (versions, body, etag, built_at)
+        self._entries: OrderedDict = OrderedDict()
+        # catalog name -> (version, checked_at)
+        self._versions: Dict[str, Tuple[int, float]] = {}
+
+    async def _catalog_versions(self, catalogs: Tuple[str, ...]) -> Tuple[int, ...]:
+        """Current version of each catalog, re-read at most once per check interval"""
+        now = time.monotonic()
+        versions = []
+        for name in catalogs:
+            cached = self._versions.get(name)
+            if cached is None or now - cached[1] >= self.check_interval:
+                cached = (await self.db.get_catalog_version(name), now)
+                self._versions[name] = cached
+            versions.append(cached[0])
+        return tuple(versions)
+
+    async def respond(self, request: Request, build: Callable[[], Any],
+                      catalogs: Tuple[str, ...] = (), max_age: int = 0) -> Response:
+        """
+        Serve a cached response, building it on a miss
+
+        Args:
+            request: Incoming request (cache key and If-None-Match)
+            build: Function (sync or async) returning the response content; exceptions propagate and nothing is cached
+            catalogs: catalog_versions names the content depends on
+            max_age: Cache-Control max-age; 0 makes clients revalidate every time
+        """
+        key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+        versions = await self._catalog_versions(catalogs)
+
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != versions or time.monotonic() - entry[3] >= self.ttl:
+            content = build()
+            if inspect.isawaitable(content):
+                content = await content
+            body = JSONResponse(content=jsonable_encoder(content)).body
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            entry = (versions, body, etag, time.monotonic())
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self._entries.move_to_end(key)
+
+        _, body, etag, _ = entry
+        headers = {'ETag': etag, 'Cache-Control': f'public, max-age={max_age}'}
+        if self._etag_matches(request.headers.get('if-none-match'), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type='application/json', headers=headers)
+
+    @staticmethod
+    def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+        """Weak comparison, as If-None-Match requires"""
+        if not if_none_match:
+            return False
+        for candidate in if_none_match.split(','):
+            candidate = candidate.strip()
+            if candidate == '*' or candidate.removeprefix('W/') == etag:
+                return True
+        return False
+
+    def cached(self, catalogs: Tuple[str, ...] = (), max_age: int = 0):
+        """
+        Decorator serving a route handler's result through the cache
+
+        The wrapped handler keeps its own parameters; the wrapper adds the
+        Request it needs for the cache key and If-None-Match.
+        """
+        def decorator(handler):
+            signature = inspect.signature(handler)
+
+            @functools.wraps(handler)
+            async def wrapper(request: Request, **kwargs):
+                return await self.respond(request, lambda: handler(**kwargs),
+                                          catalogs=catalogs, max_age=max_age)
+
+            request_param = inspect.Parameter('request', inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                                              annotation=Request)
+            wrapper.__signature__ = signature.replace(
+                parameters=[request_param, *signature.parameters.values()]
+            )
+            return wrapper
+        return decorator
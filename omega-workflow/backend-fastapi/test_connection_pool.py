@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Connection Pool Tests
+Reuse, bounds, connection setup and clean release of AsyncDatabase's pooled
+read connections against a temporary database
+"""
+
+import asyncio
+
+import pytest
+
+from database_async import AsyncDatabase
+
+
+async def test_connections_are_reused(db):
+    for _ in range(20):
+        await db.get_catalog_version('fields')
+    assert len(db._pool_connections) == 1
+
+
+async def test_pool_never_exceeds_its_size(tmp_path):
+    db = AsyncDatabase(str(tmp_path / 'pool.db'), pool_size=2)
+    try:
+        in_use = peak = 0
+
+        async def read():
+            nonlocal in_use, peak
+            async with db.connection() as conn:
+                in_use += 1
+                peak = max(peak, in_use)
+                await conn.execute('SELECT 1')
+                await asyncio.sleep(0.01)
+                in_use -= 1
+
+        await asyncio.gather(*(read() for _ in range(10)))
+        assert peak == 2
+        assert len(db._pool_connections) == 2
+    finally:
+        await db.close()
+
+
+async def test_connections_get_the_pragma_setup(db):
+    async with db.connection() as conn:
+        assert (await (await conn.execute('PRAGMA journal_mode')).fetchone())[0] == 'wal'
+        assert (await (await conn.execute('PRAGMA foreign_keys')).fetchone())[0] == 1
+        assert (await (await conn.execute('PRAGMA cache_size')).fetchone())[0] == -db.cache_size_kib
+
+
+async def test_unfinished_transaction_is_rolled_back_on_release(db, seed):
+    user = await seed.user()
+
+    with pytest.raises(RuntimeError):
+        async with db.connection() as conn:
+            await conn.execute('UPDATE users SET email = ? WHERE id = ?', ('changed@example.com', user['id']))
+            raise RuntimeError('caller failed mid-transaction')
+
+    async with db.connection() as conn:
+        assert not conn.in_transaction
+    assert (await db.get_user_by_id(user['id']))['email'] == 'alice@example.com'
+
+
+async def test_closed_database_refuses_work(tmp_path):
+    db = AsyncDatabase(str(tmp_path / 'closed.db'))
+    await db.get_catalog_version('fields')
+    await db.close()
+
+    assert db._pool_connections == []
+    with pytest.raises(RuntimeError):
+        async with db.connection():
+            pass
+    with pytest.raises(RuntimeError):
+        db.submit_write(lambda conn: None)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Document Listing Tests
+The documents listing with its workflow assignments, filters and totals,
+through /api/documents against a temporary database
+"""
+
+
+async def setup_library(db, seed):
+    """Three documents for alice (two with workflows) and one for bob; returns (alice, workflows)"""
+    alice = await seed.user('alice')
+    bob = await seed.user('bob')
+    review = await seed.workflow(alice['id'], name='Review')
+    renewal = await seed.workflow(alice['id'], name='Renewal')
+
+    await seed.document(alice['id'], 'lease-1')
+    await seed.document(alice['id'], 'lease-2')
+    await seed.document(alice['id'], 'memo')
+    await seed.document(bob['id'], 'lease-bob')
+    await db.assign_workflows_to_document('lease-1', [review['id'], renewal['id']])
+    await db.assign_workflows_to_document('lease-2', [review['id']])
+    return alice, {'Review': review['id'], 'Renewal': renewal['id']}
+
+
+async def test_documents_carry_their_workflows(api, db, seed):
+    alice, workflows = await setup_library(db, seed)
+
+    response = await api.get('/api/documents', params={'sort': 'name', 'order': 'asc'}, headers=api.auth(alice))
+    assert response.status_code == 200
+    assert response.headers['X-Total-Count'] == '3'
+
+    documents = {d['id']: d for d in response.json()}
+    assert list(documents) == ['lease-1', 'lease-2', 'memo']
+    assert sorted(documents['lease-1']['workflows']) == sorted(workflows.values())
+    assert sorted(documents['lease-1']['workflowNames']) == ['Renewal', 'Review']
+    assert documents['lease-2']['workflowNames'] == ['Review']
+    assert documents['memo']['workflows'] == [] and documents['memo']['workflowNames'] == []
+
+
+async def test_filters_apply_to_page_and_total(api, db, seed):
+    alice, workflows = await setup_library(db, seed)
+
+    response = await api.get('/api/documents', params={'workflow_id': workflows['Review'], 'search': 'lease'},
+                             headers=api.auth(alice))
+    assert sorted(d['id'] for d in response.json()) == ['lease-1', 'lease-2']
+    assert response.headers['X-Total-Count'] == '2'
+    # A workflow filter doesn't hide a document's other workflows
+    lease_1 = next(d for d in response.json() if d['id'] == 'lease-1')
+    assert len(lease_1['workflows']) == 2
+
+    response = await api.get('/api/documents', params={'workflow_id': workflows['Renewal']}, headers=api.auth(alice))
+    assert [d['id'] for d in response.json()] == ['lease-1']
+
+
+async def test_listing_only_shows_own_documents(api, db, seed):
+    alice, _ = await setup_library(db, seed)
+
+    response = await api.get('/api/documents', params={'search': 'bob'}, headers=api.auth(alice))
+    assert response.json() == []
+    assert response.headers['X-Total-Count'] == '0'
+    assert (await api.get('/api/documents')).status_code == 401
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Document Upload Tests
+Size limits, empty files, content hashes and the single-transaction insert
+of /api/documents/upload against a temporary database and upload directory
+"""
+
+import hashlib
+
+
+async def upload(api, user, *files, **kwargs):
+    return await api.post('/api/documents/upload', headers=api.auth(user),
+                          files=[('files', (name, content, 'application/pdf')) for name, content in files],
+                          **kwargs)
+
+
+async def stored_documents(db):
+    async with db.connection() as conn:
+        cursor = await conn.execute("SELECT name, size, file_path, content_hash FROM documents ORDER BY name")
+        return [dict(row) for row in await cursor.fetchall()]
+
+
+async def test_upload_stores_files_with_their_hash(api, seed, db):
+    user = await seed.user()
+    response = await upload(api, user, ('a.pdf', b'%PDF-1.4 a'), ('b.pdf', b'%PDF-1.4 bb'))
+    assert response.status_code == 200
+    assert [f['size'] for f in response.json()['files']] == [10, 11]
+
+    documents = await stored_documents(db)
+    assert [d['content_hash'] for d in documents] == [hashlib.sha256(b'%PDF-1.4 a').hexdigest(),
+                                                      hashlib.sha256(b'%PDF-1.4 bb').hexdigest()]
+    assert open(documents[1]['file_path'], 'rb').read() == b'%PDF-1.4 bb'
+
+
+async def test_oversized_and_empty_files_are_rejected(api, seed, db, tmp_path, monkeypatch):
+    monkeypatch.setattr(api.main, 'MAX_UPLOAD_SIZE', 16)
+    user = await seed.user()
+
+    response = await upload(api, user, ('ok.pdf', b'%PDF-1.4'), ('big.pdf', b'x' * 17), ('empty.pdf', b''))
+    assert response.status_code == 200
+    failed = {f['name']: f['error'] for f in response.json()['failed_files']}
+    assert 'exceeds' in failed['big.pdf']
+    assert failed['empty.pdf'] == 'File is empty'
+
+    # Rejected files leave nothing behind
+    assert [d['name'] for d in await stored_documents(db)] == ['ok.pdf']
+    assert len(list((tmp_path / 'uploads').iterdir())) == 1
+
+
+async def test_oversized_request_is_refused_before_parsing(api, seed, tmp_path, monkeypatch):
+    monkeypatch.setattr(api.main, 'MAX_UPLOAD_REQUEST_SIZE', 1024)
+    user = await seed.user()
+
+    # Declared length over the limit
+    response = await upload(api, user, ('big.pdf', b'x' * 2048))
+    assert response.status_code == 413
+
+    # No declared length: counted as the body arrives
+    async def body():
+        yield b'--b\r\nContent-Disposition: form-data; name="files"; filename="big.pdf"\r\n\r\n'
+        for _ in range(4):
+            yield b'x' * 512
+        yield b'\r\n--b--\r\n'
+    response = await api.post('/api/documents/upload', content=body(),
+                              headers={**api.auth(user), 'Content-Type': 'multipart/form-data; boundary=b'})
+    assert response.status_code == 413
+    assert list((tmp_path / 'uploads').iterdir()) == []
+
+
+async def test_failed_insert_keeps_no_rows_or_files(api, seed, db, tmp_path):
+    user = await seed.user()
+    document = {'id': 'dup', 'name': 'a.pdf', 'filename': 'a.pdf', 'size': 1, 'doc_type': 'PDF',
+                'file_path': str(tmp_path / 'a.pdf')}
+
+    # The second row conflicts with the first: the whole batch is rolled back
+    assert await db.create_documents(user['id'], [document, {**document, 'name': 'b.pdf'}]) == []
+    assert await stored_documents(db) == []
+
+    async def failing_insert(user_id, documents):
+        return []
+    db.create_documents = failing_insert
+
+    response = await upload(api, user, ('a.pdf', b'%PDF-1.4 a'))
+    assert response.status_code == 400
+    assert list((tmp_path / 'uploads').iterdir()) == []
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Extraction Metrics Tests
+Per-stage timing capture during extraction, accumulation across attempts and
+the percentile summaries served by /api/metrics/extractions
+"""
+
+import json
+
+import pytest
+
+from extraction_service import file_size_bucket, percentile_summary, summarize_extraction_timings
+
+FIELD_A = '11111111-1111-1111-1111-111111111111'
+
+
+async def run(service, document, workflow_id):
+    """Queue and run one extraction; returns its extraction row"""
+    await service.start_extraction(document['id'], workflow_id, document['file_path'])
+    await service._run_jobs(await service.db.claim_extraction_jobs(service.worker_id, lease_seconds=60))
+    return await service.db.get_extraction_by_document_workflow(document['id'], workflow_id)
+
+
+async def stored_timings(db, extraction_id):
+    """An extraction's stage_timings, file_size and field_count columns"""
+    async with db.connection() as conn:
+        cursor = await conn.execute(
+            "SELECT stage_timings, file_size, field_count FROM extractions WHERE id = ?", (extraction_id,))
+        row = await cursor.fetchone()
+    return json.loads(row[0]) if row[0] else None, row[1], row[2]
+
+
+def test_percentiles_use_nearest_rank():
+    summary = percentile_summary([float(n) for n in range(100, 0, -1)])
+    assert summary == {'count': 100, 'p50': 50.0, 'p95': 95.0, 'p99': 99.0, 'max': 100.0}
+
+    assert percentile_summary([0.12345]) == {'count': 1, 'p50': 0.123, 'p95': 0.123, 'p99': 0.123, 'max': 0.123}
+    assert percentile_summary([]) == {'count': 0, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+
+
+@pytest.mark.parametrize('size, bucket', [
+    (None, 'unknown'), (0, '<100KB'), (100 * 1024 - 1, '<100KB'), (100 * 1024, '100KB-1MB'),
+    (5 * 1024 * 1024, '1MB-10MB'), (10 * 1024 * 1024, '>=10MB'),
+])
+def test_file_size_buckets(size, bucket):
+    assert file_size_bucket(size) == bucket
+
+
+def test_summary_groups_by_workflow_and_file_size():
+    rows = [
+        {'workflow_id': 2, 'status': 'complete', 'stage_timings': {'upload': 1.0, 'total': 3.0},
+         'file_size': 10, 'field_count': 2, 'results_size': 100},
+        {'workflow_id': 1, 'status': 'complete', 'stage_timings': {'upload': 2.0, 'parse': 0.5, 'total': 4.0},
+         'file_size': 2 * 1024 * 1024, 'field_count': 4, 'results_size': 300},
+        {'workflow_id': 2, 'status': 'failed', 'stage_timings': {'upload': 3.0, 'total': 3.0},
+         'file_size': None, 'field_count': None, 'results_size': None},
+    ]
+    summary = summarize_extraction_timings(rows)
+
+    assert summary['extractions'] == 3
+    assert summary['status'] == {'complete': 2, 'failed': 1}
+    # Stages follow pipeline order and only appear where some row recorded them
+    assert list(summary['stages']) == ['upload', 'parse', 'total']
+    assert summary['stages']['upload'] == {'count': 3, 'p50': 2.0, 'p95': 3.0, 'p99': 3.0, 'max': 3.0}
+    assert summary['stages']['parse']['count'] == 1
+    assert summary['payload']['file_size']['count'] == 2
+    assert summary['payload']['results_size']['max'] == 300
+
+    assert list(summary['by_workflow']) == ['1', '2']
+    assert summary['by_workflow']['2']['extractions'] == 2
+    assert 'parse' not in summary['by_workflow']['2']['stages']
+    assert list(summary['by_file_size']) == ['<100KB', '1MB-10MB', 'unknown']
+
+
+async def test_timings_accumulate_across_attempts(db, seed):
+    user = await seed.user()
+    document = await seed.document(user['id'], 'doc-1')
+    workflow = await seed.workflow(user['id'], [FIELD_A])
+    extraction_id = (await db.create_extraction(document['id'], workflow['id']))['id']
+
+    assert await db.record_extraction_timings(extraction_id, {'upload': 1.5, 'total': 2.0}, 13, 1)
+    assert await db.record_extraction_timings(extraction_id, {'upload': 0.5, 'request': 0.25, 'total': 1.0})
+    assert await db.record_extraction_timings(-1, {'total': 1.0}) is False
+
+    # Payload sizes from the first attempt survive an attempt that didn't report them
+    assert await stored_timings(db, extraction_id) == ({'upload': 2.0, 'total': 3.0, 'request': 0.25}, 13, 1)
+
+
+async def test_pipeline_records_each_stage(db, seed, service):
+    user = await seed.user()
+    document = await seed.document(user['id'], 'doc-1')
+    workflow = await seed.workflow(user['id'], [FIELD_A])
+
+    extraction = await run(service, document, workflow['id'])
+    assert extraction['status'] == 'complete'
+
+    timings, file_size, field_count = await stored_timings(db, extraction['id'])
+    assert {'hash', 'cache', 'upload', 'request', 'wait', 'fetch', 'parse', 'save', 'total'} <= set(timings)
+    assert all(seconds >= 0 for seconds in timings.values())
+    assert timings['total'] >= timings['upload']
+    assert (file_size, field_count) == (len(b'%PDF-1.4 test'), 1)
+
+
+async def test_metrics_endpoint_is_scoped_to_the_user(api, db, seed, service):
+    alice = await seed.user('alice')
+    bob = await seed.user('bob')
+    review = await seed.workflow(alice['id'], [FIELD_A], name='Review')
+    renewal = await seed.workflow(alice['id'], [FIELD_A], name='Renewal')
+    await run(service, await seed.document(alice['id'], 'doc-1'), review['id'])
+    await run(service, await seed.document(alice['id'], 'doc-2'), renewal['id'])
+    await run(service, await seed.document(bob['id'], 'doc-bob'), (await seed.workflow(bob['id'], [FIELD_A]))['id'])
+
+    response = await api.get('/api/metrics/extractions', headers=api.auth(alice))
+    assert response.status_code == 200
+    metrics = response.json()
+    assert (metrics['window_hours'], metrics['workflow_id']) == (24, None)
+    assert metrics['extractions'] == 2
+    assert metrics['status'] == {'complete': 2}
+    assert set(metrics['by_workflow']) == {str(review['id']), str(renewal['id'])}
+    assert metrics['stages']['total']['count'] == 2
+
+    response = await api.get('/api/metrics/extractions', params={'workflow_id': review['id']}, headers=api.auth(alice))
+    assert response.json()['extractions'] == 1
+
+    # Finished before the window: left out
+    async def backdate(conn):
+        await conn.execute("UPDATE extractions SET completed_at = datetime('now', '-2 hours')")
+    await db.execute_write(backdate)
+    response = await api.get('/api/metrics/extractions', params={'since_hours': 1}, headers=api.auth(alice))
+    assert response.json()['extractions'] == 0
+
+    assert (await api.get('/api/metrics/extractions', params={'since_hours': 0}, headers=api.auth(alice))).status_code == 422
+    assert (await api.get('/api/metrics/extractions')).status_code == 401
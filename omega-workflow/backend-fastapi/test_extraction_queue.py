@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Extraction Queue Tests
+Claim, lease renewal, recovery, retry backoff and cancellation of queued
+extraction jobs against a temporary database (no Zuva API needed)
+"""
+
+import asyncio
+import json
+import os
+
+from database_async import AsyncDatabase
+from extraction_service import ExtractionService, NoWorkflowsAssignedError
+
+
+async def setup_queue(seed, jobs: int = 1):
+    """A user, a workflow and `jobs` queued extractions; returns (workflow_id, document_ids)"""
+    user = await seed.user('queue')
+    workflow = await seed.workflow(user['id'])
+    document_ids = []
+    for i in range(jobs):
+        document = await seed.document(user['id'], f'doc-{i}')
+        await seed.db.enqueue_extraction(document['id'], workflow['id'], document['file_path'], ['field-1'])
+        document_ids.append(document['id'])
+    return workflow['id'], document_ids
+
+
+async def force_sql(db: AsyncDatabase, sql: str, params=()):
+    async def op(conn):
+        await conn.execute(sql, params)
+    await db.execute_write(op)
+
+
+async def test_leased_job_cannot_be_claimed_by_another_worker(db, seed):
+    await setup_queue(seed)
+
+    claimed = await db.claim_extraction_jobs('worker-a', lease_seconds=60)
+    assert len(claimed) == 1
+    assert await db.claim_extraction_jobs('worker-b', lease_seconds=60) == []
+
+    # Only the lease owner can renew
+    assert await db.renew_extraction_lease(claimed[0]['id'], 'worker-b', 60) is False
+    assert await db.renew_extraction_lease(claimed[0]['id'], 'worker-a', 60) is True
+
+    # A live lease is not recovered
+    assert (await db.recover_extraction_jobs())['requeued'] == 0
+
+
+async def test_expired_lease_is_reclaimed(db, seed):
+    workflow_id, document_ids = await setup_queue(seed)
+
+    job = (await db.claim_extraction_jobs('worker-a', lease_seconds=60))[0]
+    await force_sql(db, "UPDATE extractions SET lease_expires_at = datetime('now', '-1 second') WHERE id = ?",
+                    (job['id'],))
+
+    assert (await db.recover_extraction_jobs())['requeued'] == 1
+    state = await db.get_extraction_state(document_ids[0], workflow_id)
+    assert state['status'] == 'pending'
+
+    reclaimed = await db.claim_extraction_jobs('worker-b', lease_seconds=60)
+    assert [j['id'] for j in reclaimed] == [job['id']]
+    assert reclaimed[0]['attempts'] == 2
+
+    # The old owner lost the job
+    assert await db.renew_extraction_lease(job['id'], 'worker-a', 60) is False
+
+
+async def test_failed_attempts_back_off_then_give_up(db, seed):
+    workflow_id, document_ids = await setup_queue(seed)
+    service = ExtractionService(db, zuva_token='test', max_attempts=3)
+
+    async def fail(jobs):
+        raise RuntimeError('upstream unavailable')
+    service._process_extraction = fail
+
+    for attempt in range(1, 4):
+        jobs = await db.claim_extraction_jobs(service.worker_id, lease_seconds=60)
+        assert len(jobs) == 1 and jobs[0]['attempts'] == attempt
+        await service._run_jobs(jobs)
+
+        state = await db.get_extraction_state(document_ids[0], workflow_id)
+        if attempt < 3:
+            # Rescheduled with a delay: not claimable until it is due
+            assert state['status'] == 'pending'
+            assert await db.claim_extraction_jobs(service.worker_id, lease_seconds=60) == []
+            await force_sql(db, "UPDATE extractions SET next_attempt_at = datetime('now', '-1 second')")
+
+    assert state['status'] == 'failed'
+    assert state['attempts'] == 3
+    assert 'upstream unavailable' in state['error_message']
+
+
+async def test_garbled_zuva_response_is_retried(db, seed, service):
+    workflow_id, document_ids = await setup_queue(seed)
+
+    def garbled(raw_results):
+        return json.loads('{"results": [')
+    service.zuva_client.parse_extraction_results = garbled
+
+    await service._run_jobs(await db.claim_extraction_jobs(service.worker_id, lease_seconds=60))
+
+    state = await db.get_extraction_state(document_ids[0], workflow_id)
+    assert state['status'] == 'pending'
+    assert 'Expecting value' in state['error_message']
+
+
+async def test_failure_is_recorded_under_the_stage_it_happened_in(db, seed, service):
+    workflow_id, document_ids = await setup_queue(seed)
+
+    async def broken_cache(*args, **kwargs):
+        raise RuntimeError('cache unavailable')
+    db.get_field_results = broken_cache
+
+    await service._run_jobs(await db.claim_extraction_jobs(service.worker_id, lease_seconds=60))
+
+    state = await db.get_extraction_state(document_ids[0], workflow_id)
+    assert state['status'] == 'pending'
+    assert '(cache): cache unavailable' in state['error_message']
+
+
+async def test_missing_document_file_fails_without_retry(db, seed, service):
+    workflow_id, document_ids = await setup_queue(seed)
+    jobs = await db.claim_extraction_jobs(service.worker_id, lease_seconds=60)
+    os.remove(jobs[0]['document_path'])
+
+    await service._run_jobs(jobs)
+
+    state = await db.get_extraction_state(document_ids[0], workflow_id)
+    assert state['status'] == 'failed'
+    assert state['attempts'] == 1
+    assert 'Document file not found' in state['error_message']
+    assert service.zuva_client.requested == []
+
+
+async def test_job_queued_during_an_empty_claim_wakes_the_worker(db, seed, service):
+    user = await seed.user('queue')
+    workflow = await seed.workflow(user['id'], ['11111111-1111-1111-1111-111111111111'])
+    document = await seed.document(user['id'], 'doc-0')
+
+    # The first claim starts before the job is committed and comes back empty after it was queued
+    claim = db.claim_extraction_jobs
+    queued = asyncio.Event()
+
+    async def racing_claim(*args, **kwargs):
+        if not queued.is_set():
+            await queued.wait()
+            return []
+        return await claim(*args, **kwargs)
+    db.claim_extraction_jobs = racing_claim
+
+    worker = asyncio.create_task(service._worker_loop())
+    try:
+        await asyncio.sleep(0)
+        await service.start_extraction(document['id'], workflow['id'], document['file_path'])
+        queued.set()
+
+        # Picked up right away rather than after EXTRACTION_POLL_SECONDS
+        for _ in range(50):
+            state = await db.get_extraction_state(document['id'], workflow['id'])
+            if state['status'] == 'complete':
+                break
+            await asyncio.sleep(0.01)
+        assert state['status'] == 'complete'
+    finally:
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+
+
+async def test_document_extraction_reports_skipped_workflows(db, seed, service):
+    user = await seed.user('queue')
+    document = await seed.document(user['id'], 'doc-0')
+
+    try:
+        await service.start_document_extraction(document['id'], document['file_path'])
+        assert False, 'expected NoWorkflowsAssignedError'
+    except NoWorkflowsAssignedError:
+        pass
+
+    valid = await seed.workflow(user['id'], ['11111111-1111-1111-1111-111111111111'])
+    empty = await seed.workflow(user['id'], [], name='Empty')
+    await db.assign_workflows_to_document(document['id'], [valid['id'], empty['id']])
+
+    group = await service.start_document_extraction(document['id'], document['file_path'])
+    entries = {entry['workflow_id']: entry for entry in group['extractions']}
+    assert entries[valid['id']]['status'] == 'pending'
+    assert entries[empty['id']]['status'] == 'skipped'
+    assert entries[empty['id']]['id'] is None
+    assert 'No fields configured' in entries[empty['id']]['error']
+
+
+async def test_extract_endpoint_rejects_document_without_workflows(api, seed):
+    user = await seed.user('queue')
+    document = await seed.document(user['id'], 'doc-0')
+
+    response = await api.post(f"/api/documents/{document['id']}/extract", headers=api.auth(user))
+    assert response.status_code == 409
+    assert 'No workflows assigned' in response.json()['detail']
+
+
+async def test_cancel_queued_job(db, seed):
+    workflow_id, document_ids = await setup_queue(seed)
+    service = ExtractionService(db, zuva_token='test')
+
+    assert await service.cancel_extraction(document_ids[0], workflow_id) is True
+
+    state = await db.get_extraction_state(document_ids[0], workflow_id)
+    assert state['status'] == 'failed'
+    assert state['error_message'] == 'Cancelled by user'
+    assert await db.claim_extraction_jobs(service.worker_id, lease_seconds=60) == []
+
+
+async def test_cancel_running_job(db, seed):
+    workflow_id, document_ids = await setup_queue(seed)
+    service = ExtractionService(db, zuva_token='test')
+
+    async def hang(jobs):
+        await asyncio.Event().wait()
+    service._process_extraction = hang
+
+    jobs = await db.claim_extraction_jobs(service.worker_id, lease_seconds=60)
+    running = asyncio.create_task(service._run_jobs(jobs))
+    await asyncio.sleep(0.05)
+
+    assert await service.cancel_extraction(document_ids[0], workflow_id) is True
+    await asyncio.wait_for(running, timeout=5)
+
+    state = await db.get_extraction_state(document_ids[0], workflow_id)
+    assert state['status'] == 'failed'
+    assert state['error_message'] == 'Cancelled by user'
+    # A cancelled job can no longer be renewed by its worker
+    assert await db.renew_extraction_lease(jobs[0]['id'], service.worker_id, 60) is False
+
+
+async def test_batch_does_not_demote_pending_interactive_job(db, seed):
+    workflow_id, _ = await setup_queue(seed, jobs=0)
+    user = await db.get_user_by_username('queue')
+    pairs = []
+    for document_id in ('doc-a', 'doc-b'):
+        document = await seed.document(user['id'], document_id)
+        pairs.append({'document_id': document_id, 'workflow_id': workflow_id, 'document_path': document['file_path'],
+                      'field_ids': ['field-1'], 'group_id': f'batch-{document_id}'})
+
+    # doc-b is batched first; then the user asks for doc-a on demand; then a second batch covers both
+    await db.create_extraction_batch('batch-1', user['id'], pairs[1:], priority=1)
+    await db.enqueue_extraction('doc-a', workflow_id, pairs[0]['document_path'], ['field-1'],
+                                group_id='interactive')
+    await db.create_extraction_batch('batch-2', user['id'], pairs, priority=1)
+
+    async with db.connection() as conn:
+        cursor = await conn.execute("SELECT document_id, priority, group_id FROM extractions")
+        rows = {row['document_id']: (row['priority'], row['group_id']) for row in await cursor.fetchall()}
+    assert rows['doc-a'] == (0, 'interactive')
+    assert rows['doc-b'] == (1, 'batch-doc-b')
+
+    # The on-demand job is claimed ahead of the older batch job
+    claimed = await db.claim_extraction_jobs('worker-a', lease_seconds=60)
+    assert [job['document_id'] for job in claimed] == ['doc-a']
+
+
+async def test_batch_requeues_finished_job_at_batch_priority(db, seed):
+    workflow_id, document_ids = await setup_queue(seed)
+
+    job = (await db.claim_extraction_jobs('worker-a', lease_seconds=60))[0]
+    await db.update_extraction_status(job['id'], 'failed', error_message='boom')
+
+    await db.create_extraction_batch('batch-1', 1, [{
+        'document_id': document_ids[0], 'workflow_id': workflow_id,
+        'document_path': job['document_path'], 'field_ids': ['field-1'], 'group_id': 'batch-doc-0'
+    }], priority=1)
+
+    async with db.connection() as conn:
+        cursor = await conn.execute("SELECT status, priority, group_id FROM extractions")
+        row = dict(await cursor.fetchone())
+    assert row == {'status': 'pending', 'priority': 1, 'group_id': 'batch-doc-0'}
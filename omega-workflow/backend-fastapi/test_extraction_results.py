@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Extraction Results Tests
+Assembly of a document's results across workflows (one query, catalog
+metadata, answers, paging) through the results endpoint
+"""
+
+FIELDS = [{'field_id': 'f-1', 'name': 'Lease Term', 'description': 'Length of the lease'}]
+
+
+async def setup_results(db, seed):
+    """A document with three workflows, two complete and one pending; returns (user, document, name -> workflow id)"""
+    await db.bulk_upsert_fields(FIELDS)
+    user = await seed.user()
+    document = await seed.document(user['id'], 'doc-1')
+    workflows = [await seed.workflow(user['id'], ['f-1'], name=name) for name in ('Alpha', 'Beta', 'Gamma')]
+
+    for workflow in workflows:
+        extraction = await db.enqueue_extraction(document['id'], workflow['id'], document['file_path'], ['f-1'])
+        if workflow['name'] != 'Gamma':
+            await db.save_extraction_results(
+                extraction['id'], {'f-1': [{'text': f"{workflow['name']} term", 'page': 1}]},
+                {'f-1': {'answers': [{'option': 'a', 'value': 'Yes'}], 'field_name': 'Lease Term'}}
+                if workflow['name'] == 'Alpha' else None
+            )
+    return user, document, {workflow['name']: workflow['id'] for workflow in workflows}
+
+
+async def test_all_workflows_come_from_one_query(api, db, seed):
+    user, document, workflow_ids = await setup_results(db, seed)
+
+    calls = []
+    get_extractions = db.get_extractions_with_workflows
+
+    async def counted(*args, **kwargs):
+        calls.append(args)
+        return await get_extractions(*args, **kwargs)
+    db.get_extractions_with_workflows = counted
+
+    response = await api.get(f"/api/documents/{document['id']}/extraction/results", headers=api.auth(user))
+    body = response.json()
+    assert len(calls) == 1
+
+    workflows = {w['workflowId']: w for w in body['workflows']}
+    assert body['workflowCount'] == 3
+    assert workflows[workflow_ids['Gamma']]['status'] == 'pending'
+    assert workflows[workflow_ids['Beta']]['workflowName'] == 'Beta'
+
+    alpha = workflows[workflow_ids['Alpha']]['fields']['f-1']
+    assert alpha['metadata']['name'] == 'Lease Term'
+    assert alpha['extractions'][0]['text'] == 'Alpha term'
+    assert alpha['hasAnswers'] is True
+    assert alpha['answers'] == [{'option': 'a', 'value': 'Yes'}]
+    assert workflows[workflow_ids['Beta']]['fields']['f-1']['hasAnswers'] is False
+
+
+async def test_workflows_are_paged_with_a_cursor(api, db, seed):
+    user, document, workflow_ids = await setup_results(db, seed)
+    url = f"/api/documents/{document['id']}/extraction/results"
+
+    first = (await api.get(url, params={'limit': 2}, headers=api.auth(user))).json()
+    assert first['workflowCount'] == 2 and first['nextCursor']
+
+    rest = (await api.get(url, params={'limit': 2, 'cursor': first['nextCursor']}, headers=api.auth(user))).json()
+    assert rest['workflowCount'] == 1 and rest['nextCursor'] is None
+
+    seen = [w['workflowId'] for w in first['workflows'] + rest['workflows']]
+    assert sorted(seen) == sorted(workflow_ids.values())
+
+    bad = await api.get(url, params={'cursor': 'not-a-cursor'}, headers=api.auth(user))
+    assert bad.status_code == 400
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Field Catalog Tests
+Loading, lookups and version-driven refresh of the in-memory field catalog
+against a temporary database
+"""
+
+from database_async import AsyncDatabase
+from field_catalog import FieldCatalog
+
+FIELDS = [
+    {'field_id': 'f-1', 'name': 'Lease Term'},
+    {'field_id': 'f-2', 'name': 'Governing Law'},
+]
+
+
+def count_loads(db):
+    """Count full catalog reads in db.loads"""
+    db.loads = 0
+    get_fields = db.get_fields
+
+    async def counted(*args, **kwargs):
+        db.loads += 1
+        return await get_fields(*args, **kwargs)
+    db.get_fields = counted
+
+
+async def test_lookups_by_id_and_name(db):
+    await db.bulk_upsert_fields(FIELDS)
+    catalog = FieldCatalog(db)
+
+    assert (await catalog.get('f-1'))['name'] == 'Lease Term'
+    assert (await catalog.get_by_name('Governing Law'))['field_id'] == 'f-2'
+    assert await catalog.get('unknown') is None
+    assert await catalog.find_missing(['f-1', 'f-9'], ['Lease Term', 'Renewal']) == ['f-9', 'Renewal']
+
+
+async def test_catalog_is_not_reloaded_while_unchanged(db):
+    await db.bulk_upsert_fields(FIELDS)
+    count_loads(db)
+    catalog = FieldCatalog(db, check_interval=0)
+
+    for _ in range(5):
+        await catalog.get('f-1')
+    assert db.loads == 1
+
+
+async def test_import_from_another_connection_is_picked_up(db):
+    await db.bulk_upsert_fields(FIELDS[:1])
+    count_loads(db)
+    catalog = FieldCatalog(db, check_interval=60)
+    assert await catalog.get('f-2') is None
+
+    # An importer process writes through its own connection
+    importer = AsyncDatabase(db.db_path)
+    try:
+        await importer.bulk_upsert_fields(FIELDS)
+    finally:
+        await importer.close()
+
+    # Within the check interval the loaded copy is served
+    assert await catalog.get('f-2') is None
+    catalog.invalidate()
+    assert (await catalog.get('f-2'))['name'] == 'Governing Law'
+    assert db.loads == 2
+
+
+async def test_single_field_changes_move_the_version(db):
+    await db.bulk_upsert_fields(FIELDS)
+    catalog = FieldCatalog(db, check_interval=0)
+    assert (await catalog.get('f-1'))['name'] == 'Lease Term'
+
+    await db.create_field({'field_id': 'f-1', 'name': 'Term of Lease'})
+    assert (await catalog.get('f-1'))['name'] == 'Term of Lease'
+    assert await catalog.get_by_name('Lease Term') is None
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Field Definition Cache Tests
+Loading, persistence, background refresh and retry delay of the Zuva field
+definition cache against a temporary database
+"""
+
+import time
+
+from field_definitions import FieldDefinitionCache
+
+DEFINITIONS = [{'field_id': 'f-1', 'name': 'Lease Term', 'answer_options': ['Yes', 'No']}]
+
+
+class DefinitionsClient:
+    """Serves DEFINITIONS from /fields, or fails while `down` is set"""
+
+    region = 'us'
+
+    def __init__(self, down: bool = False):
+        self.down = down
+        self.calls = 0
+
+    async def get_field_definitions(self, force_refresh=False):
+        self.calls += 1
+        if self.down:
+            raise RuntimeError('Zuva unavailable')
+        return DEFINITIONS
+
+
+async def test_definitions_are_persisted_and_reused(db):
+    client = DefinitionsClient()
+    cache = FieldDefinitionCache(db)
+    assert (await cache.get(client, 'f-1'))['answer_options'] == ['Yes', 'No']
+
+    # A new cache (e.g. after a restart) loads the stored copy instead of refetching
+    restarted = FieldDefinitionCache(db)
+    assert await restarted.get_many(client, ['f-1', 'unknown']) == {'f-1': DEFINITIONS[0]}
+    assert client.calls == 1
+
+
+async def test_failed_refresh_waits_before_retrying(db):
+    client = DefinitionsClient(down=True)
+    cache = FieldDefinitionCache(db, retry_delay=60)
+
+    assert await cache.get(client, 'f-1') is None
+    assert await cache.get(client, 'f-1') is None
+    assert client.calls == 1
+
+    # The failure doesn't pretend anything was fetched
+    assert cache._fetched_at['us'] is None
+    assert cache._is_stale('us')
+
+    client.down = False
+    cache._retry_after['us'] = time.time() - 1
+    assert await cache.get(client, 'f-1') == DEFINITIONS[0]
+    assert client.calls == 2
+    assert 'us' not in cache._retry_after
+
+
+async def test_stale_definitions_are_served_while_refresh_fails(db):
+    client = DefinitionsClient()
+    await FieldDefinitionCache(db).get(client, 'f-1')
+
+    client.down = True
+    cache = FieldDefinitionCache(db, ttl=0, retry_delay=60)
+    assert await cache.get(client, 'f-1') == DEFINITIONS[0]
+    await cache._refreshes['us']
+
+    # The stored copy keeps being served, and Zuva is left alone until the delay has passed
+    assert await cache.get(client, 'f-1') == DEFINITIONS[0]
+    assert await cache.get(client, 'f-2') is None
+    assert client.calls == 2
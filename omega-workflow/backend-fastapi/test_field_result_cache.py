@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Field Result Cache Tests
+Reuse, expiry, invalidation and refresh of per-field extraction results,
+run through the extraction pipeline against the stub Zuva client
+"""
+
+FIELD_A = '11111111-1111-1111-1111-111111111111'
+FIELD_B = '22222222-2222-2222-2222-222222222222'
+FIELD_C = '33333333-3333-3333-3333-333333333333'
+
+
+async def extract(service, document, workflow_id, refresh=False):
+    """Queue and run one extraction; returns its saved results"""
+    await service.start_extraction(document['id'], workflow_id, document['file_path'], refresh=refresh)
+    jobs = await service.db.claim_extraction_jobs(service.worker_id, lease_seconds=60)
+    await service._run_jobs(jobs)
+    extraction = await service.db.get_extraction_by_document_workflow(document['id'], workflow_id)
+    assert extraction['status'] == 'complete'
+    return extraction['results']
+
+
+async def cached_hash(db) -> str:
+    """Content hash the pipeline cached results under"""
+    async with db.connection() as conn:
+        cursor = await conn.execute("SELECT DISTINCT content_hash FROM field_results")
+        return (await cursor.fetchone())[0]
+
+
+async def test_only_missing_fields_are_requested_and_results_merge(db, seed, service):
+    client = service.zuva_client
+    user = await seed.user()
+    document = await seed.document(user['id'], 'doc-1')
+    first = await seed.workflow(user['id'], [FIELD_A, FIELD_B])
+    second = await seed.workflow(user['id'], [FIELD_B, FIELD_C])
+
+    await extract(service, document, first['id'])
+    # A and B were extracted; the cached B value is marked so the merge is visible
+    await db.save_field_results(await cached_hash(db), {FIELD_B: [{'text': 'cached B'}]})
+
+    results = await extract(service, document, second['id'])
+    assert client.requested == [[FIELD_A, FIELD_B], [FIELD_C]]
+    assert results == {FIELD_B: [{'text': 'cached B'}], FIELD_C: [{'text': f'fresh {FIELD_C}'}]}
+
+
+async def test_refresh_bypasses_the_cache(db, seed, service):
+    client = service.zuva_client
+    user = await seed.user()
+    document = await seed.document(user['id'], 'doc-1')
+    workflow = await seed.workflow(user['id'], [FIELD_A])
+
+    await extract(service, document, workflow['id'])
+    # A completed extraction is returned as-is unless a refresh is asked for
+    await service.start_extraction(document['id'], workflow['id'], document['file_path'])
+    assert await db.claim_extraction_jobs(service.worker_id, lease_seconds=60) == []
+
+    await extract(service, document, workflow['id'], refresh=True)
+    assert client.requested == [[FIELD_A], [FIELD_A]]
+
+
+async def test_redefined_or_expired_field_is_extracted_again(db, seed, service):
+    client = service.zuva_client
+    user = await seed.user()
+    document = await seed.document(user['id'], 'doc-1')
+    first = await seed.workflow(user['id'], [FIELD_A, FIELD_B])
+    second = await seed.workflow(user['id'], [FIELD_A, FIELD_B])
+    await db.bulk_upsert_fields([{'field_id': FIELD_A, 'name': 'Field A', 'last_updated': '2025-01-01'}])
+
+    await extract(service, document, first['id'])
+    content_hash = await cached_hash(db)
+
+    # Zuva redefines field A: only A is stale
+    await db.bulk_upsert_fields([{'field_id': FIELD_A, 'name': 'Field A', 'last_updated': '2025-06-01'}])
+    cached, _ = await db.get_field_results(content_hash, [FIELD_A, FIELD_B])
+    assert set(cached) == {FIELD_B}
+
+    # Everything is stale once older than the TTL
+    async def backdate(conn):
+        await conn.execute("UPDATE field_results SET created_at = datetime('now', '-2 hours')")
+    await db.execute_write(backdate)
+    assert set((await db.get_field_results(content_hash, [FIELD_B], max_age_hours=3))[0]) == {FIELD_B}
+    assert (await db.get_field_results(content_hash, [FIELD_B], max_age_hours=1))[0] == {}
+
+    await extract(service, document, second['id'])
+    assert client.requested == [[FIELD_A, FIELD_B], [FIELD_A]]
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Field Search Tests
+FTS index sync, substring matching, ranking and cursor paging of the field
+catalog search against a temporary database
+"""
+
+import pytest
+
+FIELDS = [
+    {'field_id': 'f-1', 'name': 'Lease Term', 'description': 'Length of the lease', 'tags': ['Real Estate']},
+    {'field_id': 'f-2', 'name': 'Sublease', 'description': 'Whether subleasing is allowed', 'tags': ['Real Estate']},
+    {'field_id': 'f-3', 'name': 'Release', 'description': 'Release of claims', 'tags': ['Litigation']},
+    {'field_id': 'f-4', 'name': 'Termination', 'description': 'Termination for convenience', 'tags': ['Contracts']},
+    {'field_id': 'f-5', 'name': 'Governing Law', 'description': 'Law that governs the lease', 'tags': ['Contracts']},
+    {'field_id': 'f-6', 'name': 'Co-op Board', 'description': 'Board approval', 'tags': ['Real Estate']},
+]
+
+
+async def names(db, search=None, tags=None, **kwargs):
+    fields, _, _ = await db.search_fields(search, tags, **kwargs)
+    return [field['name'] for field in fields]
+
+
+async def test_words_match_inside_other_words(db):
+    await db.bulk_upsert_fields(FIELDS)
+
+    # The old LIKE search matched substrings; the index must keep doing so
+    assert set(await names(db, 'ermin')) == {'Termination'}
+    assert set(await names(db, 'lease')) == {'Lease Term', 'Sublease', 'Release', 'Governing Law'}
+    assert set(await names(db, tags='estate')) == {'Lease Term', 'Sublease', 'Co-op Board'}
+
+    # Words too short for a trigram still match, every word must match somewhere
+    assert set(await names(db, 'co-op')) == {'Co-op Board'}
+    assert set(await names(db, 'term lease')) == {'Lease Term'}
+    assert await db.get_field_count('lease', 'contracts') == 1
+
+
+async def test_name_matches_rank_before_description_matches(db):
+    await db.bulk_upsert_fields(FIELDS)
+
+    ranked = await names(db, 'lease')
+    assert ranked[-1] == 'Governing Law'
+
+
+async def test_index_follows_inserts_updates_and_deletes(db):
+    await db.create_field(FIELDS[0])
+    assert await names(db, 'lease') == ['Lease Term']
+
+    await db.create_field({**FIELDS[0], 'name': 'Rental Period', 'description': 'Length of the tenancy'})
+    assert await names(db, 'lease') == []
+    assert await names(db, 'rental') == ['Rental Period']
+
+    async def delete(conn):
+        await conn.execute("DELETE FROM fields WHERE field_id = 'f-1'")
+    await db.execute_write(delete)
+    assert await names(db, 'rental') == []
+
+    # A bulk import rebuilds the index in one go
+    await db.bulk_upsert_fields(FIELDS)
+    assert set(await names(db, 'lease')) == {'Lease Term', 'Sublease', 'Release', 'Governing Law'}
+
+
+async def test_word_index_from_older_databases_is_replaced(db):
+    await db.bulk_upsert_fields(FIELDS)
+
+    async def downgrade(conn):
+        await db._drop_fields_triggers(conn)
+        await conn.execute("DROP TABLE fields_fts")
+        await conn.execute("""
+            CREATE VIRTUAL TABLE fields_fts USING fts5(
+                field_id UNINDEXED, name, description, tags, tokenize='unicode61'
+            )
+        """)
+        await db._rebuild_fields_fts(conn)
+        await db._create_fields_triggers(conn)
+    await db.execute_write(downgrade)
+    assert await names(db, 'ermin') == []
+
+    async def migrate(conn):
+        await db._create_fields_fts(conn)
+        await db._create_fields_triggers(conn)
+    await db.execute_write(migrate)
+    assert await names(db, 'ermin') == ['Termination']
+
+
+@pytest.mark.parametrize('search', [None, 'e'])
+async def test_cursor_pages_cover_every_match_once(db, search):
+    await db.bulk_upsert_fields(FIELDS)
+    expected = await names(db, search)
+
+    seen, cursor = [], None
+    while True:
+        page, total, cursor = await db.search_fields(search, limit=2, cursor=cursor)
+        assert total == (len(expected) if not seen else None)
+        seen += [field['name'] for field in page]
+        if not cursor:
+            break
+    assert seen == expected
+
+
+async def test_ranked_cursor_pages_follow_relevance(db):
+    await db.bulk_upsert_fields(FIELDS)
+    expected = await names(db, 'lease')
+
+    first, _, cursor = await db.search_fields('lease', limit=2)
+    rest, _, _ = await db.search_fields('lease', limit=10, cursor=cursor)
+    assert [field['name'] for field in first + rest] == expected
+
+
+async def test_cursor_only_continues_its_own_query(db):
+    await db.bulk_upsert_fields(FIELDS)
+    _, _, cursor = await db.search_fields('lease', limit=1)
+
+    with pytest.raises(ValueError):
+        await db.search_fields('term', limit=1, cursor=cursor)
+    with pytest.raises(ValueError):
+        await db.search_fields('lease', tags='contracts', limit=1, cursor=cursor)
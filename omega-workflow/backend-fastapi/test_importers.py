@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Importer Tests
+Streaming fields.json reader, diffing bulk field import and the document
+type hierarchy swap against a temporary database
+"""
+
+import json
+
+import pytest
+
+from import_fields import iter_json_array
+
+FIELDS = [
+    {'field_id': 'f-1', 'name': 'Lease Term', 'description': 'Length of the lease'},
+    {'field_id': 'f-2', 'name': 'Governing Law'},
+    {'field_id': 'f-3', 'name': 'Renewal'},
+]
+
+
+def test_json_array_is_streamed_across_chunks(tmp_path):
+    path = tmp_path / 'fields.json'
+    path.write_text(' [\n' + ',\n  '.join(json.dumps(field) for field in FIELDS) + '\n] ')
+    assert list(iter_json_array(str(path), chunk_size=7)) == FIELDS
+
+    path.write_text('[]')
+    assert list(iter_json_array(str(path))) == []
+
+
+@pytest.mark.parametrize('content', ['{"field_id": "f-1"}', '[{"field_id": "f-1"}, {"field_'])
+def test_malformed_json_array_raises(tmp_path, content):
+    path = tmp_path / 'fields.json'
+    path.write_text(content)
+    with pytest.raises(ValueError):
+        list(iter_json_array(str(path), chunk_size=8))
+
+
+async def test_field_import_writes_only_changes(db):
+    stats = await db.bulk_upsert_fields(FIELDS[:2] + [{'field_id': 'f-x'}], batch_size=1)
+    assert (stats['inserted'], stats['updated'], stats['unchanged'], stats['invalid']) == (2, 0, 0, 1)
+    version = await db.get_catalog_version('fields')
+
+    # Same input again: nothing written, catalog version unchanged
+    stats = await db.bulk_upsert_fields(FIELDS[:2])
+    assert (stats['inserted'], stats['updated'], stats['unchanged']) == (0, 0, 2)
+    assert await db.get_catalog_version('fields') == version
+
+    changed = [{**FIELDS[0], 'description': 'Term of the lease'}, FIELDS[2]]
+    stats = await db.bulk_upsert_fields(changed)
+    assert (stats['inserted'], stats['updated'], stats['stale']) == (1, 1, 1)
+    assert stats['changed'] == ['Lease Term', 'Renewal']
+    assert await db.get_catalog_version('fields') == version + 1
+
+    # The rebuilt search index reflects the import
+    fields, total, _ = await db.search_fields('term of')
+    assert total == 1 and fields[0]['field_id'] == 'f-1'
+
+
+async def test_field_import_dry_run_writes_nothing(db):
+    stats = await db.bulk_upsert_fields(FIELDS, dry_run=True)
+    assert stats['inserted'] == 3
+    assert await db.get_field_count() == 0
+
+
+async def test_document_type_hierarchy_is_swapped_only_when_changed(db):
+    hierarchy = {'Contract': ['Supply Agt', 'Service Agt'], 'Email': []}
+    stats = await db.replace_document_types(hierarchy)
+    assert stats['added'] == [('Contract', 'Service Agt'), ('Contract', 'Supply Agt'), ('Email', 'Email')]
+
+    categories = await db.get_document_types_hierarchical()
+    assert [(c['name'], [t['name'] for t in c['types']]) for c in categories] == [
+        ('Contract', ['Supply Agt', 'Service Agt']), ('Email', ['Email'])
+    ]
+    version = await db.get_catalog_version('document_types')
+
+    assert (await db.replace_document_types(hierarchy))['unchanged'] is True
+    assert await db.get_catalog_version('document_types') == version
+
+    dry = await db.replace_document_types({'Contract': ['Supply Agt']}, dry_run=True)
+    assert dry['removed'] == [('Contract', 'Service Agt'), ('Email', 'Email')]
+    assert len(await db.get_document_types_hierarchical()) == 2
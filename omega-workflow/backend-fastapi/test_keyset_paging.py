@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Keyset Paging Tests
+Cursor pages of the documents listing for every sort order, including ties,
+and rejection of malformed or mismatched cursors
+"""
+
+import pytest
+
+from database_async import DOCUMENT_SORT_COLUMNS, decode_cursor, encode_cursor
+
+# Repeated sizes and types (and one upload second for all) make the id tie-break matter
+DOCUMENTS = [('d-1', b'aa'), ('d-2', b'aaaa'), ('d-3', b'aa'), ('d-4', b'aaa'), ('d-5', b'aaaa'), ('d-6', b'aa')]
+
+
+async def setup_documents(seed):
+    user = await seed.user()
+    for document_id, content in DOCUMENTS:
+        await seed.document(user['id'], document_id, content=content)
+    return user
+
+
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+@pytest.mark.parametrize('sort', list(DOCUMENT_SORT_COLUMNS))
+async def test_cursor_pages_match_a_single_listing(db, seed, sort, order):
+    user = await setup_documents(seed)
+    everything, total, _ = await db.get_documents_with_workflows(user['id'], sort=sort, order=order)
+    assert total == len(DOCUMENTS)
+
+    seen, cursor = [], None
+    while True:
+        page, page_total, cursor = await db.get_documents_with_workflows(
+            user['id'], sort=sort, order=order, limit=4 if not seen else 2, cursor=cursor)
+        # Only the first page pays for the count
+        assert page_total == (len(DOCUMENTS) if not seen else None)
+        seen += [d['id'] for d in page]
+        if not cursor:
+            break
+    assert seen == [d['id'] for d in everything]
+
+
+async def test_cursor_headers_walk_the_listing(api, seed):
+    user = await setup_documents(seed)
+    params = {'sort': 'size', 'order': 'asc', 'limit': 4}
+
+    first = await api.get('/api/documents', params=params, headers=api.auth(user))
+    assert first.headers['X-Total-Count'] == '6'
+    second = await api.get('/api/documents', params={**params, 'cursor': first.headers['X-Next-Cursor']},
+                           headers=api.auth(user))
+    assert 'X-Total-Count' not in second.headers
+    assert 'X-Next-Cursor' not in second.headers
+    assert len({d['id'] for d in first.json() + second.json()}) == 6
+
+
+async def test_mismatched_or_malformed_cursors_are_rejected(api, db, seed):
+    user = await setup_documents(seed)
+    _, _, cursor = await db.get_documents_with_workflows(user['id'], sort='name', order='asc', limit=2)
+
+    with pytest.raises(ValueError):
+        await db.get_documents_with_workflows(user['id'], sort='name', order='desc', limit=2, cursor=cursor)
+    with pytest.raises(ValueError):
+        await db.get_documents_with_workflows(user['id'], sort='size', order='asc', limit=2, cursor=cursor)
+
+    truncated = encode_cursor({**decode_cursor(cursor), 'after': ['d-2']})
+    for bad in ['not-a-cursor', truncated]:
+        response = await api.get('/api/documents', params={'sort': 'name', 'order': 'asc', 'cursor': bad},
+                                 headers=api.auth(user))
+        assert response.status_code == 400
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Password Hasher Tests
+Hash formats, verification, rehash detection and the login rehash write
+against a temporary database
+"""
+
+import hashlib
+import secrets
+
+from password_hasher import PasswordHasher, hash_password, verify_password
+
+# Low work factor keeps the tests fast; the format is what matters here
+ITERATIONS = 1000
+
+
+def legacy_hash(password: str) -> str:
+    """Hash in the original 'pbkdf2:<salt>:<hash>' format"""
+    salt = secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac('sha256', f"{salt}:{password}".encode(), salt.encode(), 100000)
+    return f"pbkdf2:{salt}:{digest.hex()}"
+
+
+async def test_hash_round_trip():
+    hasher = PasswordHasher(iterations=ITERATIONS, max_workers=1)
+    try:
+        stored = await hasher.hash('secret1')
+        assert stored.startswith(f'pbkdf2_sha256${ITERATIONS}$')
+        assert await hasher.verify('secret1', stored) is True
+        assert await hasher.verify('secret2', stored) is False
+        assert hasher.needs_rehash(stored) is False
+    finally:
+        hasher.shutdown()
+
+
+def test_verify_legacy_format():
+    stored = legacy_hash('secret1')
+    assert verify_password('secret1', stored) is True
+    assert verify_password('secret2', stored) is False
+
+
+def test_needs_rehash():
+    hasher = PasswordHasher(iterations=ITERATIONS, max_workers=1)
+    try:
+        assert hasher.needs_rehash(legacy_hash('secret1')) is True
+        assert hasher.needs_rehash(hash_password('secret1', iterations=ITERATIONS // 2)) is True
+        assert hasher.needs_rehash(hash_password('secret1', iterations=ITERATIONS)) is False
+        # Unrecognised hashes can't be verified, so there is nothing to upgrade
+        assert hasher.needs_rehash('not-a-hash') is False
+    finally:
+        hasher.shutdown()
+
+
+async def test_malformed_hash_fails_without_raising():
+    hasher = PasswordHasher(iterations=ITERATIONS, max_workers=1)
+    try:
+        for stored in ['', 'not-a-hash', 'pbkdf2:only-salt', 'pbkdf2_sha256$many$salt$hash',
+                       'pbkdf2_sha256$1000$salt$zz', 'pbkdf2_sha256$1000$salt$é']:
+            assert await hasher.verify('secret1', stored) is False, stored
+    finally:
+        hasher.shutdown()
+
+
+async def test_rehash_with_stale_current_hash_is_not_applied(db):
+    old_hash = legacy_hash('secret1')
+    user = await db.create_user('hasher', 'hasher@example.com', old_hash)
+    users_version = await db.get_catalog_version('users')
+
+    # Two logins race to upgrade the same legacy hash: only the first one applies
+    first = hash_password('secret1', iterations=ITERATIONS)
+    second = hash_password('secret1', iterations=ITERATIONS)
+    assert await db.update_user_password_hash(user['id'], first, current_hash=old_hash) is True
+    assert await db.update_user_password_hash(user['id'], second, current_hash=old_hash) is False
+    assert (await db.get_user_by_id(user['id']))['password_hash'] == first
+
+    # A rehash is not an identity change, so cached principals stay valid
+    assert await db.get_catalog_version('users') == users_version
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Principal Cache Tests
+Verified-token caching, its TTL and LRU bounds, and invalidation when a user
+changes, in this process or through the users catalog version
+"""
+
+import time
+
+from principal_cache import PrincipalCache
+
+
+async def write(db, sql, params=()):
+    """Run one statement on the writer, as another process or an admin script would"""
+    async def op(conn):
+        await conn.execute(sql, params)
+    await db.execute_write(op)
+
+
+async def test_cached_principal_is_a_copy_within_its_bounds(db, seed):
+    alice = await seed.user('alice')
+    bob = await seed.user('bob')
+    cache = PrincipalCache(db, ttl=60, max_size=2)
+
+    cache.put('token-a', alice)
+    cached = await cache.get('token-a')
+    assert cached == alice
+    cached['username'] = 'mallory'
+    assert (await cache.get('token-a'))['username'] == 'alice'
+
+    # Never trusted past the token's own expiry
+    cache.put('expired', alice, token_expires_at=time.time() - 1)
+    assert await cache.get('expired') is None
+
+    # Least recently used goes first
+    cache.put('token-b', bob)
+    await cache.get('token-a')
+    cache.put('token-c', bob)
+    assert await cache.get('token-b') is None
+    assert await cache.get('token-a') is not None and await cache.get('token-c') is not None
+
+    disabled = PrincipalCache(db, ttl=0)
+    disabled.put('token-a', alice)
+    assert await disabled.get('token-a') is None
+
+
+async def test_invalidate_user_drops_only_that_users_tokens(db, seed):
+    alice = await seed.user('alice')
+    bob = await seed.user('bob')
+    cache = PrincipalCache(db)
+    cache.put('alice-1', alice)
+    cache.put('alice-2', alice)
+    cache.put('bob-1', bob)
+
+    cache.invalidate_user(alice['id'])
+    assert await cache.get('alice-1') is None and await cache.get('alice-2') is None
+    assert await cache.get('bob-1') == bob
+    assert alice['id'] not in cache._tokens_by_user
+
+
+async def test_users_version_moves_only_on_identity_changes(db, seed):
+    alice = await seed.user('alice')
+    version = await db.get_catalog_version('users')
+
+    await seed.user('bob')
+    await db.update_user_password_hash(alice['id'], 'new-hash')
+    assert await db.get_catalog_version('users') == version
+
+    await write(db, "UPDATE users SET email = ? WHERE id = ?", ('alice@new.example.com', alice['id']))
+    assert await db.get_catalog_version('users') == version + 1
+    await write(db, "DELETE FROM users WHERE id = ?", (alice['id'],))
+    assert await db.get_catalog_version('users') == version + 2
+
+
+async def test_version_change_clears_the_cache_after_the_check_interval(db, seed):
+    alice = await seed.user('alice')
+    cache = PrincipalCache(db, check_interval=60)
+    await cache.get('token-a')
+    cache.put('token-a', alice)
+
+    await write(db, "UPDATE users SET username = 'alicia' WHERE id = ?", (alice['id'],))
+    # Within the interval the old principal is still served
+    assert (await cache.get('token-a'))['username'] == 'alice'
+
+    cache.check_interval = 0
+    assert await cache.get('token-a') is None
+
+
+async def test_deleted_user_is_locked_out(api, db, seed, monkeypatch):
+    main = api.main
+    monkeypatch.setattr(main, 'principal_cache', PrincipalCache(db, check_interval=0))
+    alice = await seed.user('alice')
+    headers = api.auth(alice)
+
+    assert (await api.get('/api/auth/me', headers=headers)).status_code == 200
+    assert main.principal_cache._tokens_by_user == {alice['id']: {headers['Authorization'].split()[1]}}
+
+    await write(db, "DELETE FROM users WHERE id = ?", (alice['id'],))
+    response = await api.get('/api/auth/me', headers=headers)
+    assert response.status_code == 401
+    assert response.json()['detail'] == 'User not found'
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Response Cache Tests
+ETags, conditional GETs and catalog-version invalidation of the cached
+catalog endpoints, against a temporary database
+"""
+
+import json
+
+import import_fields
+from database_async import AsyncDatabase
+
+FIELDS = [
+    {'field_id': 'f-1', 'name': 'Lease Term', 'description': 'Length of the lease'},
+    {'field_id': 'f-2', 'name': 'Governing Law', 'description': 'Law that governs the agreement'},
+]
+
+
+async def test_import_changes_etag_and_unchanged_catalog_answers_304(api, db, tmp_path, monkeypatch):
+    api.main.response_cache.check_interval = 0
+    await db.bulk_upsert_fields(FIELDS[:1])
+
+    first = await api.get('/api/fields')
+    etag = first.headers['ETag']
+    assert first.json()['total'] == 1
+
+    revalidated = await api.get('/api/fields', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b''
+
+    # The importer runs with its own database connection, as it does from the command line
+    fields_json = tmp_path / 'fields.json'
+    fields_json.write_text(json.dumps(FIELDS))
+    defaults = AsyncDatabase.__init__.__defaults__
+    monkeypatch.setattr(AsyncDatabase.__init__, '__defaults__', (db.db_path,) + defaults[1:])
+    assert await import_fields.import_fields(str(fields_json)) is True
+
+    changed = await api.get('/api/fields', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.json()['total'] == 2
+    assert changed.headers['ETag'] != etag
+
+    again = await api.get('/api/fields', headers={'If-None-Match': changed.headers['ETag']})
+    assert again.status_code == 304
+
+
+async def test_searches_do_not_evict_catalog_pages(api, db, monkeypatch):
+    monkeypatch.setattr(api.main, 'search_cache', api.main.ResponseCache(db, max_entries=4))
+    await db.bulk_upsert_fields(FIELDS)
+
+    await api.get('/api/fields')
+    await api.get('/api/fields', params={'limit': 1})
+    for prefix in ['l', 'le', 'lea', 'leas', 'lease', 'lease t', 'lease te']:
+        response = await api.get('/api/fields', params={'search': prefix})
+        assert response.status_code == 200
+
+    _, _, cursor = await db.search_fields(limit=1)
+    await api.get('/api/fields', params={'limit': 1, 'cursor': cursor})
+
+    assert len(api.main.response_cache._entries) == 2
+    assert len(api.main.search_cache._entries) == 4
+
+    # Filtered responses still revalidate
+    search = await api.get('/api/fields', params={'search': 'law'})
+    repeat = await api.get('/api/fields', params={'search': 'law'},
+                           headers={'If-None-Match': search.headers['ETag']})
+    assert repeat.status_code == 304
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Result Blob Tests
+Compressed storage format of extraction results, legacy plain-JSON rows and
+unreadable blobs, against a temporary database
+"""
+
+import json
+import zlib
+
+import pytest
+
+from database_async import (RESULT_BLOB_MAGIC, ResultBlobError, decode_result_blob,
+                            encode_result_blob)
+
+RESULTS = {'field-1': [{'text': 'Lease Term', 'page': 1}], 'field-2': [{'text': 'é', 'page': 2}]}
+
+
+def test_round_trip():
+    blob = encode_result_blob(RESULTS)
+    assert blob.startswith(RESULT_BLOB_MAGIC)
+    assert decode_result_blob(blob) == RESULTS
+    assert encode_result_blob(None) is None
+    assert decode_result_blob(None) is None
+
+
+def test_legacy_plain_json_rows_are_readable():
+    assert decode_result_blob(json.dumps(RESULTS)) == RESULTS
+    assert decode_result_blob(json.dumps(RESULTS).encode('utf-8')) == RESULTS
+
+
+@pytest.mark.parametrize('value', [
+    b'{"field-1": [',
+    RESULT_BLOB_MAGIC + bytes([1]) + b'not zlib',
+    RESULT_BLOB_MAGIC + bytes([2]) + zlib.compress(b'{}'),
+])
+def test_unreadable_blob_raises(value):
+    with pytest.raises(ResultBlobError):
+        decode_result_blob(value)
+
+
+async def store(db, seed, results_blob):
+    """A completed extraction whose results column holds `results_blob`; returns (document_id, workflow_id)"""
+    user = await seed.user()
+    workflow = await seed.workflow(user['id'])
+    document = await seed.document(user['id'], 'doc-1')
+    extraction = await db.enqueue_extraction(document['id'], workflow['id'], document['file_path'], ['field-1'])
+    await db.save_extraction_results(extraction['id'], RESULTS, {'field-1': {'answer': 'Yes'}})
+
+    if results_blob is not None:
+        async def op(conn):
+            await conn.execute("UPDATE extractions SET results = ?", (results_blob,))
+        await db.execute_write(op)
+    return document['id'], workflow['id']
+
+
+async def test_stored_and_legacy_results_are_read_back(db, seed):
+    document_id, workflow_id = await store(db, seed, None)
+    extraction = await db.get_extraction_by_document_workflow(document_id, workflow_id)
+    assert extraction['results'] == RESULTS
+    assert extraction['answer_metadata'] == {'field-1': {'answer': 'Yes'}}
+    assert 'decode_error' not in extraction
+
+    async def legacy(conn):
+        await conn.execute("UPDATE extractions SET results = ?", (json.dumps(RESULTS),))
+    await db.execute_write(legacy)
+    assert (await db.get_extraction(extraction['id']))['results'] == RESULTS
+
+
+async def test_unreadable_results_are_reported_not_hidden(db, seed, api, capsys):
+    document_id, workflow_id = await store(db, seed, RESULT_BLOB_MAGIC + bytes([1]) + b'garbage')
+
+    extraction = await db.get_extraction_by_document_workflow(document_id, workflow_id)
+    assert extraction['results'] is None
+    assert extraction['answer_metadata'] == {'field-1': {'answer': 'Yes'}}
+    assert 'results could not be read' in extraction['decode_error']
+    assert f"extraction {extraction['id']}" in capsys.readouterr().out
+
+    user = await db.get_user_by_username('alice')
+    response = await api.get(f'/api/documents/{document_id}/extraction/results',
+                             params={'workflow_id': workflow_id}, headers=api.auth(user))
+    assert response.status_code == 200
+    assert 'could not be read' in response.json()['errorMessage']
+
+
+async def test_unreadable_cached_field_result_is_a_miss(db):
+    await db.save_field_results('hash-1', RESULTS)
+
+    async def corrupt(conn):
+        await conn.execute("UPDATE field_results SET results = ? WHERE field_id = 'field-1'", (b'{',))
+    await db.execute_write(corrupt)
+
+    cached, _ = await db.get_field_results('hash-1', ['field-1', 'field-2'])
+    assert cached == {'field-2': RESULTS['field-2']}
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Stream Token Tests
+Short-lived, document-scoped tokens for the extraction event stream: issuing
+them, and where they are (and are not) accepted
+"""
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+EVENTS = '/api/documents/{}/extraction/events'
+
+
+def bearer(token):
+    return HTTPAuthorizationCredentials(scheme='Bearer', credentials=token)
+
+
+async def issue(api, user, document_id):
+    """POST .../events/token as `user`; returns the response"""
+    return await api.post(f'{EVENTS.format(document_id)}/token', headers=api.auth(user))
+
+
+async def test_token_is_only_issued_for_own_documents(api, seed):
+    alice = await seed.user('alice')
+    bob = await seed.user('bob')
+    await seed.document(alice['id'], 'doc-a')
+
+    response = await issue(api, alice, 'doc-a')
+    assert response.status_code == 200
+    assert response.json()['expiresIn'] == api.main.EXTRACTION_STREAM_TOKEN_SECONDS
+
+    claims = api.main.jwt.decode(response.json()['token'], api.main.JWT_SECRET, algorithms=[api.main.JWT_ALGORITHM])
+    assert (claims['sub'], claims['scope'], claims['doc']) == (str(alice['id']), 'extraction-events', 'doc-a')
+
+    assert (await issue(api, bob, 'doc-a')).status_code == 404
+    assert (await api.post(f"{EVENTS.format('doc-a')}/token")).status_code == 401
+
+
+async def test_stream_token_opens_only_its_document(api, seed):
+    main = api.main
+    alice = await seed.user('alice')
+    token = main.create_stream_token(alice['id'], 'doc-a')
+
+    user = await main.get_stream_user('doc-a', credentials=None, stream_token=token)
+    assert user['id'] == alice['id']
+    # Scoped tokens never enter the principal cache
+    assert main.principal_cache._entries == {}
+
+    with pytest.raises(HTTPException) as error:
+        await main.get_stream_user('doc-b', credentials=None, stream_token=token)
+    assert error.value.status_code == 401
+
+    # Nor do they work as a general login token, on the stream or anywhere else
+    with pytest.raises(HTTPException):
+        await main.get_stream_user('doc-a', credentials=bearer(token), stream_token=None)
+    response = await api.get('/api/documents', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 401
+
+
+async def test_login_token_is_refused_in_the_query_string(api, seed):
+    alice = await seed.user('alice')
+    # No such document, so a wrongly accepted token fails fast with 404 instead of opening a stream
+    login_token = api.main.create_access_token({'sub': alice['id']})
+
+    response = await api.get(EVENTS.format('doc-a'), params={'stream_token': login_token})
+    assert response.status_code == 401
+    assert (await api.get(EVENTS.format('doc-a'))).status_code == 401
+
+    # The header still takes the login token
+    user = await api.main.get_stream_user('doc-a', credentials=bearer(login_token), stream_token=None)
+    assert user['id'] == alice['id']
+
+
+async def test_expired_or_foreign_stream_tokens_are_rejected(api, seed, monkeypatch):
+    main = api.main
+    alice = await seed.user('alice')
+    bob = await seed.user('bob')
+    await seed.document(alice['id'], 'doc-a')
+
+    # A valid token for a document its user doesn't own opens nothing
+    response = await api.get(EVENTS.format('doc-a'), params={'stream_token': main.create_stream_token(bob['id'], 'doc-a')})
+    assert response.status_code == 404
+
+    monkeypatch.setattr(main, 'EXTRACTION_STREAM_TOKEN_SECONDS', -1)
+    expired = main.create_stream_token(alice['id'], 'doc-a')
+    response = await api.get(EVENTS.format('doc-a'), params={'stream_token': expired})
+    assert response.status_code == 401
+    assert response.json()['detail'] == 'Token has expired'
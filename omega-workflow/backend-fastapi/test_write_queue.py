@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Write Queue Tests
+Group commit, per-op failure isolation and ordering of AsyncDatabase's
+single writer against a temporary database
+"""
+
+import asyncio
+
+import pytest
+
+from database_async import AsyncDatabase
+
+
+def open_counted(tmp_path, **kwargs):
+    """A database whose writer connection counts its COMMITs in db.commits"""
+    db = AsyncDatabase(str(tmp_path / 'writes.db'), **kwargs)
+    db.commits = 0
+    open_connection = db._open_connection
+
+    # The writer task opens its connection on its first run, after this patch
+    async def counting_connection(isolation_level=''):
+        conn = await open_connection(isolation_level)
+        if isolation_level is None:
+            execute = conn.execute
+
+            def counted(sql, *args):
+                if sql == 'COMMIT':
+                    db.commits += 1
+                return execute(sql, *args)
+            conn.execute = counted
+        return conn
+    db._open_connection = counting_connection
+    return db
+
+
+def insert(name):
+    async def op(conn):
+        cursor = await conn.execute("INSERT INTO document_categories (name, display_order) VALUES (?, 0)", (name,))
+        return cursor.lastrowid
+    return op
+
+
+async def category_names(db):
+    async with db.connection() as conn:
+        cursor = await conn.execute("SELECT name FROM document_categories ORDER BY id")
+        return [row[0] for row in await cursor.fetchall()]
+
+
+async def test_concurrent_writes_share_one_commit(tmp_path):
+    db = open_counted(tmp_path, write_batch_window_ms=50)
+    try:
+        await db.init_database()
+        commits = db.commits
+
+        ids = await asyncio.gather(*(db.execute_write(insert(f'c{i}')) for i in range(10)))
+        assert db.commits == commits + 1
+        assert ids == sorted(ids)
+        assert await category_names(db) == [f'c{i}' for i in range(10)]
+    finally:
+        await db.close()
+
+
+async def test_batches_are_capped(tmp_path):
+    db = open_counted(tmp_path, write_batch_window_ms=50, write_batch_max=4)
+    try:
+        await db.init_database()
+        commits = db.commits
+
+        await asyncio.gather(*(db.execute_write(insert(f'c{i}')) for i in range(10)))
+        assert db.commits == commits + 3
+    finally:
+        await db.close()
+
+
+async def test_failed_op_does_not_undo_its_batch(db):
+    async def fail(conn):
+        await conn.execute("INSERT INTO document_categories (name, display_order) VALUES ('half', 0)")
+        raise RuntimeError('op failed')
+
+    results = await asyncio.gather(db.execute_write(insert('before')), db.execute_write(fail),
+                                   db.execute_write(insert('after')), return_exceptions=True)
+    assert isinstance(results[1], RuntimeError)
+    assert await category_names(db) == ['before', 'after']
+
+
+async def test_cancelled_caller_still_gets_its_write_applied(db):
+    write = asyncio.create_task(db.execute_write(insert('kept')))
+    await asyncio.sleep(0)
+    write.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await write
+
+    # Queued behind the cancelled write, so it is committed by the time this returns
+    await db.execute_write(insert('next'))
+    assert await category_names(db) == ['kept', 'next']
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Zuva File Reuse Tests
+Sharing one Zuva upload between extractions of the same content, expiry,
+single-flight uploads and invalidation after a rejected request
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from extraction_service import ZUVA_FILE_TTL_HOURS, zuva_file_expiry
+from zuva_client import ZuvaAPIError
+
+FIELD_A = '11111111-1111-1111-1111-111111111111'
+FIELD_B = '22222222-2222-2222-2222-222222222222'
+
+
+async def run(service, document, workflow_id):
+    """Queue and run one extraction; returns its state"""
+    await service.start_extraction(document['id'], workflow_id, document['file_path'])
+    await service._run_jobs(await service.db.claim_extraction_jobs(service.worker_id, lease_seconds=60))
+    return await service.db.get_extraction_state(document['id'], workflow_id)
+
+
+async def test_same_content_is_uploaded_once(db, seed, service):
+    alice = await seed.user('alice')
+    bob = await seed.user('bob')
+    # The same PDF uploaded by two users, extracted with different fields
+    first = await seed.document(alice['id'], 'doc-a')
+    second = await seed.document(bob['id'], 'doc-b')
+
+    assert (await run(service, first, (await seed.workflow(alice['id'], [FIELD_A]))['id']))['status'] == 'complete'
+    assert (await run(service, second, (await seed.workflow(bob['id'], [FIELD_B]))['id']))['status'] == 'complete'
+
+    assert service.zuva_client.uploaded == [first['file_path']]
+    assert service.zuva_client.requested == [[FIELD_A], [FIELD_B]]
+
+
+async def test_concurrent_jobs_share_one_upload(db, service, tmp_path):
+    client = service.zuva_client
+    upload_file = client.upload_file
+
+    async def slow_upload(file_path, progress=None):
+        await asyncio.sleep(0.05)
+        return await upload_file(file_path, progress)
+    client.upload_file = slow_upload
+
+    file_ids = await asyncio.gather(*(service._get_zuva_file_id(client, 'doc.pdf', 'hash-1', 10) for _ in range(3)))
+    assert file_ids == ['file-1'] * 3
+    assert client.uploaded == ['doc.pdf']
+
+
+async def test_nearly_expired_upload_is_not_reused(db, service):
+    client = service.zuva_client
+    soon = (datetime.now(timezone.utc) + timedelta(minutes=5)).strftime('%Y-%m-%d %H:%M:%S')
+    await db.save_zuva_file('hash-1', 'us', 'old-file', 10, soon)
+
+    assert await service._get_zuva_file_id(client, 'doc.pdf', 'hash-1', 10) == 'file-1'
+    # Other regions keep their own uploads
+    assert await db.get_zuva_file('hash-1', 'eu') is None
+
+
+def test_file_expiry_comes_from_zuva_or_the_default_ttl():
+    assert zuva_file_expiry({'expiration': '2030-01-02T03:04:05Z'}) == '2030-01-02 03:04:05'
+    default = datetime.strptime(zuva_file_expiry({}), '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+    expected = datetime.now(timezone.utc) + timedelta(hours=ZUVA_FILE_TTL_HOURS)
+    assert abs((default - expected).total_seconds()) < 5
+    assert zuva_file_expiry({'expiration': 'soon'}) == zuva_file_expiry(None)
+
+
+async def test_rejected_request_forgets_the_upload(db, seed, service):
+    client = service.zuva_client
+    user = await seed.user()
+    document = await seed.document(user['id'], 'doc-1')
+    workflow = await seed.workflow(user['id'], [FIELD_A])
+
+    request_extraction = client.request_extraction
+
+    async def reject_once(file_ids, field_ids):
+        client.request_extraction = request_extraction
+        raise ZuvaAPIError('file not found')
+    client.request_extraction = reject_once
+
+    state = await run(service, document, workflow['id'])
+    assert state['status'] == 'pending'
+    assert (await db.get_extraction_by_document_workflow(document['id'], workflow['id']))['zuva_file_id'] is None
+
+    async def due_now(conn):
+        await conn.execute("UPDATE extractions SET next_attempt_at = datetime('now', '-1 second')")
+    await db.execute_write(due_now)
+    await service._run_jobs(await db.claim_extraction_jobs(service.worker_id, lease_seconds=60))
+
+    assert (await db.get_extraction_state(document['id'], workflow['id']))['status'] == 'complete'
+    assert client.uploaded == [document['file_path']] * 2
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+ExtractionPoller Tests
+Shared status polling against a stub client (no Zuva API needed)
+"""
+
+import asyncio
+
+from zuva_client import ExtractionPoller
+
+
+class StubStatusClient:
+    """Reports every request as processing for a few checks, then complete"""
+
+    def __init__(self, checks_until_complete: int = 2):
+        self.checks_until_complete = checks_until_complete
+        self.checks = {}
+
+    async def get_extraction_statuses(self, request_ids):
+        statuses = {}
+        for request_id in request_ids:
+            self.checks[request_id] = self.checks.get(request_id, 0) + 1
+            state = 'complete' if self.checks[request_id] >= self.checks_until_complete else 'processing'
+            statuses[request_id] = {'request_id': request_id, 'status': state}
+        return statuses
+
+
+def make_poller(client):
+    return ExtractionPoller(client, min_interval=0.01, max_interval=0.02, initial_estimate=0.01)
+
+
+async def test_wait_returns_completed_status():
+    poller = make_poller(StubStatusClient())
+    status = await poller.wait('req-1', max_wait=5)
+    await poller.close()
+    assert status['status'] == 'complete'
+
+
+async def test_new_wait_after_cancelled_waiter_is_not_cancelled():
+    poller = make_poller(StubStatusClient())
+
+    first = asyncio.create_task(poller.wait('req-1', max_wait=5))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.gather(first, return_exceptions=True)
+    assert first.cancelled()
+
+    # The cancelled shared future may still be registered; a new caller must get a fresh one
+    status = await poller.wait('req-1', max_wait=5)
+    await poller.close()
+    assert status['status'] == 'complete'
+
+
+async def test_cancelling_one_of_two_waiters_keeps_the_other():
+    poller = make_poller(StubStatusClient(checks_until_complete=3))
+
+    first = asyncio.create_task(poller.wait('req-1', max_wait=5))
+    second = asyncio.create_task(poller.wait('req-1', max_wait=5))
+    await asyncio.sleep(0)
+    first.cancel()
+    status = await second
+    await poller.close()
+    assert status['status'] == 'complete'
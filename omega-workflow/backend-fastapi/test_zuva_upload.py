@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Zuva Upload Tests
+Chunked streaming of ZuvaClient.upload_file, progress reporting and error
+mapping against a mock transport (no Zuva API needed)
+"""
+
+import httpx
+import pytest
+
+import zuva_client
+from zuva_client import ZuvaAuthenticationError, ZuvaClient, ZuvaUploadError
+
+
+def make_client(status_code=201, body=None):
+    """ZuvaClient whose HTTP calls hit a mock transport; received uploads land in client.received"""
+    client = ZuvaClient(api_token='test', base_url='http://zuva.test/api/v2')
+    client.received = []
+
+    async def handler(request):
+        client.received.append((request.headers, await request.aread()))
+        return httpx.Response(status_code, json=body if body is not None else {'file_id': 'file-1'})
+
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+async def test_file_is_streamed_in_chunks_with_progress(tmp_path, monkeypatch):
+    monkeypatch.setattr(zuva_client, 'UPLOAD_CHUNK_SIZE', 4)
+    path = tmp_path / 'doc.pdf'
+    path.write_bytes(b'%PDF-1.4 content')
+    client = make_client()
+
+    reported = []
+
+    async def progress(sent, total):
+        reported.append((sent, total))
+
+    file_id, metadata = await client.upload_file(str(path), progress=progress)
+    assert file_id == 'file-1' and metadata == {'file_id': 'file-1'}
+
+    headers, body = client.received[0]
+    assert body == b'%PDF-1.4 content'
+    assert headers['Content-Length'] == '16'
+    assert headers['Content-Type'] == 'application/octet-stream'
+    assert reported == [(4, 16), (8, 16), (12, 16), (16, 16)]
+
+    # Plain functions work as callbacks too
+    plain = []
+    await client.upload_file(str(path), progress=lambda sent, total: plain.append(sent))
+    assert plain == [4, 8, 12, 16]
+    await client.client.aclose()
+
+
+async def test_upload_errors_are_classified(tmp_path):
+    path = tmp_path / 'doc.pdf'
+    path.write_bytes(b'%PDF-1.4')
+
+    with pytest.raises(ZuvaUploadError, match='File not found'):
+        await make_client().upload_file(str(tmp_path / 'missing.pdf'))
+    with pytest.raises(ZuvaAuthenticationError):
+        await make_client(status_code=401).upload_file(str(path))
+    with pytest.raises(ZuvaUploadError, match='status 500'):
+        await make_client(status_code=500).upload_file(str(path))
+    with pytest.raises(ZuvaUploadError, match='No file_id'):
+        await make_client(body={}).upload_file(str(path))
@@ -7,9 +7,13 @@ Handles all interactions with the Zuva AI API for document field extraction
 import os
 import json
 import asyncio
+import inspect
+import random
 import time
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Callable, AsyncIterator
 from pathlib import Path
+import aiofiles
+import aiofiles.os
 import httpx
 from tenacity import (
     retry,
@@ -19,6 +23,13 @@ from tenacity import (
 )
 
 
+# Uploads are streamed from disk in chunks of this size, so memory use stays flat
+UPLOAD_CHUNK_SIZE = int(os.getenv('ZUVA_UPLOAD_CHUNK_SIZE', str(256 * 1024)))
+
+# Called as progress(bytes_sent, total_bytes); may be a plain function or a coroutine function
+ProgressCallback = Callable[[int, int], Any]
+
+
 class ZuvaAPIError(Exception):
     """Base exception for Zuva API errors"""
     pass
@@ -39,6 +50,197 @@ class ZuvaExtractionError(ZuvaAPIError):
     pass
 
 
+class ZuvaTimeoutError(ZuvaExtractionError):
+    """Raised when an extraction is still running after the wait limit"""
+    pass
+
+
+class ExtractionPoller:
+    """
+    Shared status poller for outstanding Zuva extraction requests
+
+    Every waiter registers its request_id here instead of running its own
+    polling loop. One background task checks all due requests in batches and
+    resolves each waiter's future. Poll timing adapts to observed completion
+    times: the first check is scheduled shortly before a typical request would
+    finish, then checks back off geometrically, with jitter so requests
+    started together don't stay in lockstep.
+    """
+
+    def __init__(
+        self,
+        client: 'ZuvaClient',
+        min_interval: float = 1.0,
+        max_interval: float = 15.0,
+        batch_size: int = 50,
+        initial_estimate: float = 10.0
+    ):
+        """
+        Initialize poller
+
+        Args:
+            client: Zuva client used for status checks
+            min_interval: Shortest delay between checks of one request (seconds)
+            max_interval: Longest delay between checks of one request (seconds)
+            batch_size: Maximum request IDs per status call
+            initial_estimate: Assumed completion time before any have been observed
+        """
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.batch_size = batch_size
+
+        # Exponentially weighted average of seconds from registration to completion
+        self.expected_duration = initial_estimate
+
+        # request_id -> waiter state
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats = {'status_calls': 0, 'requests_checked': 0, 'completed': 0, 'failed': 0, 'timed_out': 0}
+
+    async def wait(self, request_id: str, max_wait: float = 180) -> Dict[str, Any]:
+        """Wait until a request completes; raises ZuvaExtractionError if it fails or times out"""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+
+        waiter = self._pending.get(request_id)
+        # A finished future not yet swept by the poll loop (e.g. cancelled when its last listener left) can't be shared
+        if waiter is None or waiter['future'].done():
+            waiter = {
+                'future': loop.create_future(),
+                'registered': now,
+                'deadline': now + max_wait,
+                'interval': self.min_interval,
+                'next_check': now + self._first_delay(),
+            }
+            self._pending[request_id] = waiter
+        else:
+            # Another caller is already waiting on this request: share its future
+            waiter['deadline'] = max(waiter['deadline'], now + max_wait)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+
+        # Shielded so one cancelled waiter doesn't fail others sharing the request
+        waiter['listeners'] = waiter.get('listeners', 0) + 1
+        try:
+            return await asyncio.shield(waiter['future'])
+        finally:
+            waiter['listeners'] -= 1
+            if waiter['listeners'] == 0 and not waiter['future'].done():
+                # Every waiter was cancelled: stop polling this request
+                waiter['future'].cancel()
+
+    def _first_delay(self) -> float:
+        """Delay before the first check: a little before a typical request completes"""
+        delay = min(max(self.expected_duration * 0.8, self.min_interval), self.max_interval)
+        return delay * random.uniform(0.9, 1.1)
+
+    def _reschedule(self, waiter: Dict[str, Any], now: float):
+        """Back off geometrically after an unfinished check"""
+        waiter['interval'] = min(waiter['interval'] * 1.5, self.max_interval)
+        waiter['next_check'] = now + waiter['interval'] * random.uniform(0.8, 1.2)
+
+    def _record_completion(self, waiter: Dict[str, Any], now: float):
+        """Fold an observed completion time into the estimate"""
+        self.expected_duration = 0.8 * self.expected_duration + 0.2 * (now - waiter['registered'])
+
+    async def _run(self):
+        """Poll due requests until none are outstanding"""
+        loop = asyncio.get_running_loop()
+
+        while self._pending:
+            now = loop.time()
+
+            # Drop waiters nobody is listening to any more
+            for request_id in [rid for rid, w in self._pending.items() if w['future'].done()]:
+                del self._pending[request_id]
+
+            for request_id, waiter in list(self._pending.items()):
+                if now >= waiter['deadline']:
+                    self.stats['timed_out'] += 1
+                    waiter['future'].set_exception(ZuvaTimeoutError(
+                        f"Extraction timeout after {int(now - waiter['registered'])}s. "
+                        f"The extraction may still be processing. "
+                        f"Please try checking the status later."
+                    ))
+                    del self._pending[request_id]
+
+            if not self._pending:
+                break
+
+            # Anything due within min_interval rides along with the current batch
+            horizon = now + self.min_interval
+            due = [rid for rid, w in self._pending.items() if w['next_check'] <= horizon]
+            if not due:
+                next_check = min(w['next_check'] for w in self._pending.values())
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=max(next_check - now, 0.01))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            for start in range(0, len(due), self.batch_size):
+                await self._check(due[start:start + self.batch_size])
+
+    async def _check(self, request_ids: List[str]):
+        """Fetch statuses for a batch and resolve the finished waiters"""
+        loop = asyncio.get_running_loop()
+        self.stats['status_calls'] += 1
+        self.stats['requests_checked'] += len(request_ids)
+
+        try:
+            statuses = await self.client.get_extraction_statuses(request_ids)
+        except ZuvaAuthenticationError as e:
+            for request_id in request_ids:
+                waiter = self._pending.pop(request_id, None)
+                if waiter and not waiter['future'].done():
+                    waiter['future'].set_exception(e)
+            return
+        except Exception as e:
+            print(f"⚠️  Error checking status of {len(request_ids)} extraction(s): {e}")
+            statuses = {}
+
+        now = loop.time()
+        for request_id in request_ids:
+            waiter = self._pending.get(request_id)
+            if waiter is None:
+                continue
+
+            status_data = statuses.get(request_id)
+            state = status_data.get('status', 'unknown') if status_data else 'unknown'
+
+            if state == 'complete':
+                print(f"✅ Extraction {request_id} complete after {now - waiter['registered']:.0f}s")
+                self._record_completion(waiter, now)
+                self.stats['completed'] += 1
+                del self._pending[request_id]
+                if not waiter['future'].done():
+                    waiter['future'].set_result(status_data)
+            elif state == 'failed':
+                self.stats['failed'] += 1
+                del self._pending[request_id]
+                if not waiter['future'].done():
+                    error_msg = status_data.get('message', 'Extraction failed')
+                    waiter['future'].set_exception(ZuvaExtractionError(f"Zuva extraction failed: {error_msg}"))
+            else:
+                self._reschedule(waiter, now)
+
+    async def close(self):
+        """Stop polling and fail any remaining waiters"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        for waiter in self._pending.values():
+            if not waiter['future'].done():
+                waiter['future'].set_exception(ZuvaExtractionError("Zuva client closed"))
+        self._pending.clear()
+
+
 class ZuvaClient:
     """
     Zuva API Client Agent
@@ -55,7 +257,8 @@ class ZuvaClient:
         self,
         api_token: Optional[str] = None,
         region: str = 'us',
-        timeout: int = 300
+        timeout: int = 300,
+        base_url: Optional[str] = None
     ):
         """
         Initialize Zuva API client
@@ -64,13 +267,15 @@ class ZuvaClient:
             api_token: Zuva API bearer token (from env if not provided)
             region: API region ('us' or 'eu')
             timeout: Request timeout in seconds
+            base_url: API root override, e.g. a local fake server (from ZUVA_BASE_URL if not provided)
         """
         self.api_token = api_token or os.getenv('ZUVA_API_TOKEN')
         if not self.api_token:
             raise ZuvaAuthenticationError("ZUVA_API_TOKEN not provided")
 
         self.region = region
-        self.base_url = self._get_base_url(region)
+        base_url = base_url or os.getenv('ZUVA_BASE_URL')
+        self.base_url = base_url.rstrip('/') if base_url else self._get_base_url(region)
         self.timeout = timeout
 
         # HTTP client with connection pooling
@@ -85,6 +290,13 @@ class ZuvaClient:
         self._cache_timestamp: Optional[float] = None
         self._cache_ttl: int = 3600  # 1 hour in seconds
 
+        # In-flight /fields request shared by concurrent callers
+        self._field_definitions_fetch: Optional[asyncio.Task] = None
+
+        # One poller serves every wait_for_extraction call on this client
+        self.poller = ExtractionPoller(self)
+        self._batch_status_supported = True
+
         print(f"✅ Zuva client initialized (region: {region}, base_url: {self.base_url})")
 
     def _get_base_url(self, region: str) -> str:
@@ -111,12 +323,20 @@ class ZuvaClient:
         wait=wait_exponential(multiplier=1, min=2, max=10),
         retry=retry_if_exception_type((httpx.NetworkError, httpx.TimeoutException))
     )
-    async def upload_file(self, file_path: str) -> Tuple[str, Dict[str, Any]]:
+    async def upload_file(
+        self,
+        file_path: str,
+        progress: Optional[ProgressCallback] = None
+    ) -> Tuple[str, Dict[str, Any]]:
         """
         Upload a file to Zuva
 
+        The file is streamed from disk in UPLOAD_CHUNK_SIZE chunks without
+        blocking the event loop, so memory use does not grow with file size.
+
         Args:
             file_path: Path to the file to upload
+            progress: Optional callback receiving (bytes_sent, total_bytes)
 
         Returns:
             Tuple of (file_id, metadata)
@@ -127,23 +347,21 @@ class ZuvaClient:
         try:
             file_path_obj = Path(file_path)
 
-            if not file_path_obj.exists():
+            try:
+                total = (await aiofiles.os.stat(file_path)).st_size
+            except FileNotFoundError:
                 raise ZuvaUploadError(f"File not found: {file_path}")
 
-            # Read file content
-            async with httpx.AsyncClient() as temp_client:
-                with open(file_path_obj, 'rb') as f:
-                    file_content = f.read()
-
-            print(f"📤 Uploading file to Zuva: {file_path_obj.name} ({len(file_content)} bytes)")
+            print(f"📤 Uploading file to Zuva: {file_path_obj.name} ({total} bytes)")
 
             # Upload to Zuva
             response = await self.client.post(
                 f"{self.base_url}/files",
-                content=file_content,
+                content=self._stream_file(file_path, total, progress),
                 headers={
                     **self._get_headers(),
-                    'Content-Type': 'application/octet-stream'
+                    'Content-Type': 'application/octet-stream',
+                    'Content-Length': str(total)
                 }
             )
 
@@ -166,11 +384,31 @@ class ZuvaClient:
 
             return file_id, result
 
+        except ZuvaAPIError:
+            # Already classified (an auth failure must not turn into a retryable upload error)
+            raise
         except httpx.HTTPError as e:
             raise ZuvaUploadError(f"HTTP error during upload: {e}")
         except Exception as e:
             raise ZuvaUploadError(f"Unexpected error during upload: {e}")
 
+    async def _stream_file(
+        self,
+        file_path: str,
+        total: int,
+        progress: Optional[ProgressCallback] = None
+    ) -> AsyncIterator[bytes]:
+        """Yield a file's content chunk by chunk, reporting progress as it is sent"""
+        sent = 0
+        async with aiofiles.open(file_path, 'rb') as f:
+            while chunk := await f.read(UPLOAD_CHUNK_SIZE):
+                yield chunk
+                sent += len(chunk)
+                if progress:
+                    outcome = progress(sent, total)
+                    if inspect.isawaitable(outcome):
+                        await outcome
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -183,6 +421,8 @@ class ZuvaClient:
         """
         Get all field definitions from Zuva API with caching
 
+        Concurrent callers that miss the cache share a single /fields request.
+
         Args:
             force_refresh: Force refresh cache even if not expired
 
@@ -192,19 +432,26 @@ class ZuvaClient:
         Raises:
             ZuvaAPIError: If field retrieval fails
         """
-        try:
-            # Check cache
-            current_time = time.time()
-            cache_valid = (
-                self._field_definitions_cache is not None and
-                self._cache_timestamp is not None and
-                (current_time - self._cache_timestamp) < self._cache_ttl
-            )
+        # Check cache
+        current_time = time.time()
+        cache_valid = (
+            self._field_definitions_cache is not None and
+            self._cache_timestamp is not None and
+            (current_time - self._cache_timestamp) < self._cache_ttl
+        )
+
+        if cache_valid and not force_refresh:
+            print(f"✅ Using cached field definitions ({len(self._field_definitions_cache)} fields)")
+            return self._field_definitions_cache
 
-            if cache_valid and not force_refresh:
-                print(f"✅ Using cached field definitions ({len(self._field_definitions_cache)} fields)")
-                return self._field_definitions_cache
+        if self._field_definitions_fetch is None or self._field_definitions_fetch.done():
+            self._field_definitions_fetch = asyncio.create_task(self._fetch_field_definitions())
+        return await asyncio.shield(self._field_definitions_fetch)
 
+    async def _fetch_field_definitions(self) -> List[Dict[str, Any]]:
+        """Fetch the field catalog from Zuva and refresh the in-memory cache"""
+        try:
+            current_time = time.time()
             print(f"🔍 Fetching field definitions from Zuva API...")
 
             response = await self.client.get(
@@ -422,6 +669,56 @@ class ZuvaClient:
         except Exception as e:
             raise ZuvaExtractionError(f"Unexpected error during status check: {e}")
 
+    async def get_extraction_statuses(self, request_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the status of several extraction requests in one call
+
+        Uses the multi-request status endpoint; if the API rejects it, falls
+        back to concurrent single-request checks for the rest of this client's life.
+
+        Args:
+            request_ids: Zuva extraction request IDs
+
+        Returns:
+            Status data keyed by request_id (requests that could not be checked are omitted)
+        """
+        if self._batch_status_supported and len(request_ids) > 1:
+            try:
+                response = await self.client.get(
+                    f"{self.base_url}/extractions",
+                    params=[('request_id', request_id) for request_id in request_ids],
+                    headers=self._get_headers()
+                )
+
+                if response.status_code == 401:
+                    raise ZuvaAuthenticationError("Invalid API token")
+
+                if response.status_code == 200:
+                    data = response.json()
+                    entries = data.get('statuses', data) if isinstance(data, dict) else data
+                    return {entry['request_id']: entry for entry in entries if entry.get('request_id')}
+
+                print(f"⚠️  Batch status check unavailable (status {response.status_code}), "
+                      f"falling back to per-request checks")
+                self._batch_status_supported = False
+
+            except httpx.HTTPError as e:
+                raise ZuvaExtractionError(f"HTTP error during status check: {e}")
+
+        results = await asyncio.gather(
+            *(self.get_extraction_status(request_id) for request_id in request_ids),
+            return_exceptions=True
+        )
+        statuses = {}
+        for request_id, result in zip(request_ids, results):
+            if isinstance(result, ZuvaAuthenticationError):
+                raise result
+            if isinstance(result, Exception):
+                print(f"⚠️  Error checking status of {request_id}: {result}")
+                continue
+            statuses[request_id] = result
+        return statuses
+
     async def get_extraction_results(self, request_id: str) -> Dict[str, Any]:
         """
         Get extraction results
@@ -461,59 +758,29 @@ class ZuvaClient:
         self,
         request_id: str,
         max_wait: int = 180,
-        poll_interval: int = 3
+        poll_interval: Optional[int] = None
     ) -> Dict[str, Any]:
         """
-        Poll extraction status until complete
+        Wait until an extraction request completes
+
+        Status checks go through the client's shared poller, which batches
+        outstanding requests and adapts the poll interval to observed
+        completion times.
 
         Args:
             request_id: Zuva extraction request ID
             max_wait: Maximum wait time in seconds (default: 180s = 3 minutes)
-            poll_interval: Seconds between status checks (default: 3s)
+            poll_interval: Ignored; kept for backwards compatibility
 
         Returns:
             Final status data
 
         Raises:
-            ZuvaExtractionError: If extraction fails or times out
+            ZuvaExtractionError: If extraction fails
+            ZuvaTimeoutError: If extraction is still running after max_wait
         """
-        print(f"⏳ Waiting for extraction to complete (request_id={request_id})")
-        print(f"   Timeout: {max_wait}s, Poll interval: {poll_interval}s")
-
-        elapsed = 0
-        while elapsed < max_wait:
-            try:
-                status_data = await self.get_extraction_status(request_id)
-                state = status_data.get('status', 'unknown')
-
-                print(f"   Status: {state} (elapsed: {elapsed}s)")
-
-                if state == 'complete':
-                    print(f"✅ Extraction complete after {elapsed}s!")
-                    return status_data
-
-                if state == 'failed':
-                    error_msg = status_data.get('message', 'Extraction failed')
-                    raise ZuvaExtractionError(f"Zuva extraction failed: {error_msg}")
-
-                # Wait before next poll
-                await asyncio.sleep(poll_interval)
-                elapsed += poll_interval
-
-            except ZuvaExtractionError:
-                # Re-raise Zuva errors
-                raise
-            except Exception as e:
-                print(f"⚠️  Error checking status (elapsed: {elapsed}s): {e}")
-                # Continue polling unless we've exceeded max_wait
-                await asyncio.sleep(poll_interval)
-                elapsed += poll_interval
-
-        raise ZuvaExtractionError(
-            f"Extraction timeout after {max_wait}s. "
-            f"The extraction may still be processing. "
-            f"Please try checking the status later."
-        )
+        print(f"⏳ Waiting for extraction to complete (request_id={request_id}, timeout: {max_wait}s)")
+        return await self.poller.wait(request_id, max_wait)
 
     def parse_extraction_results(self, raw_results: Dict[str, Any]) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, Dict[str, Any]]]:
         """
@@ -614,7 +881,8 @@ class ZuvaClient:
         return parsed, answer_metadata
 
     async def close(self):
-        """Close the HTTP client"""
+        """Stop the poller and close the HTTP client"""
+        await self.poller.close()
         await self.client.aclose()
 
     async def __aenter__(self):